@@ -1,5 +1,6 @@
-from os import path, environ
 from dataclasses import dataclass
+from functools import lru_cache
+from os import path, environ, devnull
 
 BASE_DIR = path.dirname(path.dirname(path.dirname(path.abspath(__file__))))
 
@@ -9,13 +10,83 @@ class Config:
 
     BASE_DIR = BASE_DIR
     DB_POOL_RECYCLE: int = 900
-    DB_ECHO: bool = True
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+    # True: AsyncEngine/AsyncSession 사용 (mysql+aiomysql)
+    DB_ASYNC: bool = False
+    # 읽기 전용 replica (환경변수 DB_REPLICA_URLS, 콤마 구분), 분산 방식(round_robin/least_connections), 장애 replica 재시도 간격(초)
+    DB_REPLICA_URLS: tuple = tuple(url for url in environ.get("DB_REPLICA_URLS", "").split(",") if url)
+    DB_REPLICA_POLICY: str = "round_robin"
+    DB_REPLICA_RETRY_INTERVAL: int = 30
+    # X-Forwarded-For를 믿을 proxy(ELB 등) IP/CIDR (환경변수 TRUSTED_PROXIES, 콤마 구분), 없으면 socket peer IP만 사용
+    TRUSTED_PROXIES: tuple = tuple(address for address in environ.get("TRUSTED_PROXIES", "").split(",") if address)
+    # /internal 접근 허용 IP/CIDR (환경변수 INTERNAL_NETWORKS, 콤마 구분), 없으면 localhost만
+    INTERNAL_NETWORKS: tuple = tuple(address for address in environ.get("INTERNAL_NETWORKS", "127.0.0.1/32,::1/128").split(",") if address)
+    # 시작 시 schema 처리: create(없는 테이블 생성) / check(없으면 시작 실패) / None(안함, migration 단계에서 처리)
+    DB_SCHEMA_STARTUP: str = "check"
+    # bcrypt cost factor, hash worker pool(thread/process), 최대 대기열
+    BCRYPT_ROUNDS: int = 12
+    HASH_EXECUTOR: str = "thread"
+    HASH_WORKERS: int = 4
+    HASH_MAX_QUEUE: int = 64
+    # 검증된 JWT 캐시 최대 개수 (0이면 사용 안함)
+    TOKEN_CACHE_SIZE: int = 10000
+    # API Key 인증 캐시 최대 개수 (0이면 사용 안함) / 유지 시간(초): 있는 key(다른 worker의 변경/삭제 반영 주기), 없는 key
+    API_KEY_CACHE_SIZE: int = 10000
+    API_KEY_CACHE_TTL: int = 5
+    API_KEY_CACHE_MISS_TTL: int = 60
+    # logout 된 token 목록: 증분 polling 간격(초), 전체 재로드/만료 정리 간격(초), Bloom filter 오탐률
+    REVOCATION_POLL_INTERVAL: int = 1
+    REVOCATION_RELOAD_INTERVAL: int = 3600
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.01
+    # 공유 cache (memory/redis, None이면 사용 안함), 기본 TTL(초)
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = None
+    CACHE_TTL: int = 300
+    CACHE_MAX_SIZE: int = 10000
+    CACHE_PREFIX: str = "api:"
+    # 요청 수 제한 (memory/redis, None이면 사용 안함), RATE_LIMIT_RULES가 없으면 consts.RATE_LIMIT_RULES
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: str = None
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_RULES: list = None
+    # 허용 host 목록 파일 (한 줄에 하나, 변경 시 재시작 없이 반영)
+    TRUSTED_HOSTS_FILE: str = None
+    TRUSTED_HOSTS_RELOAD_INTERVAL: int = 30
+    # access log: bounded queue + background writer (LOG_FILE이 없으면 stdout)
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 256
+    LOG_DROP_POLICY: str = "newest"
+    LOG_FILE: str = None
+    # 예상된 4xx 에러 access log 기록 비율 (나머지는 code 별 개수만 집계), 5xx 에러 traceback 기록 비율
+    LOG_4XX_SAMPLE_RATE: float = 0.01
+    LOG_TRACEBACK_SAMPLE_RATE: float = 0.1
+    # 서버 (app.server): worker 수(0이면 CPU 수), listen backlog, keep-alive(초), 최대 동시 연결(초과 시 503), worker 재시작 요청 수, 종료 대기(초)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 1
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE: int = 5
+    SERVER_LIMIT_CONCURRENCY: int = None
+    SERVER_LIMIT_MAX_REQUESTS: int = None
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    # multi worker metrics 합산용 snapshot 디렉토리 (없으면 process 단위)
+    METRICS_DIR: str = None
+    METRICS_FLUSH_INTERVAL: int = 5
 
 
 @dataclass
 class LocalConfig(Config):
     PROJ_RELOAD: bool = True
-    DB_URL: str = "mysql+pymysql://travis@localhost:3306/notification_api?charset=utf8mb4"
+    DB_ECHO: bool = True
+    BCRYPT_ROUNDS: int = 10
+    DB_URL: str = environ.get("DB_URL", "mysql+pymysql://travis@localhost:3306/notification_api?charset=utf8mb4")
+    DB_SCHEMA_STARTUP: str = "create"
+    LOG_4XX_SAMPLE_RATE: float = 1.0
+    LOG_TRACEBACK_SAMPLE_RATE: float = 1.0
     ALLOW_SITE = ["*"]
     TRUSTED_HOSTS = ["*"]
 
@@ -23,8 +94,56 @@ class LocalConfig(Config):
 @dataclass
 class ProdConfig(Config):
     PROJ_RELOAD: bool = False
+    DB_URL: str = environ.get("DB_URL")
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 10
+    DB_SCHEMA_STARTUP: str = None
+    SERVER_WORKERS: int = 0
+    SERVER_BACKLOG: int = 4096
+    # ELB idle timeout(60초) 보다 길게 유지
+    SERVER_KEEPALIVE: int = 75
+    SERVER_LIMIT_CONCURRENCY: int = 1000
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    # CORS 허용 origin / 허용 host (환경변수 ALLOW_SITE, TRUSTED_HOSTS, 콤마 구분), 없으면 시작하지 않음
+    ALLOW_SITE = [site for site in environ.get("ALLOW_SITE", "").split(",") if site]
+    TRUSTED_HOSTS = [host for host in environ.get("TRUSTED_HOSTS", "").split(",") if host]
+
+    def __post_init__(self):
+        if not self.ALLOW_SITE or not self.TRUSTED_HOSTS:
+            raise RuntimeError("ALLOW_SITE and TRUSTED_HOSTS environment variables must be set in prod (comma separated)")
+        # ELB 뒤에서 proxy 설정이 없으면 모든 요청이 ELB IP 하나로 집계되어 IP 단위 요청 수 제한(/api/auth)을 전체 client가 공유
+        if not self.TRUSTED_PROXIES:
+            raise RuntimeError("TRUSTED_PROXIES environment variable must be set in prod (load balancer IP/CIDR, comma separated)")
+        # allow_credentials=True 와 함께 "*" 를 쓰면 모든 origin에서 인증된 요청 가능
+        if "*" in self.ALLOW_SITE:
+            raise RuntimeError("ALLOW_SITE must list origins explicitly in prod, '*' is not allowed")
+
+
+# 부하 테스트 / 벤치마크 (API_ENV=bench): 로컬 sqlite, 요청 수 제한 없음, access log는 /dev/null
+@dataclass
+class BenchConfig(Config):
+    PROJ_RELOAD: bool = False
+    DB_URL: str = environ.get("DB_URL", f"sqlite:///{path.join(BASE_DIR, 'bench.db')}")
+    DB_SCHEMA_STARTUP: str = "create"
+    # 해시 비용은 benchmarks.hash_offload에서 따로 측정, 필요하면 환경변수로 운영 값(12) 지정
+    BCRYPT_ROUNDS: int = int(environ.get("BCRYPT_ROUNDS", 4))
+    RATE_LIMIT_BACKEND: str = None
+    LOG_FILE: str = environ.get("LOG_FILE", devnull)
+    # multi worker 실행 시 /metrics 합산용
+    METRICS_DIR: str = environ.get("METRICS_DIR")
+    METRICS_FLUSH_INTERVAL: int = 1
+    ALLOW_SITE = ["*"]
+    TRUSTED_HOSTS = ["*"]
+
+
+CONFIGS = dict(prod=ProdConfig, local=LocalConfig, bench=BenchConfig)
 
 
+@lru_cache
 def conf_setting():
-    config = dict(prod=ProdConfig(), local=LocalConfig())
-    return config.get(environ.get("API_ENV", "local"))
+    """
+    API_ENV에 해당하는 config 하나만 생성, 이후 같은 객체 반환
+    :return:
+    """
+    return CONFIGS[environ.get("API_ENV", "local")]()
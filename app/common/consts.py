@@ -2,9 +2,33 @@
 
 JWT_SECRET = "ABCD1234!@"
 JWT_ALGORITHM = "HS256"
+# access token 유효 시간(시간)
+JWT_EXPIRE_HOURS = 24
 
-EXCEPT_PATH_LIST = ["/", "/openapi.json"]
-EXCEPT_PATH_REGEX = "^(/docs|/redoc|/auth)"
+# 토큰 검사 예외 경로 (exact / prefix / regex)
+EXCEPT_PATH_LIST = ["/", "/openapi.json", "/metrics"]
+EXCEPT_PATH_PREFIX = ["/docs", "/redoc", "/auth", "/api/auth"]
+EXCEPT_PATH_REGEX = None
+# 내부망 전용 경로 (token 대신 요청 IP가 Config.INTERNAL_NETWORKS 안인지 검사)
+INTERNAL_PATH_PREFIX = "/internal"
 
 MAX_API_KEY = 3
+# access_key unique 충돌 / 동시 적재 중 deadlock 시 재시도 횟수, MySQL deadlock error code (ER_LOCK_DEADLOCK)
+API_KEY_CREATE_RETRY = 5
+MYSQL_DEADLOCK_ERROR = 1213
 MAX_API_WHITELIST = 10
+# bulk API 요청당 최대 항목 수
+MAX_BULK_SIZE = 1000
+# GET /apikeys 페이지 크기 (기본 / 최대), export 시 DB에서 한번에 가져오는 행 수
+API_KEY_PAGE_SIZE = 100
+MAX_API_KEY_PAGE_SIZE = 1000
+API_KEY_EXPORT_BATCH = 500
+# API Key(HMAC) 인증 timestamp 허용 오차(초)
+API_KEY_TIMESTAMP_TOLERANCE = 10
+# 요청 수 제한 (path prefix, 요청 수, 초), 위에서부터 처음 일치하는 규칙 하나만 적용
+# 인증된 요청은 API Key / 유저, 그 외에는 IP 단위
+RATE_LIMIT_RULES = [
+    ("/api/auth/login", 10, 60),
+    ("/api/auth/register", 5, 60),
+    ("/api", 100, 1),
+]
@@ -0,0 +1,47 @@
+import time
+from contextvars import ContextVar
+
+from app.schema import UserToken
+
+_request_context: ContextVar = ContextVar("request_context", default=None)
+
+
+class RequestContext:
+    """
+    요청 단위 정보 (AccessControlMiddleware에서 생성, 요청 동안 contextvar로 공유)
+    시작 시각은 perf_counter_ns 하나만 기록, 벽시계 시각은 로그 기록 시에만 계산
+    """
+
+    __slots__ = ("ip", "start_ns", "user", "api_key", "session")
+
+    def __init__(self, ip: str, start_ns: int = None):
+        self.ip = ip
+        self.start_ns = start_ns or time.perf_counter_ns()
+        self.user: UserToken = None
+        # API Key(HMAC) 인증 시 access key
+        self.api_key: str = None
+        # db.session dependency가 연 session (crud에서 사용)
+        self.session = None
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter_ns() - self.start_ns) / 1e6
+
+
+def request_context() -> RequestContext | None:
+    """
+    현재 요청의 RequestContext, 요청 밖(스크립트, 벤치마크 등)이면 None
+    :return:
+    """
+    return _request_context.get()
+
+
+def set_request_context(context: RequestContext | None):
+    """
+    :param context:
+    :return: reset_request_context에 넘길 token
+    """
+    return _request_context.set(context)
+
+
+def reset_request_context(token):
+    _request_context.reset(token)
@@ -0,0 +1,82 @@
+import asyncio
+import typing
+
+import orjson
+from fastapi import APIRouter
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+
+class FastJSONRoute(APIRoute):
+    """
+    응답 직렬화 fast path
+    기본 경로(jsonable_encoder -> response_model 검증 -> dict 변환 -> json.dumps) 대신
+    - response_model 있음: pydantic 검증 후 바로 JSON bytes로 직렬화 (TypeAdapter.dump_json)
+    - response_model 없음: orjson (orjson이 모르는 타입만 jsonable_encoder)
+    endpoint가 Response를 반환하면 그대로 사용, response 파라미터로 설정한 header / status_code는 반영
+    """
+
+    def get_route_handler(self):
+        if self.dependant.call is self.endpoint:
+            self.dependant.call = self._fast_endpoint(self.endpoint)
+        return super().get_route_handler()
+
+    def _fast_endpoint(self, endpoint: typing.Callable):
+        is_coroutine = asyncio.iscoroutinefunction(endpoint)
+        adapter = TypeAdapter(self.response_model) if self.response_model else None
+        dump_options = dict(
+            include=self.response_model_include,
+            exclude=self.response_model_exclude,
+            by_alias=self.response_model_by_alias,
+            exclude_unset=self.response_model_exclude_unset,
+            exclude_defaults=self.response_model_exclude_defaults,
+            exclude_none=self.response_model_exclude_none,
+        )
+        response_param_name = self.dependant.response_param_name
+        status_code = self.status_code or 200
+
+        async def fast_endpoint(**kwargs):
+            if is_coroutine:
+                content = await endpoint(**kwargs)
+            else:
+                content = await run_in_threadpool(endpoint, **kwargs)
+            if isinstance(content, Response):
+                return content
+
+            if adapter is not None:
+                body = adapter.dump_json(adapter.validate_python(content, from_attributes=True), **dump_options)
+            else:
+                body = orjson.dumps(content, default=jsonable_encoder)
+            response = Response(body, status_code=status_code, media_type="application/json")
+
+            sub_response = kwargs.get(response_param_name) if response_param_name else None
+            if sub_response is not None:
+                response.headers.raw.extend(sub_response.headers.raw)
+                if sub_response.status_code:
+                    response.status_code = sub_response.status_code
+            return response
+
+        return fast_endpoint
+
+
+class FastJSONRouter(APIRouter):
+    """
+    include 되는 route를 모두 FastJSONRoute로 생성
+    """
+
+    def add_api_route(self, *args, route_class_override=None, **kwargs):
+        super().add_api_route(*args, route_class_override=FastJSONRoute, **kwargs)
+
+
+def fast_json(router: APIRouter) -> APIRouter:
+    """
+    router 단위 fast JSON 응답 사용 (app.include_router(fast_json(router), ...))
+    :param router:
+    :return:
+    """
+    fast_router = FastJSONRouter()
+    fast_router.include_router(router)
+    return fast_router
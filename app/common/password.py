@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import bcrypt
+from fastapi import FastAPI
+
+from app.errors.exceptions import HashQueueFullEx
+
+
+def _hashpw(pw: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(pw, bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(pw: bytes, hashed_pw: bytes) -> bool:
+    return bcrypt.checkpw(pw, hashed_pw)
+
+
+class PasswordHasher:
+    """
+    bcrypt 해시/검증을 이벤트 루프 밖의 worker pool에서 실행
+    대기열(max queue)이 가득 차면 기다리지 않고 HashQueueFullEx(503) 발생
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._executor: Executor = None
+        self._rounds = 12
+        self._max_pending = 0
+        self._pending = 0
+
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Hash worker pool 초기화
+        :param app:
+        :param kwargs: BCRYPT_ROUNDS, HASH_EXECUTOR(thread/process), HASH_WORKERS, HASH_MAX_QUEUE
+        :return:
+        """
+        self._rounds = kwargs.setdefault("BCRYPT_ROUNDS", 12)
+        executor_type = kwargs.setdefault("HASH_EXECUTOR", "thread")
+        workers = kwargs.setdefault("HASH_WORKERS", 4)
+        max_queue = kwargs.setdefault("HASH_MAX_QUEUE", 64)
+
+        # 실행중(workers) + 대기중(max_queue) 까지만 허용
+        self._max_pending = workers + max_queue
+        if executor_type == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+        @app.on_event("shutdown")
+        def shutdown():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            logging.info("Password Hasher Shutdown")
+
+    async def hashpw(self, pw: str) -> str:
+        hashed_pw = await self._submit(_hashpw, pw.encode("utf-8"), self._rounds)
+        return hashed_pw.decode("utf-8")
+
+    async def checkpw(self, pw: str, hashed_pw: str) -> bool:
+        return await self._submit(_checkpw, pw.encode("utf-8"), hashed_pw.encode("utf-8"))
+
+    async def _submit(self, fn, *args):
+        if self._executor is None:
+            raise Exception("must be called 'init_app'")
+        if self._pending >= self._max_pending:
+            raise HashQueueFullEx()
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    @property
+    def pending(self):
+        return self._pending
+
+
+hasher = PasswordHasher()
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from fastapi import FastAPI
+
+
+class CacheBackend:
+    """
+    cache 저장소 interface (값은 직렬화된 bytes)
+    """
+
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        raise NotImplementedError
+
+    async def delete(self, *keys: str):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    process 내부 LRU + TTL 저장소 (단일 worker, 로컬 개발용)
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self._entries = OrderedDict()
+        self._max_size = max_size
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def close(self):
+        self._entries.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis protocol 저장소 (worker 간 공유)
+    client를 넘기면 그대로 사용 (ex. fakeredis.aioredis.FakeRedis)
+    """
+
+    def __init__(self, url: str = None, client=None):
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.Redis.from_url(url)
+        self._client = client
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self._client.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._client.delete(*keys)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class Cache:
+    """
+    backend 앞단의 cache
+    JSON 직렬화, None(없음) 결과도 캐시, key 단위 single-flight (같은 key의 동시 miss는 loader 한번만 실행)
+    backend 장애 시 loader 결과를 그대로 반환하고 errors 증가
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._backend: CacheBackend = None
+        self._ttl = 300
+        self._prefix = ""
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Cache 초기화
+        :param app:
+        :param kwargs: CACHE_BACKEND(memory/redis, 없으면 사용 안함), CACHE_REDIS_URL, CACHE_TTL, CACHE_MAX_SIZE, CACHE_PREFIX
+        :return:
+        """
+        backend = kwargs.setdefault("CACHE_BACKEND", "memory")
+        if backend == "redis":
+            self.set_backend(RedisCacheBackend(url=kwargs.get("CACHE_REDIS_URL") or "redis://localhost:6379/0"))
+        elif backend == "memory":
+            self.set_backend(MemoryCacheBackend(max_size=kwargs.setdefault("CACHE_MAX_SIZE", 10000)))
+        else:
+            self.set_backend(None)
+        self._ttl = kwargs.setdefault("CACHE_TTL", 300)
+        self._prefix = kwargs.setdefault("CACHE_PREFIX", "api:")
+
+        @app.on_event("shutdown")
+        async def shutdown():
+            if self._backend is not None:
+                await self._backend.close()
+
+    def set_backend(self, backend: CacheBackend | None):
+        self._backend = backend
+        self._inflight.clear()
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int = None, cache_none: bool = True) -> Any:
+        """
+        캐시 조회, 없으면 loader 실행 후 저장
+        :param key:
+        :param loader: JSON 직렬화 가능한 값(None 포함)을 반환하는 coroutine 함수
+        :param ttl: 초, 없으면 CACHE_TTL
+        :param cache_none: False면 loader 결과가 None일 때 저장하지 않음
+        :return:
+        """
+        if self._backend is None:
+            return await loader()
+
+        key = f"{self._prefix}{key}"
+        try:
+            cached = await self._backend.get(key)
+        except Exception:
+            logging.exception("cache get failed")
+            self.errors += 1
+            return await loader()
+        if cached is not None:
+            self.hits += 1
+            return json.loads(cached)
+
+        self.misses += 1
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+            if value is not None or cache_none:
+                await self._set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # 기다리는 요청이 없으면 "exception was never retrieved" 경고 방지
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def set(self, key: str, value: Any, ttl: int = None):
+        """
+        write-through 저장
+        :param key:
+        :param value:
+        :param ttl:
+        :return:
+        """
+        if self._backend is not None:
+            await self._set(f"{self._prefix}{key}", value, ttl)
+
+    async def delete(self, *keys: str):
+        if self._backend is None:
+            return
+        try:
+            await self._backend.delete(*(f"{self._prefix}{key}" for key in keys))
+        except Exception:
+            logging.exception("cache delete failed")
+            self.errors += 1
+
+    async def _set(self, key: str, value: Any, ttl: int = None):
+        try:
+            await self._backend.set(key, json.dumps(value, separators=(",", ":")).encode("utf-8"), ttl or self._ttl)
+        except Exception:
+            logging.exception("cache set failed")
+            self.errors += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return dict(
+            backend=self._backend.__class__.__name__ if self._backend else None,
+            hits=self.hits,
+            misses=self.misses,
+            hit_ratio=round(self.hits / lookups, 4) if lookups else 0,
+            coalesced=self.coalesced,
+            errors=self.errors,
+        )
+
+
+cache = Cache()
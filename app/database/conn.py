@@ -2,13 +2,32 @@ import logging
 
 from fastapi import FastAPI
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import close_all_sessions, sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
+
+from app.common.context import request_context
+from app.database.pool import MeteredAsyncQueuePool, MeteredQueuePool
+from app.database.routing import ReplicaRouter, RoutingSession
+
+# 동기 드라이버 -> 비동기 드라이버 매핑 (DB_ASYNC 사용 시)
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql+mysqldb": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
 
 
 class SQLAlchemy:
     def __init__(self, app: FastAPI = None, **kwargs):
         self._engine = None
+        self._replicas = []
+        self._router: ReplicaRouter = None
         self._session = None
+        self._is_async = False
 
         if app is not None:
             self.init_app(app=app, **kwargs)
@@ -21,52 +40,170 @@ class SQLAlchemy:
         :return:
         """
         database_url = kwargs.get("DB_URL")
-        pool_recycle = kwargs.setdefault("POOL_RECYCLE", 900)
-        echo = kwargs.setdefault("ECHO", True)
-
-        self._engine = create_engine(
-            database_url,
-            echo=echo,
-            pool_recycle=pool_recycle,
-            pool_pre_ping=True,
+        replica_urls = kwargs.setdefault("DB_REPLICA_URLS", None) or []
+        self._is_async = kwargs.get("DB_ASYNC", False)
+        engine_options = dict(
+            echo=kwargs.setdefault("DB_ECHO", False),
+            pool_recycle=kwargs.setdefault("DB_POOL_RECYCLE", 900),
+            pool_pre_ping=kwargs.setdefault("DB_POOL_PRE_PING", True),
+            pool_size=kwargs.setdefault("DB_POOL_SIZE", 5),
+            max_overflow=kwargs.setdefault("DB_MAX_OVERFLOW", 10),
+            pool_timeout=kwargs.setdefault("DB_POOL_TIMEOUT", 30),
         )
 
-        self._session = sessionmaker(autocommit=False, autoflush=False, bind=self._engine)
+        if self._is_async:
+            self._engine = create_async_engine(async_database_url(database_url), poolclass=MeteredAsyncQueuePool, **engine_options)
+            self._replicas = [create_async_engine(async_database_url(url), poolclass=MeteredAsyncQueuePool, **engine_options) for url in replica_urls]
+        else:
+            self._engine = create_engine(database_url, poolclass=MeteredQueuePool, **engine_options)
+            self._replicas = [create_engine(url, poolclass=MeteredQueuePool, **engine_options) for url in replica_urls]
+
+        # 읽기 쿼리 replica 분산 (RoutingSession.get_bind)
+        self._router = None
+        if self._replicas:
+            self._router = ReplicaRouter(
+                [replica.sync_engine if self._is_async else replica for replica in self._replicas],
+                policy=kwargs.setdefault("DB_REPLICA_POLICY", "round_robin"),
+                retry_interval=kwargs.setdefault("DB_REPLICA_RETRY_INTERVAL", 30),
+            )
+        session_info = dict(router=self._router) if self._router else None
+
+        if self._is_async:
+            self._session = async_sessionmaker(bind=self._engine, sync_session_class=RoutingSession, info=session_info, autoflush=False, expire_on_commit=False)
+        else:
+            self._session = sessionmaker(class_=RoutingSession, info=session_info, autocommit=False, autoflush=False, bind=self._engine)
 
         # inline function
         @app.on_event("startup")
-        def startup():
-            self._engine.connect()
+        async def startup():
+            if self._is_async:
+                async with self._engine.connect():
+                    pass
+            else:
+                with self._engine.connect():
+                    pass
             logging.info("DB Connect")
 
+            # replica 접속 실패는 시작 실패로 보지 않음 (router에서 제외 후 재시도)
+            for replica in self._replicas:
+                try:
+                    if self._is_async:
+                        async with replica.connect():
+                            pass
+                    else:
+                        with replica.connect():
+                            pass
+                except Exception:
+                    logging.exception(f"DB replica connect failed: {replica.url.render_as_string()}")
+
         @app.on_event("shutdown")
-        def shutdown():
-            self._session.close_all()
-            self._engine.dispose()
+        async def shutdown():
+            if self._is_async:
+                for engine in [self._engine, *self._replicas]:
+                    await engine.dispose()
+            else:
+                close_all_sessions()
+                for engine in [self._engine, *self._replicas]:
+                    engine.dispose()
             logging.info("DB Disconnect")
 
-    def get_db(self):
+    async def get_db(self):
         """
         요청마다 DB session 유지
-        :return:
+        요청 동안 current_session()으로 같은 session을 꺼내 쓸 수 있음
+        :return: Session or AsyncSession (DB_ASYNC)
         """
         if self._session is None:
             raise Exception("must be called 'init_app'")
-        db_session = None
+        db_session = self._session()
+        context = request_context()
+        if context is not None:
+            context.session = db_session
         try:
-            db_session = self._session()
             yield db_session
         finally:
-            db_session.close()
+            if context is not None:
+                context.session = None
+            if self._is_async:
+                await db_session.close()
+            else:
+                await run_in_threadpool(db_session.close)
 
     @property
     def session(self):
         return self.get_db
 
+    @property
+    def session_factory(self):
+        return self._session
+
     @property
     def engine(self):
         return self._engine
 
+    @property
+    def is_async(self):
+        return self._is_async
+
+    @property
+    def replicas(self):
+        return self._replicas
+
+    @property
+    def sync_engines(self):
+        """
+        primary + replica 동기 Engine (event 등록용)
+        :return:
+        """
+        engines = [self._engine, *self._replicas]
+        return [engine.sync_engine for engine in engines] if self._is_async else engines
+
+    def pool_stats(self) -> dict:
+        """
+        커넥션 풀 현황 (checked out, overflow, checkout 대기 시간 histogram), replica 사용 시 replica별 상태 포함
+        :return:
+        """
+        if self._engine is None:
+            raise Exception("must be called 'init_app'")
+        pool = self._engine.pool
+        stats = pool.stats.snapshot(pool)
+        if self._router is not None:
+            stats["replicas"] = self._router.stats()
+        return stats
+
+
+def current_session():
+    """
+    현재 요청에서 Depends(db.session)으로 열린 session, 없으면 None
+    :return:
+    """
+    context = request_context()
+    return context.session if context is not None else None
+
+
+def async_database_url(database_url: str) -> str:
+    """
+    동기 드라이버 URL을 비동기 드라이버 URL로 변환
+    :param database_url: ex) mysql+pymysql://...
+    :return: ex) mysql+aiomysql://...
+    """
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+async def run_in_session(session, fn, *args, **kwargs):
+    """
+    동기 Session 함수를 이벤트 루프를 막지 않고 실행
+    AsyncSession이면 run_sync(greenlet), 동기 Session이면 threadpool에서 실행
+    :param session: Session or AsyncSession
+    :param fn: 첫번째 인자로 동기 Session을 받는 함수
+    :return:
+    """
+    if isinstance(session, AsyncSession):
+        return await session.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, session, *args, **kwargs)
+
 
 db = SQLAlchemy()
 Base = declarative_base()
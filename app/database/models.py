@@ -1,9 +1,28 @@
 # models for DB Table
 
 from sqlalchemy import Column, Integer, DateTime, func, Enum, String, Boolean, ForeignKey
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Session, relationship
+from sqlalchemy.sql.functions import GenericFunction
+from starlette.concurrency import run_in_threadpool
 
-from app.database.conn import Base, db
+from app.database.cache import cache
+from app.database.conn import Base, db, run_in_session, current_session
+
+
+class utc_timestamp(GenericFunction):
+    """
+    func.utc_timestamp(), sqlite(로컬 테스트/벤치마크)에서는 CURRENT_TIMESTAMP(UTC)로 변환
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_timestamp, "sqlite")
+def _sqlite_utc_timestamp(element, compiler, **kwargs):
+    return "CURRENT_TIMESTAMP"
 
 
 class BaseMixin:
@@ -39,17 +58,90 @@ class BaseMixin:
         return obj
 
     @classmethod
-    def get(cls, **kwargs):
-        session = next(db.session())
+    def get(cls, session: Session = None, **kwargs):
+        """
+        단건 조회 함수
+        LIMIT 2 한번의 조회로 중복 여부까지 확인
+        :param session: 없으면 현재 요청의 session 사용, 요청 밖이면 조회용 session을 열고 닫음
+        :param kwargs: 컬럼 조건
+        :return:
+        """
+        rows = cls.filter(session, limit=2, **kwargs)
+        if len(rows) > 1:
+            raise Exception("Only one row is supposed to be returned, but got more than one")
+        return rows[0] if rows else None
+
+    @classmethod
+    def filter(cls, session: Session = None, limit: int = None, **kwargs):
+        """
+        다건 조회 함수
+        :param session: 없으면 현재 요청의 session 사용, 요청 밖이면 조회용 session을 열고 닫음
+        :param limit:
+        :param kwargs: 컬럼 조건
+        :return: list
+        """
+        if session is None:
+            session = current_session()
+        if session is None:
+            with db.session_factory() as new_session:
+                return cls.filter(new_session, limit=limit, **kwargs)
+        if isinstance(session, AsyncSession):
+            raise Exception("AsyncSession must be used with 'aget' or 'afilter'")
+
         query = session.query(cls)
 
         for key, value in kwargs.items():
             column = getattr(cls, key)
             query = query.filter(column == value)
 
-        if query.count() > 1:
-            raise Exception("Only one row is supposed to be returned, but got more than one")
-        return query.first()
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    @classmethod
+    async def acreate(cls, session, auto_commit: bool = False, **kwargs):
+        """
+        테이블 데이터 적재 함수 (awaitable)
+        Session, AsyncSession 모두 이벤트 루프를 막지 않고 실행
+        :param session:
+        :param auto_commit:
+        :param kwargs:
+        :return:
+        """
+        return await run_in_session(session, lambda sync_session: cls.create(sync_session, auto_commit=auto_commit, **kwargs))
+
+    @classmethod
+    async def aget(cls, session=None, **kwargs):
+        """
+        단건 조회 함수 (awaitable)
+        :param session: 없으면 현재 요청의 session 사용, 요청 밖이면 조회용 session을 열고 닫음
+        :param kwargs: 컬럼 조건
+        :return:
+        """
+        return await cls._run(session, cls.get, **kwargs)
+
+    @classmethod
+    async def afilter(cls, session=None, limit: int = None, **kwargs):
+        """
+        다건 조회 함수 (awaitable)
+        :param session: 없으면 현재 요청의 session 사용, 요청 밖이면 조회용 session을 열고 닫음
+        :param limit:
+        :param kwargs: 컬럼 조건
+        :return: list
+        """
+        return await cls._run(session, cls.filter, limit=limit, **kwargs)
+
+    @classmethod
+    async def _run(cls, session, fn, **kwargs):
+        if session is None:
+            session = current_session()
+        if session is not None:
+            return await run_in_session(session, fn, **kwargs)
+
+        if db.is_async:
+            async with db.session_factory() as new_session:
+                return await run_in_session(new_session, fn, **kwargs)
+        return await run_in_threadpool(fn, **kwargs)
 
 
 class Users(Base, BaseMixin):
@@ -63,10 +155,62 @@ class Users(Base, BaseMixin):
     sns_type = Column(Enum("FB", "G", "N"), nullable=True, default=None)
     marketing_agree = Column(Boolean, default=False)
 
+    # cache 조회 가능한 컬럼
+    CACHE_KEYS = ("id", "email")
+    # cache에 넣지 않는 컬럼 (비밀번호 hash는 공유 cache에 두지 않음, 로그인은 DB에서 직접 조회)
+    CACHE_EXCLUDE = ("pw", "created_at", "updated_at")
+
+    @classmethod
+    async def acreate(cls, session, auto_commit: bool = False, **kwargs):
+        """
+        유저 적재 + cache write-through (commit 전이면 cache 삭제)
+        :param session:
+        :param auto_commit:
+        :param kwargs:
+        :return:
+        """
+
+        def _create(sync_session: Session):
+            user = cls.create(sync_session, auto_commit=auto_commit, **kwargs)
+            # commit 후 expire 된 값도 여기(threadpool)서 다시 읽음
+            return user, user.cache_dict()
+
+        user, data = await run_in_session(session, _create)
+        keys = [f"users:{key}:{data[key]}" for key in cls.CACHE_KEYS if data[key] is not None]
+        for key in keys:
+            if auto_commit:
+                await cache.set(key, data)
+            else:
+                await cache.delete(key)
+        return user
+
+    @classmethod
+    async def aget_cached(cls, session=None, **kwargs):
+        """
+        id 또는 email 단건 프로필 조회 (cache 경유, pw 없음)
+        없는 유저는 id 조회만 캐시, email은 다른 worker에서 가입한 유저가 CACHE_TTL 동안 안 보이는 일이 없도록 캐시하지 않음
+        :param session: cache miss 시 사용할 session
+        :param kwargs: id=... 또는 email=...
+        :return: session에 연결되지 않은 Users 또는 None
+        """
+        ((key, value),) = kwargs.items()
+        if key not in cls.CACHE_KEYS:
+            raise Exception(f"cache lookup is only supported by {cls.CACHE_KEYS}")
+
+        async def load():
+            user = await cls.aget(session, **kwargs)
+            return user.cache_dict() if user else None
+
+        data = await cache.get_or_load(f"users:{key}:{value}", load, cache_none=key != "email")
+        return cls(**data) if data else None
+
+    def cache_dict(self) -> dict:
+        return {column.name: getattr(self, column.name) for column in self.__table__.columns if column.name not in self.CACHE_EXCLUDE}
+
 
 class ApiKeys(Base, BaseMixin):
     __tablename__ = "api_keys"
-    access_key = Column(String(length=64), nullable=False, index=True)
+    access_key = Column(String(length=64), nullable=False, unique=True)
     secret_key = Column(String(length=64), nullable=False)
     memo = Column(String(length=40), nullable=True)
     status = Column(Enum("active", "stopped", "deleted"), default="active")
@@ -79,3 +223,11 @@ class ApiWhiteLists(Base, BaseMixin):
     __tablename__ = "api_white_lists"
     ip_address = Column(String(length=64), nullable=False)
     api_key_id = Column(Integer, ForeignKey("api_keys.id"), nullable=False)
+
+
+class RevokedTokens(Base, BaseMixin):
+    __tablename__ = "revoked_tokens"
+    jti = Column(String(length=64), nullable=False, unique=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # token 만료 시각(UTC), 지나면 삭제
+    expires_at = Column(DateTime, nullable=True, index=True)
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from utils.metrics import Histogram
+
+
+class PoolStats:
+    """
+    커넥션 풀 checkout 대기 시간 통계
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkout_latency = Histogram()
+        self.wait_seconds_total = 0.0
+        self.timeouts = 0
+
+    def observe(self, elapsed: float, timeout: bool = False):
+        with self._lock:
+            self.checkout_latency.observe(elapsed)
+            self.wait_seconds_total += elapsed
+            if timeout:
+                self.timeouts += 1
+
+    def snapshot(self, pool: QueuePool) -> dict:
+        with self._lock:
+            return dict(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+                timeouts=self.timeouts,
+                wait_seconds_total=self.wait_seconds_total,
+                checkout_latency=self.checkout_latency.snapshot(),
+            )
+
+
+class MeteredPoolMixin:
+    """
+    QueuePool checkout(_do_get) 소요 시간 측정
+    """
+
+    stats: PoolStats
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.observe(time.perf_counter() - start, timeout=True)
+            raise
+        self.stats.observe(time.perf_counter() - start)
+        return connection
+
+
+class MeteredQueuePool(MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
@@ -0,0 +1,149 @@
+import itertools
+import logging
+import threading
+import time
+import typing
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+
+class ReplicaRouter:
+    """
+    읽기 전용 replica engine 선택
+    - round_robin      : 순서대로
+    - least_connections: checkout 된 커넥션 + 선택 후 아직 checkout 전인 요청이 가장 적은 replica
+    접속/연결 오류가 난 replica는 retry_interval 동안 제외 후 다시 시도, healthy replica가 없으면 None(primary 사용)
+    """
+
+    POLICIES = ("round_robin", "least_connections")
+
+    def __init__(self, engines: typing.Sequence[Engine], policy: str = "round_robin", retry_interval: float = 30):
+        if policy not in self.POLICIES:
+            raise Exception(f"DB_REPLICA_POLICY must be one of {self.POLICIES}")
+        self.engines = list(engines)
+        self._policy = policy
+        self._retry_interval = retry_interval
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._down_until = {}
+        self.picks = {engine: 0 for engine in self.engines}
+        self.failures = {engine: 0 for engine in self.engines}
+        self._pending = {engine: 0 for engine in self.engines}
+
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error(engine))
+            event.listen(engine.pool, "checkout", self._on_checkout(engine))
+
+    def pick(self) -> Engine | None:
+        now = time.monotonic()
+        healthy = [engine for engine in self.engines if self._down_until.get(engine, 0) <= now]
+        if not healthy:
+            return None
+        if self._policy == "least_connections":
+            engine = min(healthy, key=lambda replica: replica.pool.checkedout() + self._pending[replica])
+        else:
+            engine = healthy[next(self._counter) % len(healthy)]
+        with self._lock:
+            self.picks[engine] += 1
+            self._pending[engine] += 1
+        return engine
+
+    def is_healthy(self, engine: Engine) -> bool:
+        return self._down_until.get(engine, 0) <= time.monotonic()
+
+    def mark_down(self, engine: Engine):
+        with self._lock:
+            self._down_until[engine] = time.monotonic() + self._retry_interval
+            self.failures[engine] += 1
+            self._pending[engine] = 0
+        logging.warning(f"DB replica {engine.url.render_as_string()} is down, retry after {self._retry_interval}s")
+
+    def _on_error(self, engine: Engine):
+        def handle_error(context):
+            # 접속 실패, 끊긴 커넥션만 장애로 판단 (쿼리 오류는 제외)
+            if context.is_disconnect or (context.connection is None and isinstance(context.sqlalchemy_exception, OperationalError)):
+                self.mark_down(engine)
+
+        return handle_error
+
+    def _on_checkout(self, engine: Engine):
+        def checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self._pending[engine] = max(0, self._pending[engine] - 1)
+
+        return checkout
+
+    def stats(self) -> list:
+        return [
+            dict(
+                url=engine.url.render_as_string(),
+                healthy=self.is_healthy(engine),
+                picks=self.picks[engine],
+                failures=self.failures[engine],
+                pool=engine.pool.stats.snapshot(engine.pool) if hasattr(engine.pool, "stats") else None,
+            )
+            for engine in self.engines
+        ]
+
+
+class RoutingSession(Session):
+    """
+    SELECT는 replica, 그 외(flush, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE)는 primary
+    한번 쓰기를 한 session은 이후 읽기도 primary (read-after-write), 읽기는 session 동안 같은 replica 사용
+    info["router"]에 ReplicaRouter가 없으면 항상 primary
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        router = self.info.get("router")
+        if router is None or self._flushing or self.info.get("primary") or not is_read(clause):
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+        replica = self.info.get("replica")
+        if replica is None or not router.is_healthy(replica):
+            replica = router.pick()
+            if replica is None:
+                return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+            self.info["replica"] = replica
+        return replica
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _route_execute(orm_execute_state):
+    session = orm_execute_state.session
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        session.info["primary"] = True
+        return None
+
+    router = session.info.get("router")
+    if router is None or session.info.get("primary") or not orm_execute_state.is_select:
+        return None
+    try:
+        return orm_execute_state.invoke_statement()
+    except OperationalError:
+        replica = session.info.pop("replica", None)
+        if replica is None or router.is_healthy(replica):
+            raise
+        # replica 접속 실패 -> 다른 replica(없으면 primary)로 한번 더 실행
+        return orm_execute_state.invoke_statement()
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _stick_to_primary_on_flush(session, flush_context):
+    session.info["primary"] = True
+
+
+def is_read(clause) -> bool:
+    return clause is not None and getattr(clause, "is_select", False) and getattr(clause, "_for_update_arg", None) is None
+
+
+def use_primary(session):
+    """
+    이후 session의 모든 쿼리를 primary로 (쓰기 전 조회 등 replica 지연이 문제가 되는 경우)
+    :param session: Session or AsyncSession
+    :return:
+    """
+    session.info["primary"] = True
+    return session
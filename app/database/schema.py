@@ -0,0 +1,86 @@
+"""
+DB schema 관리
+배포 시 migration 단계에서 실행: python -m app.database.schema create|check
+"""
+
+import argparse
+import sys
+import typing
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Connection
+
+from app.database import models
+
+
+def create_tables(connection: Connection):
+    models.Base.metadata.create_all(connection)
+
+
+def missing_tables(connection: Connection) -> typing.List[str]:
+    """
+    모델에는 있지만 DB에 없는 테이블 (조회 1번)
+    :param connection:
+    :return:
+    """
+    existing = set(inspect(connection).get_table_names())
+    return [table for table in models.Base.metadata.tables if table not in existing]
+
+
+def init_app(app: FastAPI, engine, mode: str = None):
+    """
+    시작 시 schema 처리 (startup 시점에 실행, import 시점에는 DB 접속 안함)
+    :param app:
+    :param engine: Engine or AsyncEngine
+    :param mode: create(없는 테이블 생성, 로컬), check(없는 테이블이 있으면 시작 실패), None(prod, 아무것도 안함)
+    :return:
+    """
+    if mode not in ("create", "check"):
+        return
+
+    def run(connection: Connection):
+        if mode == "create":
+            create_tables(connection)
+            return
+        missing = missing_tables(connection)
+        if missing:
+            raise RuntimeError(f"missing tables {missing}, run 'python -m app.database.schema create'")
+
+    @app.on_event("startup")
+    async def schema_startup():
+        if hasattr(engine, "sync_engine"):
+            async with engine.begin() as connection:
+                await connection.run_sync(run)
+        else:
+            with engine.begin() as connection:
+                run(connection)
+
+
+def main():
+    from app.common.config import conf_setting
+
+    parser = argparse.ArgumentParser(description="DB schema 관리")
+    parser.add_argument("command", choices=["create", "check"])
+    parser.add_argument("--db-url", default=None, help="없으면 API_ENV config의 DB_URL")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url or conf_setting().DB_URL)
+    try:
+        with engine.begin() as connection:
+            if args.command == "create":
+                create_tables(connection)
+                print("tables created")
+                return 0
+            missing = missing_tables(connection)
+            if missing:
+                print(f"missing tables: {missing}", file=sys.stderr)
+                return 1
+            print("schema ok")
+            return 0
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,9 @@
-from app.common.consts import MAX_API_KEY
+import json
+import math
+
+from starlette.types import Send
+
+from app.common.consts import MAX_API_KEY, MAX_BULK_SIZE, API_KEY_TIMESTAMP_TOLERANCE
 
 
 class StatusCode:
@@ -8,6 +13,12 @@ class StatusCode:
     HTTP_403 = 403
     HTTP_404 = 404
     HTTP_405 = 405
+    HTTP_429 = 429
+    HTTP_503 = 503
+
+
+# (status_code, code, msg) -> 직렬화된 응답 body 앞부분, 예외 class 별로 한번만 만듦
+_BODY_PREFIXES = {}
 
 
 class APIException(Exception):
@@ -15,6 +26,8 @@ class APIException(Exception):
     code: str
     msg: str
     detail: str
+    # 추가 응답 헤더
+    headers: dict = None
 
     def __init__(self, *, status_code: int = StatusCode.HTTP_500, code: str = "0000000", msg: str = None, detail: str = None, ex: Exception = None):
         self.status_code = status_code
@@ -24,6 +37,38 @@ class APIException(Exception):
         self.ex = ex
         super().__init__(ex)
 
+    def body(self) -> bytes:
+        """
+        에러 응답 body (JSON: status_code, code, msg, detail)
+        detail 외의 고정 값은 미리 직렬화한 bytes 재사용
+        :return:
+        """
+        key = (self.status_code, self.code, self.msg)
+        prefix = _BODY_PREFIXES.get(key)
+        if prefix is None:
+            prefix = _BODY_PREFIXES[key] = _dumps(dict(status_code=self.status_code, code=self.code, msg=self.msg))[:-1] + b',"detail":'
+        return prefix + _dumps(self.detail) + b"}"
+
+
+def _dumps(value) -> bytes:
+    # JSONResponse와 같은 형식
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+async def send_error(send: Send, error: APIException):
+    """
+    Response 객체 없이 에러 응답 전송 (middleware 용)
+    :param send:
+    :param error:
+    :return:
+    """
+    body = error.body()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("latin-1"))]
+    if error.headers:
+        headers += [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in error.headers.items()]
+    await send(dict(type="http.response.start", status=error.status_code, headers=headers))
+    await send(dict(type="http.response.body", body=body))
+
 
 class NotFoundUserEx(APIException):
     def __init__(self, user_id: int = None, ex: Exception = None):
@@ -58,6 +103,17 @@ class TokenExpiredEx(APIException):
         )
 
 
+class TokenRevokedEx(APIException):
+    def __init__(self, ex: Exception = None):
+        super().__init__(
+            status_code=StatusCode.HTTP_401,
+            code=f"{StatusCode.HTTP_401}{'2'.zfill(4)}",
+            msg="로그아웃 된 토큰 입니다. 다시 로그인 해주세요.",
+            detail="Token Revoked",
+            ex=ex,
+        )
+
+
 class TokenDecodeEx(APIException):
     def __init__(self, ex: Exception = None):
         super().__init__(
@@ -89,3 +145,94 @@ class NoAPIKeyMatchEx(APIException):
             detail="No Match API Key",
             ex=ex,
         )
+
+
+class MaxBulkSizeEx(APIException):
+    def __init__(self, ex: Exception = None):
+        super().__init__(
+            status_code=StatusCode.HTTP_400,
+            code=f"{StatusCode.HTTP_400}{'6'.zfill(4)}",
+            msg=f"한번에 최대 {MAX_BULK_SIZE}개까지 처리 가능합니다.",
+            detail="Max Bulk Size Exceeded",
+            ex=ex,
+        )
+
+
+class APIQueryStringEx(APIException):
+    def __init__(self, ex: Exception = None):
+        super().__init__(
+            status_code=StatusCode.HTTP_400,
+            code=f"{StatusCode.HTTP_400}{'7'.zfill(4)}",
+            msg="쿼리스트링에 key, timestamp 가 모두 포함되어야 합니다.",
+            detail="Query String must include key and timestamp.",
+            ex=ex,
+        )
+
+
+class APIHeaderInvalidEx(APIException):
+    def __init__(self, ex: Exception = None):
+        super().__init__(
+            status_code=StatusCode.HTTP_400,
+            code=f"{StatusCode.HTTP_400}{'8'.zfill(4)}",
+            msg="헤더에 키 해싱된 Secret 이 없거나, 유효하지 않습니다.",
+            detail="Invalid HMAC secret in Header",
+            ex=ex,
+        )
+
+
+class APITimestampEx(APIException):
+    def __init__(self, ex: Exception = None):
+        super().__init__(
+            status_code=StatusCode.HTTP_400,
+            code=f"{StatusCode.HTTP_400}{'9'.zfill(4)}",
+            msg=f"쿼리스트링에 포함된 타임스탬프(unix time, 초)는 현재 시간 ±{API_KEY_TIMESTAMP_TOLERANCE}초 이내여야 합니다.",
+            detail=f"timestamp in Query String must be unix time within {API_KEY_TIMESTAMP_TOLERANCE} seconds of now.",
+            ex=ex,
+        )
+
+
+class NotFoundAccessKeyEx(APIException):
+    def __init__(self, api_key: str = None, ex: Exception = None):
+        super().__init__(
+            status_code=StatusCode.HTTP_404,
+            code=f"{StatusCode.HTTP_404}{'1'.zfill(4)}",
+            msg="API 키를 찾을 수 없습니다.",
+            detail=f"Not found such API Access Key : {api_key}",
+            ex=ex,
+        )
+
+
+class NotAllowedIPEx(APIException):
+    def __init__(self, ip: str = None, ex: Exception = None):
+        super().__init__(
+            status_code=StatusCode.HTTP_403,
+            code=f"{StatusCode.HTTP_403}{'1'.zfill(4)}",
+            msg="허용되지 않은 IP 입니다.",
+            detail=f"Not allowed IP : {ip}",
+            ex=ex,
+        )
+
+
+class TooManyRequestsEx(APIException):
+    def __init__(self, retry_after: float = None, ex: Exception = None):
+        # 응답 Retry-After 헤더(초)
+        self.retry_after = max(1, math.ceil(retry_after or 0))
+        self.headers = {"Retry-After": str(self.retry_after)}
+        super().__init__(
+            status_code=StatusCode.HTTP_429,
+            code=f"{StatusCode.HTTP_429}{'1'.zfill(4)}",
+            msg="요청이 너무 많습니다. 잠시 후 다시 시도해주세요.",
+            detail=f"Too Many Requests, retry after {self.retry_after} seconds",
+            ex=ex,
+        )
+
+
+class HashQueueFullEx(APIException):
+    def __init__(self, ex: Exception = None):
+        super().__init__(
+            status_code=StatusCode.HTTP_503,
+            code=f"{StatusCode.HTTP_503}{'1'.zfill(4)}",
+            msg="요청이 많아 잠시 후 다시 시도해주세요.",
+            detail="Password Hash Queue Full",
+            ex=ex,
+        )
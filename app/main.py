@@ -1,18 +1,25 @@
 from dataclasses import asdict
 
-import uvicorn
 from fastapi import FastAPI, Depends
 from fastapi.security import APIKeyHeader
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.cors import CORSMiddleware
 
-from app.database import models
+from app.database import schema
+from app.database.cache import cache
 from app.database.conn import db
 
 from app.common.config import conf_setting
-from app.middlewares.token_validation import access_control_middleware
+from app.common.fast_json import fast_json
+from app.common.password import hasher
+from app.middlewares.api_key_cache import api_key_cache
+from app.middlewares.metrics import MetricsMiddleware, prometheus
+from app.middlewares.rate_limit import RateLimitMiddleware, rate_limiter
+from app.middlewares.token_cache import token_cache
+from app.middlewares.token_revocation import revocation_list
+from app.middlewares.token_validation import AccessControlMiddleware
 from app.middlewares.trusted_hosts import TrustedHostsMiddleware
-from app.routers import index, auth, user
+from app.routers import index, auth, user, internal
+from utils.logger import access_log
 
 API_KEY_HEADER = APIKeyHeader(name="Authorization", auto_error=False)
 
@@ -29,19 +36,44 @@ def create_app():
     # 데이터베이스
     db.init_app(app, **config_setting_dict)
     # Database init 이후 engine 설정되어 있음
-    # Database Model Table 생성
-    models.Base.metadata.create_all(bind=db.engine)
+    # Table 생성은 migration 단계(python -m app.database.schema create), 시작 시에는 설정에 따라 생성/확인만
+    schema.init_app(app, db.engine, mode=config_setting.DB_SCHEMA_STARTUP)
 
-    # 레디스
+    # 요청 latency / DB 시간 metrics
+    prometheus.init_app(app, **config_setting_dict)
+    for engine in db.sync_engines:
+        prometheus.instrument_engine(engine)
+
+    # 비밀번호 해시 worker pool
+    hasher.init_app(app, **config_setting_dict)
+
+    # access log background writer
+    access_log.init_app(app, **config_setting_dict)
+
+    # JWT 검증 캐시
+    token_cache.init_app(app, **config_setting_dict)
+    # API Key 인증 캐시
+    api_key_cache.init_app(app, **config_setting_dict)
+    # logout 된 access token 목록
+    revocation_list.init_app(app, **config_setting_dict)
+
+    # 레디스 (CACHE_BACKEND=redis, 로컬은 memory)
+    cache.init_app(app, **config_setting_dict)
+
+    # 요청 수 제한
+    rate_limiter.init_app(app, **config_setting_dict)
 
     # 미들웨어
     # 미들웨어의 경우 stack이기 때문에 가장 나중에 add 된 middleware부터 실행됨
+    # 4. 요청 수 제한 (3에서 설정한 API Key / 유저 / IP 기준)
+    app.add_middleware(RateLimitMiddleware)
     # 3. User Access Token 검사
-    app.add_middleware(middleware_class=BaseHTTPMiddleware, dispatch=access_control_middleware)
+    #    /internal 은 token 대신 요청 IP가 INTERNAL_NETWORKS 안인지 확인
+    app.add_middleware(AccessControlMiddleware, trusted_proxies=config_setting.TRUSTED_PROXIES, internal_networks=config_setting.INTERNAL_NETWORKS)
     # 2. CORS 검사
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=conf_setting().ALLOW_SITE,
+        allow_origins=config_setting.ALLOW_SITE,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
@@ -49,19 +81,27 @@ def create_app():
     # 1. HOST 검사
     app.add_middleware(
         TrustedHostsMiddleware,
-        allowed_hosts=conf_setting().TRUSTED_HOSTS,
-        except_path=["/health"],
+        allowed_hosts=config_setting.TRUSTED_HOSTS,
+        except_path=["/health", "/metrics"],
+        allowed_hosts_file=config_setting.TRUSTED_HOSTS_FILE,
+        reload_interval=config_setting.TRUSTED_HOSTS_RELOAD_INTERVAL,
     )
+    # 0. 요청 latency / in-flight metrics (거절된 요청 포함)
+    app.add_middleware(MetricsMiddleware)
 
     # 라우터
-    # 라우터 추가
+    # 라우터 추가 (fast_json: jsonable_encoder 없이 검증된 model을 바로 JSON bytes로 직렬화)
     app.include_router(index.router)
     app.include_router(auth.router, tags=["Authentication"], prefix="/api")
-    app.include_router(user.router, tags=["User"], prefix="/api", dependencies=[Depends(API_KEY_HEADER)])
+    app.include_router(fast_json(user.router), tags=["User"], prefix="/api", dependencies=[Depends(API_KEY_HEADER)])
+    app.include_router(fast_json(internal.router), tags=["Internal"], prefix="/internal", include_in_schema=False)
     return app
 
 
 app = create_app()
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=conf_setting().PROJ_RELOAD)
+    # 운영은 python -m app.server (multi worker)
+    from app import server
+
+    server.run()
@@ -0,0 +1,170 @@
+import time
+from collections import OrderedDict
+from ipaddress import ip_address, ip_network
+from typing import Iterable
+
+from fastapi import FastAPI
+
+from app.schema import UserToken
+
+
+class IPWhitelist:
+    """
+    whitelist IP/CIDR 목록을 (ip version, host bit 수)별 network 정수 set으로 컴파일
+    IP 검사는 등록된 prefix 길이 개수만큼의 shift + set 조회 (whitelist 크기와 무관)
+    """
+
+    __slots__ = ("_networks",)
+
+    def __init__(self, addresses: Iterable[str]):
+        networks = {}
+        for address in addresses:
+            try:
+                network = ip_network(address.strip(), strict=False)
+            except ValueError:
+                continue
+            host_bits = network.max_prefixlen - network.prefixlen
+            networks.setdefault((network.version, host_bits), set()).add(int(network.network_address) >> host_bits)
+        self._networks = [(version, host_bits, frozenset(network_set)) for (version, host_bits), network_set in networks.items()]
+
+    def match(self, ip: str) -> bool:
+        try:
+            address = ip_address(ip.strip())
+        except ValueError:
+            return False
+        value = int(address)
+        for version, host_bits, networks in self._networks:
+            if version == address.version and value >> host_bits in networks:
+                return True
+        return False
+
+
+class ApiKeyEntry:
+    """
+    API Key 인증에 필요한 값 (status, secret, whitelist, 소유 유저)
+    """
+
+    __slots__ = ("key_id", "secret_key", "status", "whitelist", "user")
+
+    def __init__(self, key_id: int, secret_key: str, status: str, whitelist: IPWhitelist | None, user: UserToken):
+        self.key_id = key_id
+        self.secret_key = secret_key.encode("utf-8")
+        self.status = status
+        self.whitelist = whitelist
+        self.user = user
+
+
+class ApiKeyCache:
+    """
+    access_key -> ApiKeyEntry LRU 캐시
+    없는 access_key도 None으로 캐시해 잘못된 key 반복 요청이 DB로 가지 않도록 함 (replica가 있으면 primary에서 확인된 경우만)
+    /apikeys 에서 key 생성/변경 시 invalidate, 다른 worker의 변경/삭제는 API_KEY_CACHE_TTL 이내 반영
+    (status / secret_key가 들어있는 entry는 짧게, 없는 key는 API_KEY_CACHE_MISS_TTL 동안 유지)
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._entries = OrderedDict()
+        self._access_keys = {}
+        self._max_size = 0
+        self._ttl = 5
+        self._miss_ttl = 60
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        API Key cache 초기화
+        :param app:
+        :param kwargs: API_KEY_CACHE_SIZE (0이면 캐시 사용 안함), API_KEY_CACHE_TTL, API_KEY_CACHE_MISS_TTL
+        :return:
+        """
+        self._max_size = kwargs.setdefault("API_KEY_CACHE_SIZE", 10000)
+        self._ttl = kwargs.setdefault("API_KEY_CACHE_TTL", 5)
+        self._miss_ttl = kwargs.setdefault("API_KEY_CACHE_MISS_TTL", 60)
+        self.clear()
+
+        @app.on_event("shutdown")
+        def shutdown():
+            self.clear()
+
+    def get(self, access_key: str) -> tuple[bool, ApiKeyEntry | None]:
+        """
+        :param access_key:
+        :return: (캐시 여부, entry), 없는 access_key는 (True, None)
+        """
+        cached = self._entries.get(access_key)
+        if cached is None or cached[1] <= time.monotonic():
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(access_key)
+        self.hits += 1
+        return True, cached[0]
+
+    def set(self, access_key: str, entry: ApiKeyEntry | None):
+        if not self._max_size:
+            return
+        self._pop(access_key)
+        self._entries[access_key] = (entry, time.monotonic() + (self._miss_ttl if entry is None else self._ttl))
+        if entry is not None:
+            self._access_keys[entry.key_id] = access_key
+        if len(self._entries) > self._max_size:
+            self._pop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, key_ids: Iterable[int]):
+        """
+        변경/삭제된 API Key 캐시 제거
+        :param key_ids: ApiKeys.id 목록
+        :return:
+        """
+        for key_id in key_ids:
+            access_key = self._access_keys.get(key_id)
+            if access_key is not None and self._pop(access_key):
+                self.invalidations += 1
+
+    def invalidate_access_keys(self, access_keys: Iterable[str]):
+        """
+        새로 만든 API Key의 캐시(없는 key로 캐시된 항목) 제거
+        :param access_keys:
+        :return:
+        """
+        for access_key in access_keys:
+            if self._pop(access_key):
+                self.invalidations += 1
+
+    def _pop(self, access_key: str) -> bool:
+        cached = self._entries.pop(access_key, None)
+        if cached is None:
+            return False
+        if cached[0] is not None:
+            self._access_keys.pop(cached[0].key_id, None)
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self._access_keys.clear()
+
+    @property
+    def enabled(self):
+        return bool(self._max_size)
+
+    def stats(self) -> dict:
+        return dict(
+            size=len(self._entries),
+            max_size=self._max_size,
+            ttl=self._ttl,
+            miss_ttl=self._miss_ttl,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            invalidations=self.invalidations,
+        )
+
+
+api_key_cache = ApiKeyCache()
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.metrics import RequestMetrics
+
+# 요청 단위 DB 시간 누적 [소요 시간(초), query 수]
+_db_timer: ContextVar = ContextVar("db_timer", default=None)
+
+
+class PrometheusMetrics:
+    """
+    요청 latency / in-flight / DB 시간 수집 및 Prometheus text 출력
+    METRICS_DIR 설정 시 worker별 snapshot 파일을 주기적으로 기록하고 조회 시 합산 (multi worker)
+    종료된 worker 값도 합산(재시작된 worker가 있어도 counter 유지), 이전 실행의 snapshot은 app.server 시작 시 clear_snapshots로 삭제
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self.requests = RequestMetrics()
+        self._metrics_dir = None
+        self._flush_interval = 5
+        self._flush_task = None
+
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Metrics 초기화
+        :param app:
+        :param kwargs: METRICS_DIR, METRICS_FLUSH_INTERVAL
+        :return:
+        """
+        self._metrics_dir = kwargs.setdefault("METRICS_DIR", None)
+        self._flush_interval = kwargs.setdefault("METRICS_FLUSH_INTERVAL", 5)
+        if not self._metrics_dir:
+            return
+        os.makedirs(self._metrics_dir, exist_ok=True)
+
+        @app.on_event("startup")
+        async def startup():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+        @app.on_event("shutdown")
+        async def shutdown():
+            if self._flush_task is not None:
+                self._flush_task.cancel()
+            self.requests.in_flight.clear()
+            self.flush()
+
+    def instrument_engine(self, engine: Engine):
+        """
+        SQLAlchemy engine 이벤트로 요청별 DB 시간 측정
+        :param engine: 동기 Engine (AsyncEngine은 sync_engine)
+        :return:
+        """
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info["query_start"].pop()
+            timer = _db_timer.get()
+            if timer is not None:
+                timer[0] += elapsed
+                timer[1] += 1
+
+    def flush(self):
+        """
+        현재 worker snapshot 파일 기록 (원자적 교체)
+        :return:
+        """
+        if not self._metrics_dir:
+            return
+        path = os.path.join(self._metrics_dir, f"metrics_{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.requests.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                logging.error(f"Metrics flush failed: {e}")
+
+    def render(self) -> str:
+        if not self._metrics_dir:
+            return self.requests.render()
+
+        # 현재 worker는 메모리 값, 다른 worker는 snapshot 파일 값
+        merged = RequestMetrics(self.requests.buckets)
+        merged.merge(self.requests.snapshot())
+        own_file = f"metrics_{os.getpid()}.json"
+        for file_name in os.listdir(self._metrics_dir):
+            if not file_name.startswith("metrics_") or not file_name.endswith(".json") or file_name == own_file:
+                continue
+            try:
+                with open(os.path.join(self._metrics_dir, file_name)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            # 종료된 worker의 in-flight 값은 제외
+            pid = int(file_name[len("metrics_") : -len(".json")])
+            if not pid_alive(pid):
+                snapshot["in_flight"] = {}
+            merged.merge(snapshot)
+        return merged.render()
+
+
+class MetricsMiddleware:
+    """
+    요청 latency(route/method/status), in-flight, 요청별 DB 시간 기록
+    route는 라우팅 후 scope["route"]의 path template 사용 (매칭 실패 시 "unmatched")
+    """
+
+    def __init__(self, app: ASGIApp, metrics: PrometheusMetrics = None) -> None:
+        self.app = app
+        self.metrics = metrics or prometheus
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":  # pragma: no cover
+            await self.app(scope, receive, send)
+            return
+
+        requests = self.metrics.requests
+        method = scope["method"]
+        status_code = 500
+        timer = [0.0, 0]
+        token = _db_timer.set(timer)
+        requests.request_started(method)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _db_timer.reset(token)
+            route = scope.get("route")
+            requests.request_finished(
+                route.path if route is not None else "unmatched",
+                method,
+                status_code,
+                elapsed,
+                timer[0],
+                timer[1],
+            )
+
+
+def clear_snapshots(metrics_dir: str):
+    """
+    이전 실행에서 남은 worker snapshot 파일 삭제 (worker 시작 전에 호출)
+    :param metrics_dir:
+    :return:
+    """
+    if not metrics_dir or not os.path.isdir(metrics_dir):
+        return
+    for file_name in os.listdir(metrics_dir):
+        if file_name.startswith("metrics_") and (file_name.endswith(".json") or file_name.endswith(".json.tmp")):
+            try:
+                os.remove(os.path.join(metrics_dir, file_name))
+            except FileNotFoundError:
+                pass
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+prometheus = PrometheusMetrics()
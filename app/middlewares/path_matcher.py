@@ -0,0 +1,44 @@
+import re
+import typing
+
+
+class PathMatcher:
+    """
+    예외 경로 매칭 규칙을 시작 시점에 한번만 컴파일
+    - exact : set 조회
+    - prefix: 길이별 set 조회 (path[:길이] in set)
+    - regex : 하나의 compiled regex로 합침
+    """
+
+    __slots__ = ("_exact", "_prefixes", "_regex")
+
+    def __init__(
+        self,
+        exact: typing.Iterable[str] = None,
+        prefix: typing.Iterable[str] = None,
+        regex: typing.Iterable[str] | str = None,
+    ) -> None:
+        self._exact = frozenset(exact or ())
+
+        prefixes_by_length = {}
+        for path in prefix or ():
+            prefixes_by_length.setdefault(len(path), set()).add(path)
+        self._prefixes = tuple((length, frozenset(paths)) for length, paths in sorted(prefixes_by_length.items()))
+
+        if isinstance(regex, str):
+            regex = [regex]
+        patterns = [pattern for pattern in regex or () if pattern]
+        self._regex = re.compile("|".join(f"(?:{pattern})" for pattern in patterns)) if patterns else None
+
+    def match(self, path: str) -> bool:
+        if path in self._exact:
+            return True
+        for length, paths in self._prefixes:
+            if path[:length] in paths:
+                return True
+        if self._regex is not None:
+            return self._regex.match(path) is not None
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self._exact or self._prefixes or self._regex)
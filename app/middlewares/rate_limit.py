@@ -0,0 +1,249 @@
+import logging
+import time
+import typing
+from itertools import islice
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.common.consts import RATE_LIMIT_RULES
+from app.common.context import request_context
+from app.errors import exceptions as ex
+
+
+class RateLimitRule:
+    """
+    path prefix 별 token bucket 설정 (capacity: 최대 연속 요청 수, rate: 초당 충전 token 수)
+    """
+
+    __slots__ = ("prefix", "capacity", "rate")
+
+    def __init__(self, prefix: str, requests: int, seconds: float):
+        self.prefix = prefix
+        self.capacity = requests
+        self.rate = requests / seconds
+
+
+class MemoryTokenBucket:
+    """
+    process 내부 token bucket
+    take()는 await 지점이 없어 이벤트 루프 안에서 lock 없이 원자적으로 동작
+    key 수가 max_keys에 도달하면 가득 찬(초기 상태와 같은) bucket 부터 정리, 그래도 많으면 오래 사용하지 않은 key부터 정리
+    (전체 삭제하면 key를 바꿔가며 요청하는 client 하나가 모든 bucket을 초기화할 수 있음)
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        # key -> (token 수, 갱신 시각, 가득 차는 시각), 사용할 때마다 다시 넣어 오래 사용하지 않은 순서 유지
+        self._buckets = {}
+        self._max_keys = max_keys
+        self.evictions = 0
+
+    async def take(self, key: str, capacity: int, rate: float) -> float:
+        """
+        token 1개 사용
+        :return: 0이면 허용, 아니면 다음 token까지 남은 시간(초)
+        """
+        now = time.monotonic()
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            tokens = capacity
+            if len(self._buckets) >= self._max_keys:
+                self._sweep(now)
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+
+        retry_after = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+        return retry_after
+
+    def _sweep(self, now: float):
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        # 매번 정리하지 않도록 max_keys의 90%까지 줄임
+        overflow = len(self._buckets) - self._max_keys * 9 // 10
+        if overflow > 0:
+            for key in list(islice(self._buckets, overflow)):
+                del self._buckets[key]
+            self.evictions += overflow
+
+    async def close(self):
+        self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class RedisTokenBucket:
+    """
+    worker 간 공유 token bucket (Lua script로 조회/갱신을 원자적으로 처리, 시간은 Redis 서버 기준)
+    client를 넘기면 그대로 사용 (ex. fakeredis.aioredis.FakeRedis)
+    """
+
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = redis.call("TIME")
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+    def __init__(self, url: str = None, client=None, prefix: str = "ratelimit:"):
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self._script = client.register_script(self.SCRIPT)
+        self._prefix = prefix
+
+    async def take(self, key: str, capacity: int, rate: float) -> float:
+        return float(await self._script(keys=[f"{self._prefix}{key}"], args=[capacity, rate]))
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class RateLimiter:
+    """
+    요청 수 제한 규칙 + token bucket backend
+    shared backend(redis) 장애 시에는 요청을 허용하고 errors 증가
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._backend = None
+        self._rules: typing.List[RateLimitRule] = []
+        self.allowed = 0
+        self.rejected = 0
+        self.errors = 0
+
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Rate limiter 초기화
+        :param app:
+        :param kwargs: RATE_LIMIT_BACKEND(memory/redis, 없으면 사용 안함), RATE_LIMIT_REDIS_URL, RATE_LIMIT_MAX_KEYS, RATE_LIMIT_RULES
+        :return:
+        """
+        backend = kwargs.setdefault("RATE_LIMIT_BACKEND", "memory")
+        if backend == "redis":
+            self._backend = RedisTokenBucket(url=kwargs.get("RATE_LIMIT_REDIS_URL") or "redis://localhost:6379/0")
+        elif backend == "memory":
+            self._backend = MemoryTokenBucket(max_keys=kwargs.setdefault("RATE_LIMIT_MAX_KEYS", 100000))
+        else:
+            self._backend = None
+        self.set_rules(kwargs.get("RATE_LIMIT_RULES") or RATE_LIMIT_RULES)
+
+        @app.on_event("shutdown")
+        async def shutdown():
+            if self._backend is not None:
+                await self._backend.close()
+
+    def set_rules(self, rules: typing.Iterable[typing.Tuple[str, int, float]]):
+        self._rules = [RateLimitRule(*rule) for rule in rules]
+
+    def set_backend(self, backend):
+        self._backend = backend
+
+    def match(self, path: str) -> RateLimitRule | None:
+        for rule in self._rules:
+            if path.startswith(rule.prefix):
+                return rule
+        return None
+
+    async def take(self, key: str, rule: RateLimitRule) -> float:
+        """
+        :param key: 제한 단위 (API Key / 유저 / IP)
+        :param rule:
+        :return: 0이면 허용, 아니면 Retry-After(초)
+        """
+        try:
+            retry_after = await self._backend.take(f"{rule.prefix}:{key}", rule.capacity, rule.rate)
+        except Exception:
+            logging.exception("rate limit backend failed")
+            self.errors += 1
+            retry_after = 0
+
+        if retry_after:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    @property
+    def enabled(self):
+        return self._backend is not None and bool(self._rules)
+
+    def stats(self) -> dict:
+        return dict(
+            backend=self._backend.__class__.__name__ if self._backend else None,
+            rules=[dict(prefix=rule.prefix, capacity=rule.capacity, rate=rule.rate) for rule in self._rules],
+            allowed=self.allowed,
+            rejected=self.rejected,
+            errors=self.errors,
+            evictions=getattr(self._backend, "evictions", None),
+        )
+
+
+rate_limiter = RateLimiter()
+
+
+class RateLimitMiddleware:
+    """
+    요청 수 제한
+    AccessControlMiddleware 안쪽에서 실행되어 RequestContext의 API Key / 유저 / IP 단위로 제한
+    """
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter = None) -> None:
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.limiter.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.limiter.match(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = await self.limiter.take(client_key(scope), rule)
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        await ex.send_error(send, ex.TooManyRequestsEx(retry_after))
+
+
+def client_key(scope: Scope) -> str:
+    """
+    제한 단위: API Key 인증 -> access key, JWT 인증 -> user id, 그 외 -> IP
+    :param scope:
+    :return:
+    """
+    context = request_context()
+    if context is None:
+        client = scope.get("client")
+        return f"ip:{client[0] if client else ''}"
+    if context.api_key:
+        return f"key:{context.api_key}"
+    if context.user is not None:
+        return f"user:{context.user.id}"
+    return f"ip:{context.ip}"
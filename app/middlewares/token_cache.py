@@ -0,0 +1,89 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from fastapi import FastAPI
+
+from app.schema import UserToken
+
+
+class TokenCache:
+    """
+    검증이 끝난 access token -> UserToken LRU 캐시
+    key는 token 원문 대신 digest, 토큰 exp가 지나면 캐시에서 제거
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._entries = OrderedDict()
+        self._max_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Token cache 초기화
+        :param app:
+        :param kwargs: TOKEN_CACHE_SIZE (0이면 캐시 사용 안함)
+        :return:
+        """
+        self._max_size = kwargs.setdefault("TOKEN_CACHE_SIZE", 10000)
+        self.clear()
+
+        @app.on_event("shutdown")
+        def shutdown():
+            self.clear()
+
+    @staticmethod
+    def key(access_token: str) -> bytes:
+        return hashlib.blake2b(access_token.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: bytes) -> UserToken | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        user, exp = entry
+        if exp is not None and exp <= time.time():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user
+
+    def set(self, key: bytes, user: UserToken, exp: float = None):
+        if not self._max_size:
+            return
+        self._entries[key] = (user, exp)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def enabled(self):
+        return bool(self._max_size)
+
+    def stats(self) -> dict:
+        return dict(
+            size=len(self._entries),
+            max_size=self._max_size,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+        )
+
+
+token_cache = TokenCache()
@@ -0,0 +1,314 @@
+import asyncio
+import logging
+import math
+from array import array
+from datetime import datetime
+from itertools import accumulate
+from typing import Iterable
+
+from fastapi import FastAPI
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database.conn import db, run_in_session
+from app.database.models import RevokedTokens
+from app.database.routing import use_primary
+
+MASK64 = (1 << 64) - 1
+
+
+def jti_key(jti: str) -> int | None:
+    """
+    jti(uuid4 hex) -> 128bit 정수, 다른 형식이면 None (create_access_token에서 발급한 jti만 폐기 대상)
+    :param jti:
+    :return:
+    """
+    if len(jti) == 32:
+        try:
+            return int(jti, 16)
+        except ValueError:
+            pass
+    return None
+
+
+class BloomFilter:
+    """
+    jti 문자열 Bloom filter (bytearray, hash 2개)
+    hash는 process 내장 str hash(SipHash, 문자열 객체에 캐시됨)의 하위/상위 32bit
+    -> process마다 값이 달라도 filter가 process 안에만 있으므로 문제 없음
+    bit 수는 2의 거듭제곱 (나머지 연산 대신 mask)
+    """
+
+    __slots__ = ("_bits", "_mask", "capacity")
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        # hash 2개일 때 오탐률 (1 - e^(-2n/m))^2 = error_rate
+        ratio = -2 / math.log(1 - math.sqrt(error_rate))
+        size = 1 << max(6, math.ceil(math.log2(max(1, capacity) * ratio)))
+        self._mask = size - 1
+        self._bits = bytearray(size >> 3)
+        # 2의 거듭제곱으로 올린 크기 기준 실제 수용 개수
+        self.capacity = int(size / ratio)
+
+    def add(self, value: str):
+        value_hash, mask, bits = hash(value), self._mask, self._bits
+        position = value_hash & mask
+        bits[position >> 3] |= 1 << (position & 7)
+        position = (value_hash >> 32) & mask
+        bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        value_hash, mask, bits = hash(value), self._mask, self._bits
+        position = value_hash & mask
+        if not bits[position >> 3] >> (position & 7) & 1:
+            return False
+        position = (value_hash >> 32) & mask
+        return bits[position >> 3] >> (position & 7) & 1 == 1
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class RevokedSet:
+    """
+    폐기된 jti key 전체 (정확한 판정용)
+    정렬된 array('Q') 2개(상위/하위 64bit, key 당 16 byte) + 상위 bit prefix 별 시작 위치(array('I'), key 당 4 byte 이하)
+    key가 난수(uuid4)라 prefix 당 평균 1개 이하 -> 조회는 prefix 위치에서 몇 개만 비교
+    최근 추가분은 set에 두고 merge_size 이상이면 다시 만듦
+    """
+
+    __slots__ = ("_high", "_low", "_offsets", "_shift", "_recent", "_merge_size")
+
+    def __init__(self, keys: Iterable[int] = (), merge_size: int = 4096):
+        self._merge_size = merge_size
+        self._rebuild(keys)
+
+    def _rebuild(self, keys: Iterable[int]):
+        keys = sorted(set(keys))
+        self._high = array("Q", (key >> 64 for key in keys))
+        self._low = array("Q", (key & MASK64 for key in keys))
+        # prefix 개수는 key 개수 이하의 2의 거듭제곱
+        prefix_bits = max(0, len(keys).bit_length() - 1)
+        self._shift = 64 - prefix_bits
+        counts = array("I", bytes(4 * ((1 << prefix_bits) + 1)))
+        for high in self._high:
+            counts[(high >> self._shift) + 1] += 1
+        self._offsets = array("I", accumulate(counts))
+        self._recent = set()
+
+    def add(self, key: int):
+        if key in self:
+            return
+        self._recent.add(key)
+        if len(self._recent) >= self._merge_size:
+            self._rebuild(list(self))
+
+    def __contains__(self, key: int) -> bool:
+        if key in self._recent:
+            return True
+        high, low = key >> 64, key & MASK64
+        prefix = high >> self._shift
+        for index in range(self._offsets[prefix], self._offsets[prefix + 1]):
+            if self._high[index] == high and self._low[index] == low:
+                return True
+        return False
+
+    def __iter__(self):
+        for high, low in zip(self._high, self._low):
+            yield (high << 64) | low
+        yield from self._recent
+
+    def __len__(self):
+        return len(self._high) + len(self._recent)
+
+    @property
+    def nbytes(self) -> int:
+        return self._high.itemsize * (len(self._high) + len(self._low)) + self._offsets.itemsize * len(self._offsets)
+
+
+class RevocationList:
+    """
+    폐기된 access token(jti) 목록
+    revoked_tokens 테이블을 시작 시 전체 로드, 이후 id 기준 증분 polling (다른 worker의 logout 반영)
+    조회는 Bloom filter -> (있을 수도 있을 때만) 정렬 array 순서, DB 조회 없음
+    polling 실패 시 기존 목록 유지, RELOAD_INTERVAL 마다 만료된 항목을 정리하며 전체 재로드
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._error_rate = 0.01
+        self._bloom: BloomFilter = None
+        self._revoked: RevokedSet = None
+        self.load(())
+        self._poll_interval = 1
+        self._poll_overlap = 100
+        self._poll_batch = 10000
+        self._reload_interval = 3600
+        self._last_id = 0
+        self._poll_task = None
+        self.bloom_positives = 0
+        self.revoked_hits = 0
+        self.errors = 0
+
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Token revocation 초기화
+        :param app:
+        :param kwargs: REVOCATION_POLL_INTERVAL(초, 0이면 polling 안함), REVOCATION_POLL_OVERLAP, REVOCATION_POLL_BATCH,
+                       REVOCATION_RELOAD_INTERVAL(초), REVOCATION_BLOOM_ERROR_RATE
+        :return:
+        """
+        self._poll_interval = kwargs.setdefault("REVOCATION_POLL_INTERVAL", 1)
+        self._poll_overlap = kwargs.setdefault("REVOCATION_POLL_OVERLAP", 100)
+        self._poll_batch = kwargs.setdefault("REVOCATION_POLL_BATCH", 10000)
+        self._reload_interval = kwargs.setdefault("REVOCATION_RELOAD_INTERVAL", 3600)
+        self._error_rate = kwargs.setdefault("REVOCATION_BLOOM_ERROR_RATE", 0.01)
+
+        @app.on_event("startup")
+        async def startup():
+            try:
+                await self.reload()
+            except Exception:
+                logging.exception("revoked token load failed")
+                self.errors += 1
+            if self._poll_interval:
+                self._poll_task = asyncio.create_task(self._poll_loop())
+
+        @app.on_event("shutdown")
+        async def shutdown():
+            if self._poll_task is not None:
+                self._poll_task.cancel()
+                self._poll_task = None
+
+    def is_revoked(self, jti: str) -> bool:
+        if jti not in self._bloom:
+            return False
+        # Bloom filter 양성(폐기 token 또는 오탐)만 정확히 확인
+        self.bloom_positives += 1
+        key = jti_key(jti)
+        if key is not None and key in self._revoked:
+            self.revoked_hits += 1
+            return True
+        return False
+
+    def add(self, jti: str):
+        """
+        현재 worker에 바로 반영 (logout 요청을 처리한 worker)
+        :param jti:
+        :return:
+        """
+        key = jti_key(jti)
+        if key is None or key in self._revoked:
+            return
+        self._revoked.add(key)
+        self._bloom.add(f"{key:032x}")
+        # 예상 개수를 넘으면 오탐률이 올라가므로 더 크게 재생성
+        if len(self._revoked) > self._bloom.capacity:
+            self.load(f"{key:032x}" for key in self._revoked)
+
+    def load(self, jtis: Iterable[str]):
+        """
+        전체 교체
+        :param jtis:
+        :return:
+        """
+        keys = [key for key in map(jti_key, jtis) if key is not None]
+        bloom = BloomFilter(max(1024, len(keys)), self._error_rate)
+        for key in keys:
+            bloom.add(f"{key:032x}")
+        self._revoked, self._bloom = RevokedSet(keys), bloom
+
+    async def reload(self):
+        """
+        만료된 항목 삭제 후 전체 재로드
+        :return:
+        """
+        last_id, jtis = await self._run(_load_revoked, None, self._poll_batch)
+        self.load(jtis)
+        self._last_id = last_id
+
+    async def poll(self) -> int:
+        """
+        마지막으로 읽은 id 이후 추가분 반영
+        auto increment id는 commit 순서와 다를 수 있어 마지막 id - REVOCATION_POLL_OVERLAP 부터 다시 읽음
+        :return: 읽은 개수
+        """
+        last_id, jtis = await self._run(_load_revoked, max(0, self._last_id - self._poll_overlap), self._poll_batch)
+        for jti in jtis:
+            self.add(jti)
+        self._last_id = max(self._last_id, last_id)
+        return len(jtis)
+
+    async def _poll_loop(self):
+        elapsed = 0
+        while True:
+            await asyncio.sleep(self._poll_interval)
+            elapsed += self._poll_interval
+            try:
+                if self._reload_interval and elapsed >= self._reload_interval:
+                    elapsed = 0
+                    await self.reload()
+                else:
+                    await self.poll()
+            except Exception:
+                logging.exception("revoked token poll failed")
+                self.errors += 1
+
+    @staticmethod
+    async def _run(fn, *args):
+        if db.is_async:
+            async with db.session_factory() as session:
+                return await run_in_session(session, fn, *args)
+        return await run_in_threadpool(_in_session, fn, *args)
+
+    def stats(self) -> dict:
+        return dict(
+            size=len(self._revoked),
+            last_id=self._last_id,
+            bloom_bytes=self._bloom.nbytes,
+            set_bytes=self._revoked.nbytes,
+            bloom_positives=self.bloom_positives,
+            revoked_hits=self.revoked_hits,
+            errors=self.errors,
+        )
+
+
+def _in_session(fn, *args):
+    with db.session_factory() as session:
+        return fn(session, *args)
+
+
+def _load_revoked(session: Session, after_id: int | None, batch: int) -> tuple:
+    """
+    만료 전 폐기 token 조회, after_id가 None이면 만료된 항목 삭제 후 전체 조회
+    :param session:
+    :param after_id:
+    :param batch: 한번에 읽는 row 수
+    :return: (마지막 id, jti 목록)
+    """
+    now = datetime.utcnow()
+    if after_id is None:
+        use_primary(session)
+        session.execute(delete(RevokedTokens).where(RevokedTokens.expires_at < now))
+        session.commit()
+
+    last_id, jtis = after_id or 0, []
+    while True:
+        rows = session.execute(
+            select(RevokedTokens.id, RevokedTokens.jti)
+            .where(RevokedTokens.id > last_id, or_(RevokedTokens.expires_at.is_(None), RevokedTokens.expires_at >= now))
+            .order_by(RevokedTokens.id)
+            .limit(batch)
+        ).all()
+        if rows:
+            last_id = rows[-1].id
+            jtis += [row.jti for row in rows]
+        if len(rows) < batch:
+            return last_id, jtis
+
+
+revocation_list = RevocationList()
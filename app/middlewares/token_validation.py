@@ -1,68 +1,252 @@
-import re
+import base64
+import hashlib
+import hmac
 import time
-from datetime import datetime
+from typing import Iterable
 
 import jwt
 from jwt import PyJWTError, ExpiredSignatureError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.common.consts import JWT_SECRET, JWT_ALGORITHM, EXCEPT_PATH_REGEX, EXCEPT_PATH_LIST
+from app.common.consts import JWT_SECRET, JWT_ALGORITHM, EXCEPT_PATH_LIST, EXCEPT_PATH_PREFIX, EXCEPT_PATH_REGEX, INTERNAL_PATH_PREFIX, API_KEY_TIMESTAMP_TOLERANCE
+from app.common.context import RequestContext, request_context, reset_request_context, set_request_context
+from app.database.conn import db, run_in_session
+from app.database.models import ApiKeys, ApiWhiteLists, Users
+from app.database.routing import use_primary
 from app.errors import exceptions as ex
+from app.middlewares.api_key_cache import ApiKeyEntry, IPWhitelist, api_key_cache
+from app.middlewares.path_matcher import PathMatcher
+from app.middlewares.token_cache import token_cache
+from app.middlewares.token_revocation import revocation_list
 from app.schema import UserToken
 from utils.logger import api_logger
 
 
-async def access_control_middleware(request: Request, next_call):
-    headers = request.headers
-    ip_from = headers.get("x-forwarded-for", request.client.host)
+class AccessControlMiddleware:
+    """
+    User Access Token 검사
+    BaseHTTPMiddleware 대신 ASGI middleware로 구현 (response body를 다시 buffering 하지 않음)
+    """
 
-    ip = ip_from.split(",")[0]
-    # request.state: custom additional information
-    now = datetime.now()
-    request.state.ip = ip
-    request.state.req_time = now
-    request.state.start = time.time()
-    request.state.inspect = None
-    request.state.user = None
-    request.state.is_admin_access = None
+    def __init__(
+        self,
+        app: ASGIApp,
+        except_path: PathMatcher = None,
+        trusted_proxies: Iterable[str] = (),
+        internal_networks: Iterable[str] = ("127.0.0.1/32", "::1/128"),
+    ) -> None:
+        self.app = app
+        if except_path is None:
+            except_path = PathMatcher(exact=EXCEPT_PATH_LIST, prefix=EXCEPT_PATH_PREFIX, regex=EXCEPT_PATH_REGEX)
+        self.except_path = except_path
+        self.trusted_proxies = IPWhitelist(trusted_proxies)
+        self.internal_networks = IPWhitelist(internal_networks)
 
-    url = request.url.path
-    if await url_pattern_check(url, EXCEPT_PATH_REGEX) or url in EXCEPT_PATH_LIST:
-        response = await next_call(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":  # pragma: no cover
+            await self.app(scope, receive, send)
+            return
 
-        if url == "/":
-            await api_logger(request, response)
+        # 요청 정보는 request.state 대신 RequestContext (routers / logger / crud에서 request_context()로 조회)
+        context = RequestContext(client_ip(scope, self.trusted_proxies))
+        token = set_request_context(context)
+        try:
+            await self.dispatch(scope, receive, send, context)
+        finally:
+            reset_request_context(token)
 
-        return response
+    async def dispatch(self, scope: Scope, receive: Receive, send: Send, context: RequestContext) -> None:
+        # 인증 제외 경로는 scope만 사용, Request / Headers는 인증이 필요한 경로와 access log 기록 시에만 생성
+        status_code = None
+        response_started = False
 
-    try:
-        if request.url.path.startswith("/api"):
-            access_token = headers.get("Authorization", None)
-        else:
-            # template render
-            cookies = request.cookies
-            access_token = cookies.get("Authorization", None)
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = True
+            await send(message)
+
+        url = scope["path"]
+        try:
+            if self.except_path.match(url):
+                # 인증 없이 통과, route 에러(ex. /api/auth 의 HashQueueFullEx)도 아래에서 에러 응답으로 변환
+                await self.app(scope, receive, send_wrapper)
+
+                if url == "/":
+                    await api_logger(Request(scope, receive), status_code=status_code)
+                return
+
+            request = Request(scope, receive)
+            if url.startswith(INTERNAL_PATH_PREFIX):
+                # 내부망 전용 (pool / cache / 요청 수 제한 / 폐기 token 현황)
+                if not self.internal_networks.match(context.ip):
+                    raise ex.NotAllowedIPEx(ip=context.ip)
+            elif url.startswith("/api") and "secret" in request.headers:
+                # API Key(HMAC) 인증
+                context.user = await api_key_auth(request)
+            else:
+                if url.startswith("/api"):
+                    access_token = request.headers.get("Authorization", None)
+                else:
+                    # template render
+                    cookies = request.cookies
+                    access_token = cookies.get("Authorization", None)
+
+                if not access_token:
+                    raise ex.NotAuthorizedEx()
+
+                user = await get_user_token(access_token)
+                if user.jti and revocation_list.is_revoked(user.jti):
+                    raise ex.TokenRevokedEx()
+                context.user = user
 
-        if not access_token:
-            raise ex.NotAuthorizedEx()
+            await self.app(scope, receive, send_wrapper)
+            await api_logger(request, status_code=status_code)
+        except Exception as e:
+            # 이미 response 전송을 시작했다면 error response로 바꿀 수 없음
+            if response_started:
+                raise
+            error = await exception_handler(e)
+            await ex.send_error(send, error)
+            await api_logger(Request(scope, receive), error=error)
 
+
+def client_ip(scope: Scope, trusted_proxies: IPWhitelist) -> str:
+    """
+    요청 IP (API Key whitelist / 요청 수 제한 / access log 기준)
+    socket peer IP, peer가 신뢰하는 proxy일 때만 X-Forwarded-For를 오른쪽부터 보고 proxy가 아닌 첫 hop 사용
+    (왼쪽 값은 client가 임의로 넣을 수 있음)
+    :param scope:
+    :param trusted_proxies:
+    :return:
+    """
+    client = scope.get("client")
+    ip = client[0] if client else ""
+    if not trusted_proxies.match(ip):
+        return ip
+
+    for hop in reversed(",".join(Headers(scope=scope).getlist("x-forwarded-for")).split(",")):
+        hop = hop.strip()
+        if not hop:
+            continue
+        ip = hop
+        if not trusted_proxies.match(hop):
+            break
+    return ip
+
+
+async def get_user_token(access_token) -> UserToken:
+    """
+    access token -> UserToken, 검증 결과는 token_cache에 보관
+    :param access_token:
+    :return:
+    """
+    if not token_cache.enabled:
+        return UserToken(**await token_decode(access_token))
+
+    key = token_cache.key(access_token)
+    user = token_cache.get(key)
+    if user is None:
         token_info = await token_decode(access_token)
-        request.state.user = UserToken(**token_info)
+        user = UserToken(**token_info)
+        token_cache.set(key, user, exp=token_info.get("exp"))
+    return user
+
+
+async def api_key_auth(request: Request) -> UserToken:
+    """
+    API Key 인증
+    query string: key(access_key), timestamp(unix time, 초)
+    header: secret = base64(HMAC-SHA256(secret_key, query string 원문))
+    :param request:
+    :return: API Key 소유 유저
+    """
+    query_params = request.query_params
+    access_key = query_params.get("key")
+    timestamp = query_params.get("timestamp")
+    if not access_key or not timestamp:
+        raise ex.APIQueryStringEx()
+
+    api_key = await get_api_key(access_key)
+    if api_key is None or api_key.status != "active":
+        raise ex.NotFoundAccessKeyEx(api_key=access_key)
+
+    signature = base64.b64encode(hmac.new(api_key.secret_key, request.scope["query_string"], hashlib.sha256).digest())
+    # header 값은 latin-1로 decode 되어 있음, str 비교는 ASCII 외 문자가 있으면 TypeError
+    if not hmac.compare_digest(signature, request.headers["secret"].encode("latin-1")):
+        raise ex.APIHeaderInvalidEx()
+
+    try:
+        timestamp = int(timestamp)
+    except ValueError:
+        raise ex.APITimestampEx()
+    if abs(time.time() - timestamp) > API_KEY_TIMESTAMP_TOLERANCE:
+        raise ex.APITimestampEx()
+
+    context = request_context()
+    if api_key.whitelist is not None and not api_key.whitelist.match(context.ip):
+        raise ex.NotAllowedIPEx(ip=context.ip)
+    context.api_key = access_key
+    return api_key.user
+
+
+async def get_api_key(access_key: str) -> ApiKeyEntry | None:
+    """
+    access_key -> ApiKeyEntry, 조회 결과(없는 key 포함)는 api_key_cache에 보관
+    :param access_key:
+    :return:
+    """
+    cached, api_key = api_key_cache.get(access_key)
+    if not cached:
+        api_key = await fetch_api_key(access_key)
+        if api_key is None and db.replicas:
+            # replica 복제 지연으로 방금 만든 key가 없을 수 있으므로 primary에서 없는 것이 확인된 경우만 캐시
+            api_key = await fetch_api_key(access_key, primary=True)
+        api_key_cache.set(access_key, api_key)
+    return api_key
+
+
+async def fetch_api_key(access_key: str, primary: bool = False) -> ApiKeyEntry | None:
+    if db.is_async:
+        async with db.session_factory() as session:
+            return await run_in_session(session, load_api_key, access_key, primary)
+    return await run_in_threadpool(_load_api_key, access_key, primary)
+
+
+def _load_api_key(access_key: str, primary: bool = False) -> ApiKeyEntry | None:
+    with db.session_factory() as session:
+        return load_api_key(session, access_key, primary)
 
-        response = await next_call(request)
-        await api_logger(request, response=response)
-    except Exception as e:
-        error = await exception_handler(e)
-        error_dict = dict(status_code=error.status_code, code=error.code, msg=error.msg, detail=error.detail)
-        response = JSONResponse(error_dict, status_code=error.status_code)
-        await api_logger(request, error=error)
-    return response
 
+def load_api_key(session: Session, access_key: str, primary: bool = False) -> ApiKeyEntry | None:
+    """
+    API Key + 소유 유저를 한번에 조회, whitelist 사용 key만 whitelist 추가 조회
+    :param session:
+    :param access_key:
+    :param primary: replica 대신 primary에서 조회
+    :return:
+    """
+    if primary:
+        use_primary(session)
+    row = session.execute(
+        select(ApiKeys.id, ApiKeys.secret_key, ApiKeys.status, ApiKeys.is_whitelisted, Users.id.label("user_id"), Users.email, Users.name, Users.phone_number)
+        .join(Users, Users.id == ApiKeys.user_id)
+        .where(ApiKeys.access_key == access_key)
+    ).first()
+    if row is None:
+        return None
 
-async def url_pattern_check(path, pattern):
-    result = re.match(pattern, path)
-    return bool(result)
+    whitelist = None
+    if row.is_whitelisted:
+        whitelist = IPWhitelist(session.scalars(select(ApiWhiteLists.ip_address).where(ApiWhiteLists.api_key_id == row.id)))
+    user = UserToken(id=row.user_id, email=row.email, name=row.name, phone_number=row.phone_number)
+    return ApiKeyEntry(key_id=row.id, secret_key=row.secret_key, status=row.status, whitelist=whitelist, user=user)
 
 
 async def token_decode(access_token):
@@ -1,10 +1,55 @@
+import logging
+import os
+import time
 import typing
 
-from starlette.datastructures import Headers, URL
+from starlette.datastructures import URL
 from starlette.middleware.trustedhost import ENFORCE_DOMAIN_WILDCARD
 from starlette.responses import Response, RedirectResponse, PlainTextResponse
 from starlette.types import ASGIApp, Scope, Receive, Send
 
+from app.middlewares.path_matcher import PathMatcher
+
+
+class HostMatcher:
+    """
+    허용 host 목록을 시작 시점에 index로 변환
+    - exact   : set 조회
+    - *.domain: ".domain" suffix set 조회 (host label 수 만큼만 조회, 목록 크기와 무관)
+    - www     : "www." + host 가 허용 목록에 있으면 redirect 대상
+    """
+
+    __slots__ = ("allow_any", "_exact", "_suffixes")
+
+    def __init__(self, allowed_hosts: typing.Iterable[str]) -> None:
+        allowed_hosts = list(allowed_hosts)
+        for pattern in allowed_hosts:
+            assert "*" not in pattern[1:], ENFORCE_DOMAIN_WILDCARD
+            if pattern.startswith("*") and pattern != "*":
+                assert pattern.startswith("*."), ENFORCE_DOMAIN_WILDCARD
+
+        self.allow_any = "*" in allowed_hosts
+        self._exact = frozenset(pattern for pattern in allowed_hosts if not pattern.startswith("*"))
+        # "*.example.com" -> ".example.com"
+        self._suffixes = frozenset(pattern[1:] for pattern in allowed_hosts if pattern.startswith("*."))
+
+    def match(self, host: str) -> typing.Tuple[bool, bool]:
+        """
+        :param host:
+        :return: (허용 여부, www redirect 대상 여부)
+        """
+        if self.allow_any or host in self._exact:
+            return True, False
+
+        if self._suffixes:
+            dot = host.find(".")
+            while dot != -1:
+                if host[dot:] in self._suffixes:
+                    return True, False
+                dot = host.find(".", dot + 1)
+
+        return False, "www." + host in self._exact
+
 
 # TrustedHostsMiddleware의 경우 starlette에 이미 정의되어 있음 다만 except_path는 정의되어 있지 않기 때문에 재정의
 class TrustedHostsMiddleware:
@@ -12,8 +57,10 @@ class TrustedHostsMiddleware:
         self,
         app: ASGIApp,
         allowed_hosts: typing.Sequence[str] = None,
-        except_path: typing.Sequence[str] = None,
+        except_path: typing.Sequence[str] | PathMatcher = None,
         www_redirect: bool = True,
+        allowed_hosts_file: str = None,
+        reload_interval: float = 30,
     ) -> None:
         if allowed_hosts is None:
             allowed_hosts = ["*"]
@@ -21,34 +68,68 @@ class TrustedHostsMiddleware:
         if except_path is None:
             except_path = []
 
-        for pattern in allowed_hosts:
-            assert "*" not in pattern[1:], ENFORCE_DOMAIN_WILDCARD
-            if pattern.startswith("*") and pattern != "*":
-                assert pattern.startswith("*."), ENFORCE_DOMAIN_WILDCARD
         self.app = app
-        self.allowed_hosts = list(allowed_hosts)
-        self.allow_any = "*" in allowed_hosts
         self.www_redirect = www_redirect
-        self.except_path = list(except_path)
+        if not isinstance(except_path, PathMatcher):
+            except_path = PathMatcher(exact=except_path)
+        self.except_path = except_path
+
+        # allowed_hosts_file이 있으면 파일 내용으로 허용 목록을 교체하고, 변경 시 재시작 없이 다시 읽음
+        self.allowed_hosts_file = allowed_hosts_file
+        self.reload_interval = reload_interval
+        self._file_mtime = None
+        self._next_reload_check = 0.0
+        self.hosts = HostMatcher(allowed_hosts)
+        if allowed_hosts_file:
+            self.reload()
+
+    def reload(self, allowed_hosts: typing.Sequence[str] = None) -> None:
+        """
+        허용 host 목록 교체 (인자가 없으면 allowed_hosts_file에서 읽음)
+        새 목록이 잘못된 경우 기존 목록 유지
+        :param allowed_hosts:
+        :return:
+        """
+        try:
+            if allowed_hosts is None:
+                self._file_mtime = os.stat(self.allowed_hosts_file).st_mtime
+                with open(self.allowed_hosts_file, encoding="utf-8") as f:
+                    allowed_hosts = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+            self.hosts = HostMatcher(allowed_hosts)
+        except (OSError, AssertionError) as e:
+            logging.error(f"Trusted hosts reload failed: {e}")
+            return
+        logging.info(f"Trusted hosts reloaded: {len(allowed_hosts)}")
+
+    def _reload_if_changed(self) -> None:
+        now = time.monotonic()
+        if now < self._next_reload_check:
+            return
+        self._next_reload_check = now + self.reload_interval
+        try:
+            mtime = os.stat(self.allowed_hosts_file).st_mtime
+        except OSError:
+            return
+        if mtime != self._file_mtime:
+            self.reload()
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        if self.allow_any or scope["type"] not in (
+        if self.allowed_hosts_file:
+            self._reload_if_changed()
+
+        hosts = self.hosts
+        if hosts.allow_any or scope["type"] not in (
             "http",
             "websocket",
         ):  # pragma: no cover
             await self.app(scope, receive, send)
             return
 
-        headers = Headers(scope=scope)
-        host = headers.get("host", "").split(":")[0]
-        is_valid_host = False
-        found_www_redirect = False
-        for pattern in self.allowed_hosts:
-            if host == pattern or (pattern.startswith("*") and host.endswith(pattern[1:])) or URL(scope=scope).path in self.except_path:
-                is_valid_host = True
-                break
-            elif "www." + host == pattern:
-                found_www_redirect = True
+        if self.except_path.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        is_valid_host, found_www_redirect = hosts.match(get_host(scope))
 
         if is_valid_host:
             await self.app(scope, receive, send)
@@ -61,3 +142,15 @@ class TrustedHostsMiddleware:
             else:
                 response = PlainTextResponse("Invalid host header", status_code=400)
             await response(scope, receive, send)
+
+
+def get_host(scope: Scope) -> str:
+    """
+    Headers 객체 생성 없이 raw header에서 host(port 제외) 추출
+    :param scope:
+    :return:
+    """
+    for key, value in scope["headers"]:
+        if key == b"host":
+            return value.decode("latin-1").split(":")[0]
+    return ""
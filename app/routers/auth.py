@@ -1,14 +1,18 @@
+import uuid
 from datetime import datetime, timedelta
 
-import bcrypt
 import jwt
 from fastapi import APIRouter, Depends
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from starlette.responses import JSONResponse
 
-from app.database.conn import db
-from app.common.consts import JWT_SECRET, JWT_ALGORITHM
-from app.database.models import Users
+from app.common.context import request_context
+from app.common.password import hasher
+from app.database.conn import db, run_in_session
+from app.common.consts import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRE_HOURS
+from app.database.models import Users, RevokedTokens
+from app.middlewares.token_revocation import revocation_list
 from app.schema import SnsType, Token, UserRegister, UserToken
 
 router = APIRouter()
@@ -24,56 +28,77 @@ async def register_user(sns_type: SnsType, register_info: UserRegister, session:
     :return:
     """
     if sns_type == SnsType.email:
-        is_exists = await is_email_exists(register_info.email)
         if not register_info.email or not register_info.pw:
             return JSONResponse(status_code=400, content=dict(msg="email and pw must be provided"))
 
-        elif is_exists:
+        elif await is_email_exists(register_info.email, session):
             return JSONResponse(status_code=400, content=dict(msg="email already registered"))
 
-        # hash는 byte만 가능
-        hashed_pw = bcrypt.hashpw(register_info.pw.encode("utf-8"), bcrypt.gensalt())
-        new_user = Users.create(
+        hashed_pw = await hasher.hashpw(register_info.pw)
+        new_user = await Users.acreate(
             session,
             auto_commit=True,
             email=register_info.email,
-            pw=hashed_pw.decode("utf-8"),
+            pw=hashed_pw,
         )
-        token = dict(Authorization=f"Bearer {create_access_token(data=UserToken.from_orm(new_user).dict(exclude={'pw', 'marketing_agree'}),)}")
+        token = dict(Authorization=f"Bearer {create_access_token(data=UserToken.from_orm(new_user).dict(exclude={'pw', 'marketing_agree', 'jti', 'exp'}),)}")
         return token
 
     return JSONResponse(status_code=400, content=dict(msg="Not Supported"))
 
 
 @router.post("/auth/login/{sns_type}", response_model=Token)
-async def login(sns_type: SnsType, user_info: UserRegister):
+async def login(sns_type: SnsType, user_info: UserRegister, session: Session = Depends(db.session)):
     if sns_type == SnsType.email:
-        is_exists = await is_email_exists(user_info.email)
         if not user_info.email or not user_info.pw:
             return JSONResponse(status_code=400, content=dict(msg="email and pw must be provided"))
-        elif not is_exists:
+
+        # 존재 여부 확인과 조회를 한번에, 비밀번호 hash는 cache에 없으므로 DB에서 직접 조회
+        user = await Users.aget(session, email=user_info.email)
+        if not user:
             return JSONResponse(status_code=400, content=dict(msg="no match user"))
 
-        user = Users.get(email=user_info.email)
-        is_verified = bcrypt.checkpw(user_info.pw.encode("utf-8"), user.pw.encode("utf-8"))
+        is_verified = await hasher.checkpw(user_info.pw, user.pw)
 
         if not is_verified:
             return JSONResponse(status_code=400, content=dict(msg="no match user"))
 
-        token = dict(Authorization=f"Bearer {create_access_token(data=UserToken.from_orm(user).dict(exclude={'pw', 'marketing_agree'}),)}")
+        token = dict(Authorization=f"Bearer {create_access_token(data=UserToken.from_orm(user).dict(exclude={'pw', 'marketing_agree', 'jti', 'exp'}),)}")
         return token
     return JSONResponse(status_code=400, content=dict(msg="Not Supported"))
 
 
-async def is_email_exists(email: str) -> bool:
-    get_email = Users.get(email=email)
+@router.post("/logout")
+async def logout(session: Session = Depends(db.session)):
+    """
+    현재 access token 폐기 (다른 worker는 REVOCATION_POLL_INTERVAL 이내 반영)
+    같은 token을 다시 logout 해도 성공 (jti unique 충돌은 이미 폐기된 것으로 처리)
+    :param session:
+    :return:
+    """
+    user = request_context().user
+    if user.jti:
+        expires_at = datetime.utcfromtimestamp(user.exp) if user.exp else None
+        try:
+            await RevokedTokens.acreate(session, auto_commit=True, jti=user.jti, user_id=user.id, expires_at=expires_at)
+        except IntegrityError:
+            # 아직 polling 하지 않은 worker에서 다시 logout
+            await run_in_session(session, lambda sync_session: sync_session.rollback())
+        revocation_list.add(user.jti)
+    return dict(msg="logged out")
+
+
+async def is_email_exists(email: str, session: Session = None) -> bool:
+    get_email = await Users.aget_cached(session, email=email)
     if get_email:
         return True
     return False
 
 
-def create_access_token(data: dict = None, expires_delta: int = None) -> str:
+def create_access_token(data: dict = None, expires_delta: int = JWT_EXPIRE_HOURS) -> str:
     to_encode = data.copy()
+    # jti: 폐기(logout) 대상 식별
+    to_encode.update({"jti": uuid.uuid4().hex})
     if expires_delta:
         to_encode.update({"exp": datetime.utcnow() + timedelta(hours=expires_delta)})
 
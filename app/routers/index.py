@@ -1,9 +1,10 @@
 from datetime import datetime
-from inspect import currentframe
 
 from fastapi import APIRouter
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import Response, PlainTextResponse
+
+from app.common.context import request_context
+from app.middlewares.metrics import prometheus
 
 router = APIRouter()
 
@@ -20,13 +21,18 @@ async def index():
     return Response(f"Notification API (UTC: {current_time:%Y-%m-%d %H:%M:%S})")
 
 
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics (TrustedHosts / 토큰 검사 예외)
+    :return:
+    """
+    return PlainTextResponse(prometheus.render(), media_type="text/plain; version=0.0.4")
+
+
 @router.get("/test")
-async def test(request: Request):
-    print(f"state user: {request.state.user}")
+async def test():
+    print(f"state user: {request_context().user}")
     current_time = datetime.utcnow()
-    try:
-        1 / 0
-    except Exception as e:
-        request.state.inspect = currentframe()
-        raise e
+    1 / 0
     return Response(f"Notification API (UTC: {current_time:%Y-%m-%d %H:%M:%S})")
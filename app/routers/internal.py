@@ -0,0 +1,74 @@
+from fastapi import APIRouter
+
+from app.database.cache import cache
+from app.database.conn import db
+from app.middlewares.api_key_cache import api_key_cache
+from app.middlewares.rate_limit import rate_limiter
+from app.middlewares.token_cache import token_cache
+from app.middlewares.token_revocation import revocation_list
+from utils.logger import access_log
+
+router = APIRouter()
+
+
+@router.get("/db/pool")
+async def get_pool_stats():
+    """
+    DB 커넥션 풀 현황 (내부망 전용)
+    :return:
+    """
+    return db.pool_stats()
+
+
+@router.get("/token-cache")
+async def get_token_cache_stats():
+    """
+    JWT 검증 캐시 hit/miss/eviction 현황 (내부망 전용)
+    :return:
+    """
+    return token_cache.stats()
+
+
+@router.get("/api-key-cache")
+async def get_api_key_cache_stats():
+    """
+    API Key 인증 캐시 hit/miss/invalidation 현황 (내부망 전용)
+    :return:
+    """
+    return api_key_cache.stats()
+
+
+@router.get("/token-revocation")
+async def get_token_revocation_stats():
+    """
+    폐기된 access token 목록 크기 / Bloom filter 적중 현황 (내부망 전용)
+    :return:
+    """
+    return revocation_list.stats()
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """
+    공유 cache hit ratio / single-flight 현황 (내부망 전용)
+    :return:
+    """
+    return cache.stats()
+
+
+@router.get("/rate-limit")
+async def get_rate_limit_stats():
+    """
+    요청 수 제한 규칙 / 허용, 거절 개수 (내부망 전용)
+    :return:
+    """
+    return rate_limiter.stats()
+
+
+@router.get("/access-log")
+async def get_access_log_stats():
+    """
+    access log queue 적재량 / drop 개수 (내부망 전용)
+    :return:
+    """
+    return access_log.stats()
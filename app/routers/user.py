@@ -1,74 +1,283 @@
+import json
 import secrets
 import string
+from datetime import datetime
 from typing import List
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import delete, func, insert, literal, select, union_all, update
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
 from sqlalchemy.orm import Session
-from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
 
-from app.common.consts import MAX_API_KEY
-from app.database.conn import db
-from app.database.models import Users, ApiKeys
-from app.errors.exceptions import MaxAPIKeyEx, NoAPIKeyMatchEx
-from app.schema import UserMe, ApiKey, AddKeyInfo
+from app.common.consts import MAX_API_KEY, API_KEY_CREATE_RETRY, MYSQL_DEADLOCK_ERROR, MAX_BULK_SIZE, API_KEY_PAGE_SIZE, MAX_API_KEY_PAGE_SIZE, API_KEY_EXPORT_BATCH
+from app.common.context import request_context
+from app.database.conn import db, run_in_session
+from app.database.routing import use_primary
+from app.database.models import Users, ApiKeys, ApiWhiteLists
+from app.errors.exceptions import APIException, MaxAPIKeyEx, NoAPIKeyMatchEx, MaxBulkSizeEx
+from app.middlewares.api_key_cache import api_key_cache
+from app.schema import UserMe, ApiKey, AddKeyInfo, BulkAddKeyInfo, BulkChangeKeyInfo, BulkDeleteKeyInfo, BulkKeyResult, ChangeKeyInfo
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserMe)
-def get_user(request: Request) -> UserMe:
-    user = request.state.user
-    user_info = Users.get(id=user.id)
+async def get_user() -> UserMe:
+    user = request_context().user
+    user_info = await Users.aget_cached(id=user.id)
     return user_info
 
 
 @router.get("/apikeys", response_model=List[ApiKey])
-async def get_api_key_list(request: Request, session: Session = Depends(db.session)) -> List[ApiKey]:
+async def get_api_key_list(
+    response: Response,
+    cursor: int = Query(None, ge=0),
+    limit: int = Query(API_KEY_PAGE_SIZE, ge=1, le=MAX_API_KEY_PAGE_SIZE),
+    session: Session = Depends(db.session),
+) -> List[ApiKey]:
     """
-    API Key 조회
-    :param request:
+    API Key 조회 (id 기준 keyset pagination)
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 다음 cursor 전달
+    :param response:
+    :param cursor: 이전 페이지 마지막 id
+    :param limit:
     :param session:
     :return:
     """
-    user = request.state.user
-    user_id = user.id
-    api_keys = session.query(ApiKeys).filter(ApiKeys.user_id == user_id)
+    user = request_context().user
+    statement = _api_key_list_query(user.id, cursor).limit(limit + 1)
+    api_keys = await run_in_session(session, lambda sync_session: sync_session.execute(statement).mappings().all())
+
+    if len(api_keys) > limit:
+        api_keys = api_keys[:limit]
+        response.headers["X-Next-Cursor"] = str(api_keys[-1]["id"])
     return api_keys
 
 
+@router.get("/apikeys/export")
+async def export_api_key_list() -> StreamingResponse:
+    """
+    API Key 전체 NDJSON export
+    server-side cursor(yield_per)로 API_KEY_EXPORT_BATCH 단위로 읽어 바로 전송하므로 key 개수와 관계 없이 메모리 일정
+    요청 session은 응답 전송 전에 닫히므로 전송 동안 사용할 session을 따로 열어서 사용
+    :return:
+    """
+    statement = _api_key_list_query(request_context().user.id).execution_options(yield_per=API_KEY_EXPORT_BATCH)
+
+    if db.is_async:
+
+        async def rows():
+            async with db.session_factory() as session:
+                result = await session.stream(statement)
+                async for partition in result.mappings().partitions():
+                    yield _ndjson(partition)
+
+    else:
+
+        def rows():
+            with db.session_factory() as session:
+                for partition in session.execute(statement).mappings().partitions():
+                    yield _ndjson(partition)
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+def _api_key_list_query(user_id: int, cursor: int = None):
+    statement = select(ApiKeys.id, ApiKeys.memo, ApiKeys.secret_key, ApiKeys.created_at.label("create_time")).where(ApiKeys.user_id == user_id)
+    if cursor is not None:
+        statement = statement.where(ApiKeys.id > cursor)
+    return statement.order_by(ApiKeys.id)
+
+
+def _ndjson(rows) -> bytes:
+    return "".join(f"{json.dumps(dict(row), ensure_ascii=False, separators=(',', ':'), default=datetime.isoformat)}\n" for row in rows).encode("utf-8")
+
+
 @router.post("/apikeys", response_model=ApiKey)
-async def create_api_key(request: Request, key_info: AddKeyInfo, session: Session = Depends(db.session)) -> ApiKey:
-    user = request.state.user
+async def create_api_key(key_info: AddKeyInfo, session: Session = Depends(db.session)) -> ApiKey:
+    user = request_context().user
     user_id = user.id
 
-    api_count = session.query(ApiKeys).filter(ApiKeys.user_id == user_id).count()
-    if api_count == MAX_API_KEY:
-        raise MaxAPIKeyEx()
+    api_key = await run_in_session(session, _create_api_key, user_id, key_info)
+    # 생성 전에 없는 key로 캐시된 항목 제거
+    api_key_cache.invalidate_access_keys([api_key.access_key])
+    return api_key
 
-    alphabet = string.ascii_letters + string.digits
-    secret_key = "".join(secrets.choice(alphabet) for index in range(40))
-
-    uid = None
-    while uid is None:
-        uid_candidate = f"{str(uuid4())[:12]}{uuid4()}"
-        uid_check = session.query(ApiKeys).filter(ApiKeys.access_key == uid_candidate).first()
-        if not uid_check:
-            uid = uid_candidate
 
+def _create_api_key(session: Session, user_id: int, key_info: AddKeyInfo) -> ApiKeys:
+    """
+    API Key 생성
+    개수 제한 확인과 적재를 하나의 INSERT ... SELECT ... WHERE (count) < MAX_API_KEY 로 처리해 동시 요청에도 제한 유지
+    access_key 중복은 unique 제약으로 확인하고 실패 시에만 재시도
+    :param session:
+    :param user_id:
+    :param key_info:
+    :return:
+    """
+    secret_key = new_secret_key()
     key_info = key_info.dict()
-    new_key = ApiKeys(access_key=uid, secret_key=secret_key, user_id=user_id, **key_info)
-    session.add(new_key)
-    session.flush()
+
+    for _ in range(API_KEY_CREATE_RETRY):
+        values = dict(access_key=new_access_key(), secret_key=secret_key, user_id=user_id, **key_info)
+        statement = insert(ApiKeys).from_select(list(values), _row_select(values).where(_key_count(user_id) < MAX_API_KEY))
+        try:
+            result = session.execute(statement)
+            session.commit()
+        except (IntegrityError, OperationalError) as e:
+            session.rollback()
+            if not is_create_conflict(e):
+                raise
+            continue
+
+        if result.rowcount == 0:
+            raise MaxAPIKeyEx()
+        return ApiKeys(id=result.lastrowid, **values)
+
+    raise APIException(detail="API Key create failed")
+
+
+@router.post("/apikeys/bulk", response_model=List[BulkKeyResult])
+async def bulk_create_api_keys(bulk_info: BulkAddKeyInfo, session: Session = Depends(db.session)) -> List[BulkKeyResult]:
+    """
+    API Key 일괄 생성 (한번의 INSERT, 배치 단위 transaction)
+    MAX_API_KEY를 넘는 항목은 해당 항목만 실패
+    :param bulk_info:
+    :param session:
+    :return: 항목별 결과
+    """
+    check_bulk_size(bulk_info.keys)
+    user_id = request_context().user.id
+    results, access_keys = await run_in_session(session, _bulk_create_api_keys, user_id, bulk_info.keys)
+    api_key_cache.invalidate_access_keys(access_keys)
+    return results
+
+
+@router.put("/apikeys/bulk", response_model=List[BulkKeyResult])
+async def bulk_change_api_keys(bulk_info: BulkChangeKeyInfo, session: Session = Depends(db.session)) -> List[BulkKeyResult]:
+    """
+    API Key memo/status 일괄 변경
+    같은 값으로 바꾸는 항목끼리 묶어 UPDATE ... WHERE id IN (...) AND user_id = ? 한번씩 실행
+    인증 캐시는 이 worker에서 바로, 다른 worker에서는 API_KEY_CACHE_TTL(기본 5초) 이내 반영 (그 동안 이전 status로 인증될 수 있음)
+    :param bulk_info:
+    :param session:
+    :return: 항목별 결과
+    """
+    check_bulk_size(bulk_info.keys)
+    user_id = request_context().user.id
+    results = await run_in_session(session, _bulk_change_api_keys, user_id, bulk_info.keys)
+    api_key_cache.invalidate(result.id for result in results if result.success)
+    return results
+
+
+@router.delete("/apikeys/bulk", response_model=List[BulkKeyResult])
+async def bulk_delete_api_keys(bulk_info: BulkDeleteKeyInfo, session: Session = Depends(db.session)) -> List[BulkKeyResult]:
+    """
+    API Key 일괄 삭제 (whitelist 포함)
+    인증 캐시는 이 worker에서 바로, 다른 worker에서는 API_KEY_CACHE_TTL(기본 5초) 이내 반영 (그 동안 삭제된 key로 인증될 수 있음)
+    :param bulk_info:
+    :param session:
+    :return: 항목별 결과
+    """
+    check_bulk_size(bulk_info.ids)
+    user_id = request_context().user.id
+    results = await run_in_session(session, _bulk_delete_api_keys, user_id, bulk_info.ids)
+    api_key_cache.invalidate(result.id for result in results if result.success)
+    return results
+
+
+def _bulk_create_api_keys(session: Session, user_id: int, keys: List[AddKeyInfo]) -> tuple[List[BulkKeyResult], List[str]]:
+    """
+    API Key 일괄 생성
+    :param session:
+    :param user_id:
+    :param keys:
+    :return: (항목별 결과, 생성된 access_key 목록)
+    """
+    if not keys:
+        return [], []
+
+    for _ in range(API_KEY_CREATE_RETRY):
+        rows = [dict(access_key=new_access_key(), secret_key=new_secret_key(), user_id=user_id, **key_info.dict()) for key_info in keys]
+        # index 번째 항목은 (기존 개수 + index) < MAX_API_KEY 일 때만 적재
+        key_count = _key_count(user_id)
+        selects = [_row_select(row).where(key_count < MAX_API_KEY - index) for index, row in enumerate(rows)]
+        statement = insert(ApiKeys).from_select(list(rows[0]), selects[0] if len(selects) == 1 else select(union_all(*selects).subquery()))
+        try:
+            session.execute(statement)
+            created = {api_key.access_key: api_key for api_key in session.scalars(select(ApiKeys).where(ApiKeys.access_key.in_([row["access_key"] for row in rows])))}
+            results = [
+                BulkKeyResult(id=created[row["access_key"]].id, success=True, api_key=created[row["access_key"]]) if row["access_key"] in created else bulk_error(None, MaxAPIKeyEx()) for row in rows
+            ]
+            session.commit()
+        except (IntegrityError, OperationalError) as e:
+            session.rollback()
+            if not is_create_conflict(e):
+                raise
+            continue
+        return results, list(created)
+
+    raise APIException(detail="API Key create failed")
+
+
+def _bulk_change_api_keys(session: Session, user_id: int, keys: List[ChangeKeyInfo]) -> List[BulkKeyResult]:
+    if not keys:
+        return []
+
+    use_primary(session)
+    owned = {api_key.id: api_key for api_key in session.scalars(select(ApiKeys).where(ApiKeys.id.in_([key_info.id for key_info in keys]), ApiKeys.user_id == user_id))}
+
+    # 변경 값이 같은 항목끼리 묶어서 UPDATE
+    groups = {}
+    for key_info in keys:
+        values = key_info.dict(exclude={"id"}, exclude_unset=True)
+        if key_info.id in owned and values:
+            groups.setdefault(tuple(sorted(values.items())), []).append(key_info.id)
+    for values, key_ids in groups.items():
+        session.execute(update(ApiKeys).where(ApiKeys.id.in_(key_ids), ApiKeys.user_id == user_id).values(dict(values)).execution_options(synchronize_session="evaluate"))
+
+    # commit 후 expire 되기 전에 응답 생성
+    results = [
+        BulkKeyResult(id=key_info.id, success=True, api_key=ApiKey.model_validate(owned[key_info.id])) if key_info.id in owned else bulk_error(key_info.id, NoAPIKeyMatchEx()) for key_info in keys
+    ]
     session.commit()
-    return new_key
+    return results
+
+
+def _bulk_delete_api_keys(session: Session, user_id: int, key_ids: List[int]) -> List[BulkKeyResult]:
+    if not key_ids:
+        return []
+
+    use_primary(session)
+    owned = set(session.scalars(select(ApiKeys.id).where(ApiKeys.id.in_(key_ids), ApiKeys.user_id == user_id)))
+    if owned:
+        session.execute(delete(ApiWhiteLists).where(ApiWhiteLists.api_key_id.in_(owned)))
+        session.execute(delete(ApiKeys).where(ApiKeys.id.in_(owned), ApiKeys.user_id == user_id))
+        session.commit()
+
+    return [BulkKeyResult(id=key_id, success=True) if key_id in owned else bulk_error(key_id, NoAPIKeyMatchEx()) for key_id in key_ids]
 
 
 @router.put("/apikeys/{key_id}", response_model=ApiKey)
-def change_api_key(request: Request, key_id: int, key_info: AddKeyInfo, session: Session = Depends(db.session)) -> ApiKey:
-    user = request.state.user
+async def change_api_key(key_id: int, key_info: AddKeyInfo, session: Session = Depends(db.session)) -> ApiKey:
+    """
+    API Key memo 변경
+    :param key_id:
+    :param key_info:
+    :param session:
+    :return:
+    """
+    user = request_context().user
     user_id = user.id
 
+    api_key = await run_in_session(session, _change_api_key, user_id, key_id, key_info)
+    api_key_cache.invalidate([key_id])
+    return api_key
+
+
+def _change_api_key(session: Session, user_id: int, key_id: int, key_info: AddKeyInfo) -> ApiKeys:
+    use_primary(session)
     api_key = session.query(ApiKeys).filter(ApiKeys.id == key_id)
 
     if api_key and api_key.first().user_id == user_id:
@@ -80,3 +289,48 @@ def change_api_key(request: Request, key_id: int, key_info: AddKeyInfo, session:
         raise NoAPIKeyMatchEx()
 
     return api_key.first()
+
+
+def new_access_key() -> str:
+    return f"{str(uuid4())[:12]}{uuid4()}"
+
+
+def new_secret_key() -> str:
+    alphabet = string.ascii_letters + string.digits
+    return "".join(secrets.choice(alphabet) for index in range(40))
+
+
+def check_bulk_size(items: list):
+    if len(items) > MAX_BULK_SIZE:
+        raise MaxBulkSizeEx()
+
+
+def bulk_error(key_id: int | None, error: APIException) -> BulkKeyResult:
+    return BulkKeyResult(id=key_id, success=False, code=error.code, msg=error.msg)
+
+
+def is_create_conflict(error: DBAPIError) -> bool:
+    """
+    API Key 적재 재시도 대상: access_key unique 충돌, 동시 적재 중 deadlock
+    (연결 끊김 / lock wait timeout 등 나머지 DB 에러는 그대로 전달)
+    :param error:
+    :return:
+    """
+    if isinstance(error, IntegrityError):
+        return "access_key" in str(error.orig)
+    return getattr(error.orig, "args", (None,))[:1] == (MYSQL_DEADLOCK_ERROR,)
+
+
+def _key_count(user_id: int):
+    return select(func.count(ApiKeys.id)).where(ApiKeys.user_id == user_id).scalar_subquery()
+
+
+def _row_select(values: dict):
+    """
+    INSERT ... SELECT 용 한 행 (컬럼 default는 INSERT에서 추가)
+    :param values: 컬럼 -> 값
+    :return:
+    """
+    columns = ApiKeys.__table__.c
+    row = [literal(value, type_=columns[column].type).label(column) for column, value in values.items()]
+    return select(*row)
@@ -1,5 +1,6 @@
 # fastapi schema for validation
 from datetime import datetime
+from typing import List
 
 from pydantic import EmailStr, BaseModel
 from enum import Enum
@@ -28,6 +29,9 @@ class UserToken(BaseModel):
     pw: str = None
     name: str | None = None
     phone_number: str | None = None
+    # access token id / 만료 시각(unix time), logout 시 사용
+    jti: str | None = None
+    exp: int | None = None
 
     class Config:
         from_attributes = True
@@ -53,3 +57,37 @@ class ApiKey(AddKeyInfo):
     id: int = None
     secret_key: str | None = None
     create_time: datetime = None
+
+
+class ApiKeyStatus(str, Enum):
+    active: str = "active"
+    stopped: str = "stopped"
+    deleted: str = "deleted"
+
+
+class BulkAddKeyInfo(BaseModel):
+    keys: List[AddKeyInfo]
+
+
+class ChangeKeyInfo(AddKeyInfo):
+    id: int
+    status: ApiKeyStatus | None = None
+
+    class Config:
+        use_enum_values = True
+
+
+class BulkChangeKeyInfo(BaseModel):
+    keys: List[ChangeKeyInfo]
+
+
+class BulkDeleteKeyInfo(BaseModel):
+    ids: List[int]
+
+
+class BulkKeyResult(BaseModel):
+    id: int | None = None
+    success: bool
+    code: str | None = None
+    msg: str | None = None
+    api_key: ApiKey | None = None
@@ -0,0 +1,64 @@
+"""
+운영 실행: python -m app.server [--workers N] [--port 8000]
+CPU 수 기준 worker process, uvloop / httptools 사용
+SIGTERM/SIGINT 시 새 연결을 받지 않고 처리 중인 요청을 SERVER_GRACEFUL_TIMEOUT 까지 기다린 뒤 shutdown hook(DB engine dispose 등) 실행
+"""
+
+import argparse
+import os
+
+import uvicorn
+
+from app.common.config import conf_setting
+from app.middlewares.metrics import clear_snapshots
+
+
+def worker_count(workers: int = None) -> int:
+    """
+    :param workers: 0 또는 None이면 CPU 수
+    :return:
+    """
+    if workers:
+        return workers
+    if hasattr(os, "sched_getaffinity"):
+        # container cpu 제한(cpuset) 반영
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def run(host: str = None, port: int = None, workers: int = None):
+    config = conf_setting()
+    workers = worker_count(workers if workers is not None else config.SERVER_WORKERS)
+    reload = config.PROJ_RELOAD and workers == 1
+    # 이전 실행 worker의 metrics가 /metrics 합산에 남지 않도록
+    clear_snapshots(config.METRICS_DIR)
+
+    uvicorn.run(
+        "app.main:app",
+        host=host or config.SERVER_HOST,
+        port=port or config.SERVER_PORT,
+        workers=None if reload else workers,
+        reload=reload,
+        loop="uvloop",
+        http="httptools",
+        backlog=config.SERVER_BACKLOG,
+        timeout_keep_alive=config.SERVER_KEEPALIVE,
+        limit_concurrency=config.SERVER_LIMIT_CONCURRENCY,
+        limit_max_requests=config.SERVER_LIMIT_MAX_REQUESTS,
+        timeout_graceful_shutdown=config.SERVER_GRACEFUL_TIMEOUT,
+        # access log는 utils.logger 에서 기록
+        access_log=False,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API server")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="0이면 CPU 수, 없으면 SERVER_WORKERS")
+    args = parser.parse_args()
+    run(host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
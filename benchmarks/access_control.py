@@ -0,0 +1,81 @@
+"""
+AccessControlMiddleware 요청당 오버헤드 측정 (/ 헬스체크, 인증이 필요한 /api/me)
+
+- none        : middleware 없음
+- base-http   : 빈 BaseHTTPMiddleware 통과 비용 (기존 등록 방식이 추가로 내던 비용)
+- base-http+ac: BaseHTTPMiddleware + AccessControlMiddleware (기존 방식 근사)
+- asgi        : AccessControlMiddleware (ASGI)
+
+usage: python -m benchmarks.access_control --requests 2000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+import jwt
+from fastapi import FastAPI
+from fastapi.logger import logger
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.common.consts import JWT_SECRET, JWT_ALGORITHM
+from app.common.context import request_context
+from app.middlewares.token_validation import AccessControlMiddleware
+
+
+async def passthrough(request: Request, call_next):
+    return await call_next(request)
+
+
+def build_app(mode: str) -> FastAPI:
+    app = FastAPI()
+    if mode in ("asgi", "base-http+ac"):
+        app.add_middleware(AccessControlMiddleware)
+    if mode in ("base-http", "base-http+ac"):
+        app.add_middleware(middleware_class=BaseHTTPMiddleware, dispatch=passthrough)
+
+    @app.get("/")
+    async def index():
+        return Response("ok")
+
+    @app.get("/api/me")
+    async def me():
+        context = request_context()
+        return dict(id=context.user.id if context else None)
+
+    return app
+
+
+async def per_request_us(app: FastAPI, path: str, headers: dict, count: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get(path, headers=headers)
+        start = time.perf_counter()
+        for _ in range(count):
+            await client.get(path, headers=headers)
+        return (time.perf_counter() - start) / count * 1_000_000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    # 로그 출력 비용은 제외
+    logger.setLevel(logging.WARNING)
+    access_token = f"Bearer {jwt.encode(dict(id=1, email='bench@example.com'), JWT_SECRET, JWT_ALGORITHM)}"
+    headers = dict(Authorization=access_token)
+
+    for mode in ("none", "base-http", "base-http+ac", "asgi"):
+        app = build_app(mode)
+        index_us = await per_request_us(app, "/", headers, args.requests)
+        me_us = await per_request_us(app, "/api/me", headers, args.requests)
+        print(f"{mode:<13} /  {index_us:8.1f} us/req   /api/me {me_us:8.1f} us/req")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
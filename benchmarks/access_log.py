@@ -0,0 +1,117 @@
+"""
+access log 요청당 오버헤드 비교 (/api/me)
+
+- off     : 로그 기록 안함
+- legacy  : 요청 경로에서 json.dumps(indent=4) + 동기 logger 기록 (기존 방식)
+- pipeline: AccessLogPipeline (queue 적재만, 직렬화/기록은 background thread)
+
+모든 출력은 /dev/null 로 보냄
+
+usage: python -m benchmarks.access_log --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+import httpx
+import jwt
+from fastapi import FastAPI
+from fastapi.logger import logger
+from starlette.requests import Request
+
+from app.common.consts import JWT_SECRET, JWT_ALGORITHM
+from app.common.context import RequestContext, request_context, set_request_context
+from app.middlewares import token_validation
+from app.middlewares.token_validation import AccessControlMiddleware
+from utils import logger as api_log
+
+
+async def no_logger(request: Request, status_code: int = None, error=None):
+    return None
+
+
+async def legacy_logger(request: Request, status_code: int = None, error=None):
+    context = request_context()
+    user = context.user
+    log_dict = dict(
+        url=f"{request.url.hostname}{request.url.path}",
+        method=request.method,
+        status_code=status_code,
+        error_detail=None,
+        client=dict(client=context.ip, user=user.id if user else None, email=None),
+        processed_time=f"{round(context.elapsed_ms(), 5)} ms",
+        datetime=f"{datetime.now():%Y-%m-%d %H:%M:%S}",
+    )
+    logger.info(json.dumps(log_dict, indent=4))
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AccessControlMiddleware)
+
+    @app.get("/api/me")
+    async def me():
+        return dict(id=request_context().user.id)
+
+    return app
+
+
+async def per_request_us(app: FastAPI, headers: dict, count: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/api/me", headers=headers)
+        start = time.perf_counter()
+        for _ in range(count):
+            await client.get("/api/me", headers=headers)
+        return (time.perf_counter() - start) / count * 1_000_000
+
+
+def build_request() -> Request:
+    from app.schema import UserToken
+
+    scope = dict(type="http", method="GET", path="/api/me", query_string=b"", headers=[(b"host", b"test")], server=("test", 80), scheme="http")
+    context = RequestContext("127.0.0.1")
+    context.user = UserToken(id=1, email="bench@example.com")
+    set_request_context(context)
+    return Request(scope)
+
+
+async def per_call_us(fn, request: Request, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        await fn(request, status_code=200)
+    return (time.perf_counter() - start) / count * 1_000_000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, "w")
+    logger.handlers = [logging.StreamHandler(devnull)]
+    logger.propagate = False
+
+    app = build_app()
+    api_log.access_log.init_app(app, LOG_FILE=os.devnull)
+    api_log.access_log.start()
+    headers = dict(Authorization=f"Bearer {jwt.encode(dict(id=1, email='bench@example.com'), JWT_SECRET, JWT_ALGORITHM)}")
+
+    request = build_request()
+    for name, fn in (("off", no_logger), ("legacy", legacy_logger), ("pipeline", api_log.api_logger)):
+        token_validation.api_logger = fn
+        us = await per_request_us(app, headers, args.requests)
+        call_us = await per_call_us(fn, request, args.requests)
+        print(f"{name:<9} /api/me {us:8.1f} us/req   api_logger on request path {call_us:6.2f} us/call")
+
+    api_log.access_log.stop()
+    print(f"pipeline stats: {api_log.access_log.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
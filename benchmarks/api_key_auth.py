@@ -0,0 +1,117 @@
+"""
+API Key(HMAC) 인증 요청당 DB query 수 / 처리량 비교 (api key cache on / off, sqlite)
+whitelist CIDR 개수와 관계 없이 IP 검사 비용이 일정한지도 확인
+
+usage: python -m benchmarks.api_key_auth --requests 2000 --whitelist 1000
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import tempfile
+import time
+from ipaddress import IPv4Address
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event, insert, text
+
+from app.common.context import request_context
+from app.database.conn import db, Base
+from app.database.models import ApiKeys, ApiWhiteLists
+from app.middlewares.api_key_cache import IPWhitelist, api_key_cache
+from app.middlewares.token_validation import AccessControlMiddleware
+
+ACCESS_KEY = "bench-access-key"
+SECRET_KEY = "bench-secret-key"
+
+
+def build_app(database_url: str, cache_size: int) -> FastAPI:
+    app = FastAPI()
+    db.init_app(app, DB_URL=database_url)
+    api_key_cache.init_app(app, API_KEY_CACHE_SIZE=cache_size)
+    app.add_middleware(AccessControlMiddleware)
+
+    @app.get("/api/ping")
+    async def ping():
+        return dict(id=request_context().user.id)
+
+    return app
+
+
+def seed(whitelist_size: int):
+    Base.metadata.create_all(db.engine)
+    with db.engine.begin() as connection:
+        connection.execute(text("INSERT INTO users (id, email, created_at, updated_at) VALUES (1, 'bench@example.com', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"))
+        connection.execute(insert(ApiKeys), [dict(id=1, access_key=ACCESS_KEY, secret_key=SECRET_KEY, user_id=1, is_whitelisted=True)])
+        connection.execute(insert(ApiWhiteLists), [dict(ip_address=ip, api_key_id=1) for ip in whitelist(whitelist_size)])
+
+
+def whitelist(size: int) -> list:
+    # /32 절반, /24 절반, 요청 IP(127.0.0.1)는 마지막에 추가
+    addresses = [str(IPv4Address(0x0A000000 + i)) for i in range(size // 2)]
+    addresses += [f"{IPv4Address(0x0B000000 + (i << 8))}/24" for i in range(size - len(addresses))]
+    return addresses + ["127.0.0.0/8"]
+
+
+def signed_request() -> tuple:
+    query_string = f"key={ACCESS_KEY}&timestamp={int(time.time())}"
+    signature = base64.b64encode(hmac.new(SECRET_KEY.encode(), query_string.encode(), hashlib.sha256).digest()).decode()
+    return query_string, dict(secret=signature)
+
+
+async def run(app: FastAPI, count: int) -> tuple:
+    queries = 0
+
+    def count_query(*args, **kwargs):
+        nonlocal queries
+        queries += 1
+
+    event.listen(db.engine, "before_cursor_execute", count_query)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        query_string, headers = signed_request()
+        assert (await client.get(f"/api/ping?{query_string}", headers=headers)).status_code == 200
+        queries = 0
+        start = time.perf_counter()
+        for _ in range(count):
+            await client.get(f"/api/ping?{query_string}", headers=headers)
+        elapsed = time.perf_counter() - start
+    event.remove(db.engine, "before_cursor_execute", count_query)
+    return count / elapsed, queries / count
+
+
+def ip_match_cost(size: int, count: int = 100000) -> float:
+    ip_whitelist = IPWhitelist(whitelist(size))
+    start = time.perf_counter()
+    for _ in range(count):
+        ip_whitelist.match("127.0.0.1")
+    return (time.perf_counter() - start) / count * 1_000_000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--whitelist", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        for name, cache_size in (("cache off", 0), ("cache on", 10000)):
+            app = build_app(database_url, cache_size)
+            if cache_size == 0:
+                seed(args.whitelist)
+            rps, queries = await run(app, args.requests)
+            db.engine.dispose()
+            print(f"{name:<10} /api/ping {rps:8.1f} req/s   db queries/request {queries:.2f}")
+        print(f"cache stats: {api_key_cache.stats()}")
+
+    for size in (10, 100, args.whitelist):
+        print(f"whitelist {size:>6} entries: match {ip_match_cost(size):6.2f} us/call")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+API Key N개 변경/삭제: 단건 API N번 호출 vs bulk API 한번 호출 (sqlite)
+MAX_API_KEY 제한을 피하기 위해 key는 SQL로 직접 적재
+
+usage: python -m benchmarks.api_key_bulk --keys 500 [--async-db]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import event, insert
+
+from app.database.conn import db
+from app.database.models import ApiKeys
+from benchmarks.api_key_concurrency import build_app, create_schema
+
+
+async def seed_keys(is_async: bool, count: int):
+    rows = [dict(access_key=f"bench-{i}", secret_key="secret", memo=f"key-{i}", user_id=1) for i in range(count)]
+    if is_async:
+        async with db.engine.begin() as connection:
+            await connection.execute(insert(ApiKeys), rows)
+    else:
+        with db.engine.begin() as connection:
+            connection.execute(insert(ApiKeys), rows)
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args, **kwargs):
+        self.count += 1
+
+
+async def measure(name: str, counter: QueryCounter, requests):
+    counter.count = 0
+    start = time.perf_counter()
+    responses = [await request() for request in requests]
+    elapsed = time.perf_counter() - start
+    failed = sum(response.status_code != 200 for response in responses)
+    print(f"{name:<14} requests={len(responses):<5} elapsed={elapsed:.3f}s queries={counter.count:<6} failed={failed}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=500)
+    parser.add_argument("--async-db", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app = build_app(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}", args.async_db)
+        await create_schema(args.async_db)
+        await seed_keys(args.async_db, args.keys * 2)
+        counter = QueryCounter(db.engine.sync_engine if args.async_db else db.engine)
+
+        single_ids = range(1, args.keys + 1)
+        bulk_ids = range(args.keys + 1, args.keys * 2 + 1)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await measure("single put", counter, [lambda key_id=key_id: client.put(f"/api/apikeys/{key_id}", json=dict(memo="changed")) for key_id in single_ids])
+            bulk_body = dict(keys=[dict(id=key_id, memo="changed") for key_id in bulk_ids])
+            await measure("bulk put", counter, [lambda: client.put("/api/apikeys/bulk", json=bulk_body)])
+            await measure("bulk delete", counter, [lambda: client.request("DELETE", "/api/apikeys/bulk", json=dict(ids=list(bulk_ids)))])
+
+        if args.async_db:
+            await db.engine.dispose()
+        else:
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
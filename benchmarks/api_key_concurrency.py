@@ -0,0 +1,107 @@
+"""
+한 유저에 대해 POST /apikeys 를 동시에 N번 호출해도 MAX_API_KEY 제한이 유지되는지 확인 (sqlite)
+
+usage: python -m benchmarks.api_key_concurrency --concurrency 50 [--async-db]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import func, select, text
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.common.consts import MAX_API_KEY
+from app.common.context import RequestContext, set_request_context, reset_request_context
+from app.database.conn import db, Base
+from app.database.models import ApiKeys
+from app.errors.exceptions import APIException
+from app.routers import user
+from app.schema import UserToken
+
+# 동시 요청 수 (tests/test_api_key_cap.py 와 공유)
+CONCURRENCY = 50
+
+
+async def fake_user(request: Request, call_next):
+    # AccessControlMiddleware 대신 인증된 요청 context만 설정
+    context = RequestContext("127.0.0.1")
+    context.user = UserToken(id=1, email="bench@example.com")
+    token = set_request_context(context)
+    try:
+        return await call_next(request)
+    finally:
+        reset_request_context(token)
+
+
+def build_app(database_url: str, is_async: bool) -> FastAPI:
+    app = FastAPI()
+    db.init_app(app, DB_URL=database_url, DB_ASYNC=is_async, DB_POOL_SIZE=20, DB_MAX_OVERFLOW=40)
+
+    app.middleware("http")(fake_user)
+
+    @app.exception_handler(APIException)
+    async def api_exception_handler(request: Request, error: APIException):
+        return JSONResponse(dict(code=error.code, msg=error.msg), status_code=error.status_code)
+
+    app.include_router(user.router, prefix="/api")
+    return app
+
+
+async def create_schema(is_async: bool):
+    def ddl(connection):
+        Base.metadata.create_all(connection)
+        connection.execute(text("INSERT INTO users (id, email, created_at, updated_at) VALUES (1, 'bench@example.com', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"))
+
+    if is_async:
+        async with db.engine.begin() as connection:
+            await connection.run_sync(ddl)
+    else:
+        with db.engine.begin() as connection:
+            ddl(connection)
+
+
+async def count_keys(is_async: bool) -> int:
+    statement = select(func.count(ApiKeys.id)).where(ApiKeys.user_id == 1)
+    if is_async:
+        async with db.engine.connect() as connection:
+            return (await connection.execute(statement)).scalar()
+    with db.engine.connect() as connection:
+        return connection.execute(statement).scalar()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--async-db", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app = build_app(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}", args.async_db)
+        await create_schema(args.async_db)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(client.post("/api/apikeys", json=dict(memo=f"key-{i}")) for i in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+
+        created = await count_keys(args.async_db)
+        if args.async_db:
+            await db.engine.dispose()
+        else:
+            db.engine.dispose()
+        status_codes = Counter(response.status_code for response in responses)
+        print(f"requests={args.concurrency} elapsed={elapsed:.3f}s status={dict(status_codes)} created={created} max={MAX_API_KEY}")
+        assert created == MAX_API_KEY, f"expected {MAX_API_KEY} keys, got {created}"
+        assert status_codes[200] == MAX_API_KEY, f"expected {MAX_API_KEY} successful responses, got {status_codes[200]}"
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""
+API Key 대량 조회: 전체 ORM 조회(기존 방식) vs keyset pagination vs NDJSON export 의 시간 / 메모리 peak (sqlite)
+
+usage: python -m benchmarks.api_key_export --keys 50000 [--async-db]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+import httpx
+from fastapi import Depends
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.common.consts import MAX_API_KEY_PAGE_SIZE
+from app.common.context import request_context
+from app.database.conn import db, run_in_session
+from app.database.models import ApiKeys
+from app.schema import ApiKey
+from benchmarks.api_key_concurrency import build_app, create_schema
+
+
+async def seed_keys(is_async: bool, count: int):
+    rows = [dict(access_key=f"bench-{i}", secret_key="s" * 40, memo=f"key-{i}", user_id=1) for i in range(count)]
+    if is_async:
+        async with db.engine.begin() as connection:
+            await connection.execute(insert(ApiKeys), rows)
+    else:
+        with db.engine.begin() as connection:
+            connection.execute(insert(ApiKeys), rows)
+
+
+async def measure(name: str, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = await fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<12} rows={rows:<8} elapsed={elapsed:.3f}s peak={peak / 1024 / 1024:.1f}MiB")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=50000)
+    parser.add_argument("--async-db", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app = build_app(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}", args.async_db)
+
+        @app.get("/api/apikeys-all", response_model=List[ApiKey])
+        async def get_all_api_keys(session: Session = Depends(db.session)):
+            # 페이지네이션 이전 방식: 전체 ORM 조회 후 한번에 응답
+            user_id = request_context().user.id
+            return await run_in_session(session, lambda sync_session: sync_session.query(ApiKeys).filter(ApiKeys.user_id == user_id).all())
+
+        await create_schema(args.async_db)
+        await seed_keys(args.async_db, args.keys)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+
+            async def full_list():
+                return len((await client.get("/api/apikeys-all")).json())
+
+            async def paginated():
+                rows, params = 0, dict(limit=MAX_API_KEY_PAGE_SIZE)
+                while True:
+                    response = await client.get("/api/apikeys", params=params)
+                    rows += len(response.json())
+                    if "x-next-cursor" not in response.headers:
+                        return rows
+                    params["cursor"] = response.headers["x-next-cursor"]
+
+            async def export():
+                # httpx ASGITransport는 body 전체를 모아서 반환하므로 ASGI app을 직접 호출하고 받은 chunk는 버림
+                rows = 0
+                messages = [dict(type="http.request", body=b"", more_body=False)]
+                done = asyncio.Event()
+
+                async def receive():
+                    if messages:
+                        return messages.pop()
+                    await done.wait()
+                    return dict(type="http.disconnect")
+
+                async def send(message):
+                    nonlocal rows
+                    if message["type"] == "http.response.body":
+                        rows += message.get("body", b"").count(b"\n")
+
+                scope = dict(
+                    type="http",
+                    method="GET",
+                    path="/api/apikeys/export",
+                    raw_path=b"/api/apikeys/export",
+                    query_string=b"",
+                    headers=[],
+                    client=("127.0.0.1", 0),
+                    server=("test", 80),
+                    scheme="http",
+                    http_version="1.1",
+                    root_path="",
+                )
+                await app(scope, receive, send)
+                done.set()
+                return rows
+
+            await measure("full list", full_list)
+            await measure("paginated", paginated)
+            await measure("export", export)
+
+        if args.async_db:
+            await db.engine.dispose()
+        else:
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+"""
+GET /api/apikeys 큰 페이지 응답 시간: 기본 응답 경로 vs fast_json router (sqlite)
+응답 body / X-Next-Cursor 헤더가 같은지도 확인
+
+usage: python -m benchmarks.api_key_list --keys 5000 --limit 1000 --requests 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.common.fast_json import fast_json
+from app.database.conn import db
+from app.routers import user
+from benchmarks.api_key_concurrency import create_schema, fake_user
+from benchmarks.api_key_export import seed_keys
+
+
+def build_app(fast: bool) -> FastAPI:
+    app = FastAPI()
+
+    app.middleware("http")(fake_user)
+    app.include_router(fast_json(user.router) if fast else user.router, prefix="/api")
+    return app
+
+
+async def run(app: FastAPI, limit: int, count: int) -> tuple:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        url = f"/api/apikeys?limit={limit}"
+        first = await client.get(url)
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            response = await client.get(url)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200
+    return first, timings
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db.init_app(FastAPI(), DB_URL=f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        await create_schema(False)
+        await seed_keys(False, args.keys)
+
+        print(f"keys={args.keys} limit={args.limit} requests={args.requests}")
+        responses = {}
+        for name, fast in (("default", False), ("fast_json", True)):
+            first, timings = await run(build_app(fast), args.limit, args.requests)
+            responses[name] = first
+            timings.sort()
+            print(
+                f"{name:<10} p50={statistics.median(timings) * 1000:7.2f}ms p95={timings[int(len(timings) * 0.95) - 1] * 1000:7.2f}ms"
+                f" {len(timings) / sum(timings):7.1f} req/s body={len(first.content)} bytes"
+            )
+
+        default, fast = responses["default"], responses["fast_json"]
+        assert default.json() == fast.json(), "response body differs"
+        assert default.headers.get("x-next-cursor") == fast.headers.get("x-next-cursor"), "X-Next-Cursor differs"
+        print(f"same body / X-Next-Cursor={fast.headers.get('x-next-cursor')}")
+        db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,265 @@
+"""
+API 부하 테스트: create_app() (API_ENV=bench, sqlite)에 회원가입 -> 로그인 -> /me -> /apikeys 생성/조회/변경/삭제 -> health check 순서로 부하
+- asgi   : httpx ASGITransport로 같은 process에서 호출 (네트워크 / 서버 제외)
+- uvicorn: python -m app.server process에 실제 HTTP 요청 (end-to-end)
+endpoint 별 처리량, p50/p95/p99, 요청당 DB query 수(/metrics의 http_request_db_queries_total 증가분)를 출력하고 JSON으로 저장 (기본 benchmarks/results/, git 제외)
+--compare로 이전 결과(다른 commit)와 비교
+
+usage: python -m benchmarks.api_load --users 200 --concurrency 16 [--mode asgi uvicorn] [--workers 1] [--output result.json] [--compare base.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+
+from benchmarks.server_throughput import wait_ready
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DB_QUERIES = re.compile(r'^http_request_db_queries_total\{route="(?P<route>[^"]*)",method="(?P<method>[^"]*)"} (?P<count>\d+)$', re.M)
+
+
+async def register(client: httpx.AsyncClient, user: dict) -> httpx.Response:
+    response = await client.post("/api/auth/register/email", json=dict(email=user["email"], pw=user["pw"]))
+    if response.status_code == 200:
+        user["token"] = response.json()["Authorization"]
+    return response
+
+
+async def login(client: httpx.AsyncClient, user: dict) -> httpx.Response:
+    response = await client.post("/api/auth/login/email", json=dict(email=user["email"], pw=user["pw"]))
+    if response.status_code == 200:
+        user["token"] = response.json()["Authorization"]
+    return response
+
+
+async def me(client: httpx.AsyncClient, user: dict) -> httpx.Response:
+    return await client.get("/api/me", headers=dict(Authorization=user["token"]))
+
+
+async def create_api_key(client: httpx.AsyncClient, user: dict) -> httpx.Response:
+    response = await client.post("/api/apikeys", json=dict(memo="bench"), headers=dict(Authorization=user["token"]))
+    if response.status_code == 200:
+        user["key_id"] = response.json()["id"]
+    return response
+
+
+async def list_api_keys(client: httpx.AsyncClient, user: dict) -> httpx.Response:
+    return await client.get("/api/apikeys", headers=dict(Authorization=user["token"]))
+
+
+async def change_api_key(client: httpx.AsyncClient, user: dict) -> httpx.Response:
+    return await client.put(f"/api/apikeys/{user['key_id']}", json=dict(memo="changed"), headers=dict(Authorization=user["token"]))
+
+
+async def delete_api_key(client: httpx.AsyncClient, user: dict) -> httpx.Response:
+    return await client.request("DELETE", "/api/apikeys/bulk", json=dict(ids=[user["key_id"]]), headers=dict(Authorization=user["token"]))
+
+
+async def health(client: httpx.AsyncClient, user: dict) -> httpx.Response:
+    return await client.get("/")
+
+
+# (이름, method, route template(/metrics label), 유저 1명당 요청 1번)
+PHASES = (
+    ("register", "POST", "/api/auth/register/{sns_type}", register),
+    ("login", "POST", "/api/auth/login/{sns_type}", login),
+    ("me", "GET", "/api/me", me),
+    ("key_create", "POST", "/api/apikeys", create_api_key),
+    ("key_list", "GET", "/api/apikeys", list_api_keys),
+    ("key_change", "PUT", "/api/apikeys/{key_id}", change_api_key),
+    ("key_delete", "DELETE", "/api/apikeys/bulk", delete_api_key),
+    ("health", "GET", "/", health),
+)
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    """
+    처리량 / latency 분포 (ms)
+    :param latencies: 요청별 소요 시간(초)
+    :param errors: 실패(전송 실패 또는 4xx/5xx) 수
+    :param elapsed: 전체 소요 시간(초)
+    :return:
+    """
+    if not latencies:
+        return dict(requests=0, errors=errors, rps=0.0, p50=None, p95=None, p99=None, max=None)
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return dict(
+        requests=len(latencies),
+        errors=errors,
+        rps=round(len(latencies) / elapsed, 1) if elapsed else None,
+        p50=round(quantiles[49] * 1000, 3),
+        p95=round(quantiles[94] * 1000, 3),
+        p99=round(quantiles[98] * 1000, 3),
+        max=round(max(latencies) * 1000, 3),
+    )
+
+
+async def db_queries(client: httpx.AsyncClient) -> dict:
+    """
+    /metrics 의 (route, method) 별 누적 DB query 수
+    :param client:
+    :return:
+    """
+    response = await client.get("/metrics")
+    return {(match["route"], match["method"]): int(match["count"]) for match in DB_QUERIES.finditer(response.text)}
+
+
+async def run_phase(client: httpx.AsyncClient, fn, users: list, concurrency: int) -> tuple:
+    latencies = []
+    errors = 0
+    pending = iter(users)
+
+    async def worker():
+        nonlocal errors
+        # 같은 iterator를 나눠 가져가므로 유저마다 한번씩만 요청
+        for user in pending:
+            start = time.perf_counter()
+            try:
+                failed = (await fn(client, user)).status_code >= 400
+            except httpx.TransportError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run_scenario(client: httpx.AsyncClient, users: int, concurrency: int, metrics_delay: float = 0) -> dict:
+    run_id = f"{os.getpid()}{int(time.time())}"
+    accounts = [dict(email=f"bench{run_id}_{index}@example.com", pw="bench-password", token=None, key_id=None) for index in range(users)]
+    results = {}
+    for name, method, route, fn in PHASES:
+        before = await db_queries(client)
+        latencies, errors, elapsed = await run_phase(client, fn, accounts, concurrency)
+        # multi worker: 다른 worker의 snapshot 파일이 갱신될 때까지 대기 (METRICS_FLUSH_INTERVAL)
+        await asyncio.sleep(metrics_delay)
+        queries = (await db_queries(client)).get((route, method), 0) - before.get((route, method), 0)
+        results[name] = summarize(latencies, errors, elapsed)
+        results[name]["db_queries_per_request"] = round(queries / len(latencies), 2) if latencies else None
+    return results
+
+
+@contextlib.asynccontextmanager
+async def asgi_client():
+    # API_ENV / DB_URL 설정 후 import (config는 import 시점의 환경변수 사용)
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60) as client:
+            yield client
+
+
+@contextlib.asynccontextmanager
+async def uvicorn_client(env: dict, workers: int, port: int, concurrency: int):
+    # multi worker가 동시에 테이블을 만들지 않도록 먼저 생성
+    subprocess.run([sys.executable, "-m", "app.database.schema", "create"], env=env, check=True, stdout=subprocess.DEVNULL)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", str(workers), "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        await wait_ready(f"http://127.0.0.1:{port}/")
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            yield client
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(mode: str, results: dict):
+    for name, result in results.items():
+        print(
+            f"{mode:<8} {name:<11} n={result['requests']:<6} {result['rps'] or 0:8.1f} req/s"
+            f"  p50={result['p50'] or 0:8.2f}ms p95={result['p95'] or 0:8.2f}ms p99={result['p99'] or 0:8.2f}ms"
+            f"  errors={result['errors']:<4} db/req={result['db_queries_per_request']}"
+        )
+
+
+def print_comparison(base: dict, current: dict):
+    print(f"compare {base.get('commit')} -> {current.get('commit')} (req/s, p95 변화율)")
+    for mode, results in current["modes"].items():
+        for name, result in results.items():
+            before = base.get("modes", {}).get(mode, {}).get(name)
+            if not before or not before["rps"] or not before["p95"] or not result["rps"]:
+                continue
+            rps = (result["rps"] / before["rps"] - 1) * 100
+            p95 = (result["p95"] / before["p95"] - 1) * 100
+            print(f"{mode:<8} {name:<11} req/s {rps:+7.1f}%  p95 {p95:+7.1f}%")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mode", nargs="+", choices=("asgi", "uvicorn"), default=["asgi", "uvicorn"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본 benchmarks/results/api_load_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    report = dict(
+        commit=commit,
+        created_at=datetime.utcnow().isoformat(timespec="seconds"),
+        python=platform.python_version(),
+        users=args.users,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        modes={},
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode in args.mode:
+            env = dict(os.environ, API_ENV="bench", DB_URL=f"sqlite:///{os.path.join(tmp_dir, f'{mode}.db')}")
+            if mode == "asgi":
+                os.environ.update(env)
+                async with asgi_client() as client:
+                    results = await run_scenario(client, args.users, args.concurrency)
+            else:
+                env["METRICS_DIR"] = os.path.join(tmp_dir, "metrics")
+                async with uvicorn_client(env, args.workers, args.port, args.concurrency) as client:
+                    results = await run_scenario(client, args.users, args.concurrency, metrics_delay=1.5 if args.workers != 1 else 0)
+            report["modes"][mode] = results
+            print_results(mode, results)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"api_load_{commit or 'local'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"saved {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
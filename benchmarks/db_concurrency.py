@@ -0,0 +1,79 @@
+"""
+느린 쿼리 N개 동시 실행 시 처리량 비교 (sqlite + aiosqlite)
+
+- blocking : async 핸들러에서 동기 Session을 그대로 호출 (기존 방식, 이벤트 루프 블로킹)
+- threadpool: 동기 Session을 run_in_session으로 threadpool에서 실행
+- async    : DB_ASYNC=True, AsyncEngine/AsyncSession
+
+usage: python -m benchmarks.db_concurrency --concurrency 20 --delay-ms 100
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from fastapi import FastAPI
+from sqlalchemy import event, text
+
+from app.database.conn import SQLAlchemy, run_in_session
+
+# 네트워크 왕복/락 대기를 흉내내는 sleep(ms) 함수
+SLOW_QUERY = text("SELECT sleep(:delay_ms)")
+
+
+def register_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("sleep", 1, lambda delay_ms: time.sleep(delay_ms / 1000) or delay_ms)
+
+
+async def run_mode(database_url: str, is_async: bool, use_threadpool: bool, concurrency: int, delay_ms: int) -> float:
+    db = SQLAlchemy()
+    db.init_app(FastAPI(), DB_URL=database_url, DB_ASYNC=is_async)
+    engine = db.engine.sync_engine if is_async else db.engine
+    event.listen(engine, "connect", register_sleep)
+
+    async def slow_query():
+        if is_async:
+            async with db.session_factory() as session:
+                return (await session.execute(SLOW_QUERY, dict(delay_ms=delay_ms))).scalar()
+        with db.session_factory() as session:
+            if use_threadpool:
+                return await run_in_session(session, lambda s: s.execute(SLOW_QUERY, dict(delay_ms=delay_ms)).scalar())
+            return session.execute(SLOW_QUERY, dict(delay_ms=delay_ms)).scalar()
+
+    # 커넥션 풀 워밍업
+    await slow_query()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(slow_query() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    if is_async:
+        await db.engine.dispose()
+    else:
+        db.engine.dispose()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--delay-ms", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        modes = [
+            ("blocking", False, False),
+            ("threadpool", False, True),
+            ("async", True, False),
+        ]
+        print(f"concurrency={args.concurrency} delay={args.delay_ms}ms")
+        for name, is_async, use_threadpool in modes:
+            elapsed = await run_mode(database_url, is_async, use_threadpool, args.concurrency, args.delay_ms)
+            print(f"{name:<10} {elapsed:8.3f} s  {args.concurrency / elapsed:8.2f} queries/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
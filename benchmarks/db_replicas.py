@@ -0,0 +1,124 @@
+"""
+read replica 라우팅 (sqlite + aiosqlite, primary / replica 마다 별도 파일)
+
+- 느린 SELECT N개 동시 실행 시 replica 수 / 정책 별 처리량 (engine 당 커넥션 수는 DB_POOL_SIZE로 제한)
+- engine 별 쿼리 수, 접속 불가 replica가 섞여 있을 때 요청 실패 없이 제외되는지
+- 쓰기 후 읽기 / use_primary 가 primary로 가는지
+
+usage: python -m benchmarks.db_replicas --concurrency 40 --delay-ms 50 --pool-size 2 --replicas 3
+"""
+
+import argparse
+import asyncio
+import collections
+import os
+import tempfile
+import time
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event, select, text
+
+from app.database.conn import Base, SQLAlchemy
+from app.database.models import Users
+from app.database.routing import use_primary
+
+# 네트워크 왕복을 흉내내는 sleep(ms) 함수
+SLOW_QUERY = select(text("sleep(:delay_ms)"))
+
+
+def register_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("sleep", 1, lambda delay_ms: time.sleep(delay_ms / 1000) or delay_ms)
+
+
+async def run_mode(database_url: str, replica_urls: list, policy: str, args) -> dict:
+    db = SQLAlchemy()
+    db.init_app(
+        FastAPI(),
+        DB_URL=database_url,
+        DB_ASYNC=True,
+        DB_REPLICA_URLS=replica_urls,
+        DB_REPLICA_POLICY=policy,
+        DB_POOL_SIZE=args.pool_size,
+        DB_MAX_OVERFLOW=0,
+    )
+    queries = collections.Counter()
+    for index, engine in enumerate(db.sync_engines):
+        name = f"replica{index}" if index else "primary"
+        event.listen(engine, "connect", register_sleep)
+        event.listen(engine, "before_cursor_execute", lambda *_, name=name: queries.update([name]))
+
+    async def slow_query():
+        async with db.session_factory() as session:
+            try:
+                return (await session.execute(SLOW_QUERY, dict(delay_ms=args.delay_ms))).scalar()
+            except Exception as e:
+                return e
+
+    # 커넥션 풀 워밍업
+    await asyncio.gather(*(slow_query() for _ in range(len(replica_urls) + 1)))
+    queries.clear()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(slow_query() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    distribution = dict(sorted(queries.items()))
+
+    # 쓰기 후 읽기 (같은 session), use_primary
+    read_after_write = []
+    async with db.session_factory() as session:
+        session.add(Users(email="bench@test.com", name="bench"))
+        await session.commit()
+        queries.clear()
+        await session.execute(select(Users.id))
+        read_after_write += list(queries)
+    async with db.session_factory() as session:
+        use_primary(session)
+        queries.clear()
+        await session.execute(select(Users.id))
+        read_after_write += list(queries)
+
+    for engine in [db.engine, *db.replicas]:
+        await engine.dispose()
+    return dict(
+        elapsed=elapsed,
+        errors=sum(isinstance(result, Exception) for result in results),
+        queries=distribution,
+        read_after_write=read_after_write,
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--delay-ms", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--replicas", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        urls = [f"sqlite:///{os.path.join(tmp_dir, f'db{index}.db')}" for index in range(args.replicas + 1)]
+        for url in urls:
+            engine = create_engine(url)
+            Base.metadata.create_all(engine)
+            engine.dispose()
+        database_url, replica_urls = urls[0], urls[1:]
+        down_url = f"sqlite:///{os.path.join(tmp_dir, 'missing', 'down.db')}"
+
+        modes = [("primary only", [], "round_robin")]
+        modes += [(f"{count} replica(s)", replica_urls[:count], "round_robin") for count in range(1, args.replicas + 1)]
+        modes += [
+            ("least_connections", replica_urls, "least_connections"),
+            ("1 replica down", replica_urls + [down_url], "round_robin"),
+        ]
+
+        print(f"concurrency={args.concurrency} delay={args.delay_ms}ms pool_size={args.pool_size}")
+        for name, urls_, policy in modes:
+            result = await run_mode(database_url, urls_, policy, args)
+            print(
+                f"{name:<18} {result['elapsed']:7.3f} s {args.concurrency / result['elapsed']:8.2f} queries/s"
+                f"  errors={result['errors']}  queries={result['queries']}  read_after_write={result['read_after_write']}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
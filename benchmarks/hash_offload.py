@@ -0,0 +1,108 @@
+"""
+로그인(bcrypt 검증) 부하 중 헬스체크(/) p99 latency 비교
+
+- inline : async 핸들러에서 bcrypt.checkpw 직접 호출 (기존 방식)
+- pool   : PasswordHasher worker pool 사용
+
+usage: python -m benchmarks.hash_offload --logins 4 --probes 50 --rounds 12
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import bcrypt
+import httpx
+from fastapi import FastAPI
+from starlette.responses import JSONResponse, Response
+
+from app.common.password import PasswordHasher
+from app.errors.exceptions import APIException
+
+
+def build_app(mode: str, hashed_pw: str, rounds: int, workers: int, max_queue: int) -> FastAPI:
+    app = FastAPI()
+    hasher = PasswordHasher(app, BCRYPT_ROUNDS=rounds, HASH_WORKERS=workers, HASH_MAX_QUEUE=max_queue)
+
+    @app.get("/")
+    async def index():
+        return Response("ok")
+
+    @app.post("/api/auth/login/email")
+    async def login():
+        try:
+            if mode == "inline":
+                verified = bcrypt.checkpw(b"password", hashed_pw.encode("utf-8"))
+            else:
+                verified = await hasher.checkpw("password", hashed_pw)
+        except APIException as e:
+            return JSONResponse(dict(code=e.code), status_code=e.status_code)
+        return dict(verified=verified)
+
+    return app
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def run(mode: str, args) -> dict:
+    hashed_pw = bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=args.rounds)).decode("utf-8")
+    app = build_app(mode, hashed_pw, args.rounds, args.workers, args.max_queue)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        stop = asyncio.Event()
+        status_codes = []
+
+        async def login_worker():
+            while not stop.is_set():
+                response = await client.post("/api/auth/login/email")
+                status_codes.append(response.status_code)
+                # in-memory transport는 yield 하지 않으므로 다른 task에 양보
+                await asyncio.sleep(0)
+
+        async def probe():
+            latencies = []
+            # login 부하가 걸린 뒤부터 측정
+            await asyncio.sleep(0.05)
+            for _ in range(args.probes):
+                # 이벤트 루프가 막혀 예정 시각보다 늦게 깨어난 시간까지 latency에 포함
+                scheduled = time.perf_counter() + args.interval
+                await asyncio.sleep(args.interval)
+                await client.get("/")
+                latencies.append((time.perf_counter() - scheduled) * 1000)
+            stop.set()
+            return latencies
+
+        workers = [asyncio.create_task(login_worker()) for _ in range(args.logins)]
+        latencies = await probe()
+        await asyncio.gather(*workers)
+
+    return dict(
+        p50=statistics.median(latencies),
+        p99=percentile(latencies, 99),
+        logins=len(status_codes),
+        rejected=status_codes.count(503),
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=4, help="동시 login 요청 수")
+    parser.add_argument("--probes", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.02, help="헬스체크 간격(초)")
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=64)
+    args = parser.parse_args()
+
+    for mode in ("inline", "pool"):
+        result = await run(mode, args)
+        print(f"{mode:<6} / p50={result['p50']:8.2f} ms  p99={result['p99']:8.2f} ms  logins={result['logins']} rejected(503)={result['rejected']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+잘못된 토큰 요청 처리량 (AccessControlMiddleware 에러 경로, ASGI 직접 호출)
+
+- 토큰 없음(NotAuthorizedEx) / 깨진 토큰(TokenDecodeEx)
+- 4xx access log 기록 비율(LOG_4XX_SAMPLE_RATE) 별 비교, 에러 body 생성 비용(JSONResponse vs 미리 직렬화) 비교
+
+usage: python -m benchmarks.invalid_token --requests 20000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from fastapi import FastAPI
+from starlette.responses import JSONResponse
+
+from app.errors import exceptions as ex
+from app.middlewares.token_validation import AccessControlMiddleware
+from utils.logger import access_log
+
+CASES = {
+    "no token": [],
+    "bad token": [(b"authorization", b"Bearer not.a.jwt")],
+}
+
+
+def build_app() -> AccessControlMiddleware:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return dict(ok=True)
+
+    return AccessControlMiddleware(app)
+
+
+async def run(app, headers: list, count: int) -> float:
+    scope = dict(
+        type="http",
+        method="GET",
+        path="/api/me",
+        raw_path=b"/api/me",
+        query_string=b"",
+        headers=[(b"host", b"bench")] + headers,
+        client=("10.0.0.1", 1234),
+        server=("bench", 80),
+        scheme="http",
+        http_version="1.1",
+        root_path="",
+    )
+    statuses = []
+
+    async def receive():
+        return dict(type="http.request", body=b"", more_body=False)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    start = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope), receive, send)
+    elapsed = time.perf_counter() - start
+    assert all(status in (400, 401) for status in statuses), set(statuses)
+    return elapsed
+
+
+def render(count: int) -> tuple:
+    error = ex.NotAuthorizedEx()
+    start = time.perf_counter()
+    for _ in range(count):
+        JSONResponse(dict(status_code=error.status_code, code=error.code, msg=error.msg, detail=error.detail), status_code=error.status_code)
+    legacy = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(count):
+        error.body()
+    return legacy, time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    app = build_app()
+    for sample_rate in (1.0, 0.01, 0.0):
+        access_log.init_app(FastAPI(), LOG_FILE=os.devnull, LOG_4XX_SAMPLE_RATE=sample_rate, LOG_QUEUE_SIZE=args.requests * 2)
+        access_log.start()
+        for name, headers in CASES.items():
+            elapsed = await run(app, headers, args.requests)
+            print(f"log 4xx {sample_rate:<5} {name:<10} {elapsed:7.3f} s {args.requests / elapsed:10.0f} req/s")
+        access_log.stop()
+
+    legacy, prerendered = render(args.requests)
+    print(f"error body  JSONResponse {legacy / args.requests * 1e6:6.2f} us  prerendered {prerendered / args.requests * 1e6:6.2f} us")
+    print(f"skipped errors {dict(access_log.skipped_errors)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
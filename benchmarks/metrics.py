@@ -0,0 +1,61 @@
+"""
+MetricsMiddleware 요청당 오버헤드 (/)
+
+usage: python -m benchmarks.metrics --requests 3000
+"""
+
+import argparse
+import asyncio
+import time
+import timeit
+
+import httpx
+from fastapi import FastAPI
+from starlette.responses import Response
+
+from app.middlewares.metrics import MetricsMiddleware, PrometheusMetrics
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware, metrics=PrometheusMetrics())
+
+    @app.get("/")
+    async def index():
+        return Response("ok")
+
+    return app
+
+
+async def per_request_us(app: FastAPI, count: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/")
+        start = time.perf_counter()
+        for _ in range(count):
+            await client.get("/")
+        return (time.perf_counter() - start) / count * 1_000_000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+
+    for name, with_metrics in (("metrics off", False), ("metrics on", True)):
+        us = await per_request_us(build_app(with_metrics), args.requests)
+        print(f"{name:<12} / {us:8.1f} us/req")
+
+    metrics = PrometheusMetrics()
+
+    def record():
+        metrics.requests.request_started("GET")
+        metrics.requests.request_finished("/api/me", "GET", 200, 0.0042, 0.001, 1)
+
+    record_us = timeit.timeit(record, number=args.requests * 10) / (args.requests * 10) * 1_000_000
+    print(f"record only  {record_us:8.3f} us/req")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+"""
+예외 경로 검사 비용 비교 (수백개의 exact/prefix 예외 경로)
+
+- legacy : 요청마다 re.match(미컴파일 regex) + list 선형 탐색
+- matcher: PathMatcher (set / 길이별 prefix set / compiled regex)
+
+host 추출도 Headers 객체 생성과 raw header 탐색을 비교
+
+usage: python -m benchmarks.path_matcher --paths 300 --count 100000
+"""
+
+import argparse
+import re
+import timeit
+
+from starlette.datastructures import Headers
+
+from app.middlewares.path_matcher import PathMatcher
+from app.middlewares.trusted_hosts import get_host
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", type=int, default=300)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    exact = [f"/public/page-{i}" for i in range(args.paths)]
+    prefix = [f"/static-{i}" for i in range(args.paths)]
+    legacy_regex = "^(" + "|".join(prefix) + ")"
+    matcher = PathMatcher(exact=exact, prefix=prefix)
+
+    def legacy(path):
+        return bool(re.match(legacy_regex, path)) or path in exact
+
+    samples = dict(
+        miss="/api/apikeys",
+        exact_hit=exact[-1],
+        prefix_hit=f"{prefix[-1]}/app.js",
+    )
+    for name, path in samples.items():
+        assert legacy(path) == matcher.match(path)
+        legacy_us = timeit.timeit(lambda: legacy(path), number=args.count) / args.count * 1_000_000
+        matcher_us = timeit.timeit(lambda: matcher.match(path), number=args.count) / args.count * 1_000_000
+        print(f"{name:<10} legacy {legacy_us:8.3f} us   matcher {matcher_us:8.3f} us")
+
+    scope = dict(
+        type="http",
+        path="/api/apikeys",
+        headers=[
+            (b"host", b"api.example.com:8000"),
+            (b"user-agent", b"bench"),
+            (b"accept", b"*/*"),
+            (b"authorization", b"Bearer token"),
+        ],
+    )
+    headers_us = timeit.timeit(lambda: Headers(scope=scope).get("host", "").split(":")[0], number=args.count) / args.count * 1_000_000
+    raw_us = timeit.timeit(lambda: get_host(scope), number=args.count) / args.count * 1_000_000
+    print(f"host       Headers {headers_us:7.3f} us   raw    {raw_us:8.3f} us")
+
+
+if __name__ == "__main__":
+    main()
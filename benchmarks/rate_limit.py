@@ -0,0 +1,70 @@
+"""
+RateLimitMiddleware 오버헤드 (token bucket 1회 / ASGI 요청 1회, memory / fakeredis)
+
+usage: python -m benchmarks.rate_limit --requests 20000 --keys 1000 --limit 5
+"""
+
+import argparse
+import asyncio
+import time
+
+from starlette.types import Receive, Scope, Send
+
+from app.middlewares.rate_limit import MemoryTokenBucket, RateLimiter, RateLimitMiddleware, RedisTokenBucket
+
+
+def backends() -> dict:
+    backend_list = dict(memory=MemoryTokenBucket())
+    try:
+        from fakeredis import aioredis
+
+        backend_list["fakeredis"] = RedisTokenBucket(client=aioredis.FakeRedis())
+    except ImportError:
+        print("fakeredis not installed, skip redis backend")
+    return backend_list
+
+
+async def ok_app(scope: Scope, receive: Receive, send: Send):
+    await send(dict(type="http.response.start", status=200, headers=[]))
+    await send(dict(type="http.response.body", body=b"ok"))
+
+
+async def call(app, count: int, keys: int) -> tuple:
+    statuses = []
+
+    async def receive():
+        return dict(type="http.request", body=b"", more_body=False)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    start = time.perf_counter()
+    for index in range(count):
+        scope = dict(type="http", path="/api/me", state=dict(ip=f"10.0.{index % keys // 256}.{index % keys % 256}"))
+        await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    return elapsed / count * 1_000_000, statuses.count(429)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=5, help="key당 초당 허용 요청 수")
+    args = parser.parse_args()
+
+    baseline, _ = await call(ok_app, args.requests, args.keys)
+    print(f"{'no limiter':<12} {baseline:8.2f} us/request")
+
+    for name, backend in backends().items():
+        limiter = RateLimiter()
+        limiter.set_backend(backend)
+        limiter.set_rules([("/api", args.limit, 1)])
+        per_request, rejected = await call(RateLimitMiddleware(ok_app, limiter=limiter), args.requests, args.keys)
+        print(f"{name:<12} {per_request:8.2f} us/request   overhead {per_request - baseline:8.2f} us   rejected={rejected}")
+        await backend.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,292 @@
+"""
+요청 replay: jsonl 파일(한 줄에 요청 하나)을 읽으면서 create_app() (API_ENV=bench, sqlite) 또는 지정한 서버에 다시 보냄
+파일은 한 줄씩 읽고 대기열(concurrency * 2)만큼만 메모리에 둠 (.gz 가능)
+
+요청 형식: {"method": "GET", "path": "/api/me?x=1", "headers": {...}, "json": {...} 또는 "body": "...", "timestamp": 1700000000.5}
+method/path가 없는 줄(JSON이 아니거나 다른 형식의 기록)은 건너뛰고 개수만 집계
+
+- --rate original: timestamp 간격 그대로 (--speed 배속), 숫자: 고정 RPS, max: 최대 속도
+- Authorization header는 --token 값 또는 시작 시 가입시킨 bench 유저(--users) token으로 치환 (같은 원래 token -> 같은 유저)
+- route(숫자/uuid path segment는 {id}) 별 latency 분포 / 에러율 출력
+
+usage: python -m benchmarks.replay [requests.jsonl] --concurrency 16 --rate original|max|<rps> [--speed 2]
+       [--mode asgi|uvicorn | --url http://host:port] [--token "Bearer ..."] [--users 10] [--output replay.json]
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import re
+import tempfile
+import time
+from array import array
+from collections import Counter
+from typing import Iterator
+from urllib.parse import urlsplit
+
+import httpx
+
+from benchmarks.api_load import asgi_client, register, summarize, uvicorn_client
+
+ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{32}|[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12})$")
+# 다시 보내지 않는 header (연결 / 길이는 client가 새로 정함)
+DROP_HEADERS = {"host", "content-length", "connection", "transfer-encoding", "keep-alive"}
+# app.common.config는 API_ENV / DB_URL 설정 전에 import 하지 않음
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# route 종류가 이보다 많으면 나머지는 "other"로 집계 (큰 파일에서 메모리 제한)
+MAX_ROUTES = 1000
+
+
+def parse_record(line: str) -> dict | None:
+    """
+    jsonl 한 줄 -> 요청, 요청 형식이 아니면 None
+    :param line:
+    :return:
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+
+    method, path = record.get("method"), record.get("path")
+    if path is None and isinstance(record.get("url"), str):
+        url = urlsplit(record["url"])
+        path = f"{url.path}?{url.query}" if url.query else url.path
+    if not isinstance(method, str) or not isinstance(path, str) or not path.startswith("/"):
+        return None
+    record["method"], record["path"] = method.upper(), path
+    return record
+
+
+def read_records(file_path: str, stats: "ReplayStats") -> Iterator[dict]:
+    opener = gzip.open if file_path.endswith(".gz") else open
+    with opener(file_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = parse_record(line)
+            if record is None:
+                stats.skipped += 1
+                continue
+            yield record
+
+
+def route_key(method: str, path: str) -> str:
+    segments = path.partition("?")[0].split("/")
+    return f"{method} {'/'.join('{id}' if ID_SEGMENT.match(segment) else segment for segment in segments)}"
+
+
+def request_headers(record: dict, tokens: list) -> dict:
+    """
+    기록된 header에서 연결 관련 header 제외, Authorization은 tokens 중 하나로 치환
+    :param record:
+    :param tokens: 비어 있으면 치환 안함
+    :return:
+    """
+    headers = {}
+    for name, value in (record.get("headers") or {}).items():
+        lower = name.lower()
+        if lower in DROP_HEADERS:
+            continue
+        if lower == "authorization" and tokens:
+            value = tokens[hash(value) % len(tokens)]
+        headers[name] = value
+    return headers
+
+
+class RouteStats:
+    __slots__ = ("latencies", "errors", "statuses")
+
+    def __init__(self):
+        # 요청 수가 많아도 float 객체 대신 8 byte 씩
+        self.latencies = array("d")
+        self.errors = 0
+        self.statuses = Counter()
+
+
+class ReplayStats:
+    def __init__(self):
+        self.routes = {}
+        self.skipped = 0
+        self.max_lag = 0.0
+
+    def observe(self, key: str, elapsed: float, status_code: int | None):
+        route = self.routes.get(key)
+        if route is None:
+            if len(self.routes) >= MAX_ROUTES:
+                key = "other"
+            route = self.routes.setdefault(key, RouteStats())
+        route.latencies.append(elapsed)
+        route.statuses[status_code or "error"] += 1
+        if status_code is None or status_code >= 400:
+            route.errors += 1
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for key, route in sorted(self.routes.items(), key=lambda item: -len(item[1].latencies)):
+            result = summarize(route.latencies, route.errors, elapsed)
+            result["error_rate"] = round(route.errors / len(route.latencies), 4)
+            result["statuses"] = {str(status): count for status, count in route.statuses.most_common()}
+            routes[key] = result
+        requests = sum(len(route.latencies) for route in self.routes.values())
+        errors = sum(route.errors for route in self.routes.values())
+        return dict(
+            requests=requests,
+            errors=errors,
+            skipped=self.skipped,
+            elapsed=round(elapsed, 3),
+            rps=round(requests / elapsed, 1) if elapsed else None,
+            max_lag_ms=round(self.max_lag * 1000, 3),
+            routes=routes,
+        )
+
+
+async def produce(records: Iterator[dict], queue: asyncio.Queue, rate: str, speed: float, workers: int):
+    """
+    예정 시각에 맞춰 대기열에 넣음 (대기열이 차면 기다리므로 파일을 앞서 읽지 않음)
+    :param records:
+    :param queue:
+    :param rate: original / max / 초당 요청 수
+    :param speed: original 배속
+    :param workers: 종료 표시 개수
+    :return:
+    """
+    interval = None if rate in ("original", "max") else 1 / float(rate)
+    start = time.perf_counter()
+    first_timestamp = None
+    for index, record in enumerate(records):
+        due = None
+        if rate == "original":
+            timestamp = record.get("timestamp", record.get("ts"))
+            if isinstance(timestamp, (int, float)):
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                due = start + (timestamp - first_timestamp) / speed
+        elif interval is not None:
+            due = start + index * interval
+        if due is not None:
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await queue.put((record, due))
+    for _ in range(workers):
+        await queue.put(None)
+
+
+async def send(client: httpx.AsyncClient, queue: asyncio.Queue, tokens: list, stats: ReplayStats):
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        record, due = item
+        if due is not None:
+            # 예정 시각보다 늦게 보낸 정도 (concurrency가 부족하면 커짐)
+            stats.max_lag = max(stats.max_lag, time.perf_counter() - due)
+
+        kwargs = dict(headers=request_headers(record, tokens))
+        if "json" in record:
+            kwargs["json"] = record["json"]
+        elif record.get("body") is not None:
+            body = record["body"]
+            kwargs["content"] = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+
+        start = time.perf_counter()
+        try:
+            status_code = (await client.request(record["method"], record["path"], **kwargs)).status_code
+        except httpx.TransportError:
+            status_code = None
+        stats.observe(route_key(record["method"], record["path"]), time.perf_counter() - start, status_code)
+
+
+async def bench_tokens(client: httpx.AsyncClient, users: int) -> list:
+    """
+    치환용 유저 가입 후 access token 목록
+    :param client:
+    :param users:
+    :return:
+    """
+    run_id = f"{os.getpid()}{int(time.time())}"
+    accounts = [dict(email=f"replay{run_id}_{index}@example.com", pw="replay-password", token=None) for index in range(users)]
+    for account in accounts:
+        await register(client, account)
+    return [account["token"] for account in accounts if account["token"]]
+
+
+async def replay(client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    tokens = [args.token] if args.token else await bench_tokens(client, args.users)
+    stats = ReplayStats()
+    queue = asyncio.Queue(maxsize=args.concurrency * 2)
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        produce(read_records(args.file, stats), queue, args.rate, args.speed, args.concurrency),
+        *(send(client, queue, tokens, stats) for _ in range(args.concurrency)),
+    )
+    return stats.report(time.perf_counter() - start)
+
+
+def print_report(report: dict):
+    print(
+        f"requests={report['requests']} errors={report['errors']} skipped lines={report['skipped']}"
+        f" elapsed={report['elapsed']:.2f}s {report['rps'] or 0:.1f} req/s max lag={report['max_lag_ms']:.1f}ms"
+    )
+    for key, result in report["routes"].items():
+        print(
+            f"{key:<40} n={result['requests']:<7} errors={result['error_rate'] * 100:6.2f}%"
+            f"  p50={result['p50']:8.2f}ms p95={result['p95']:8.2f}ms p99={result['p99']:8.2f}ms max={result['max']:8.2f}ms"
+        )
+
+
+def rate_type(value: str) -> str:
+    if value not in ("original", "max"):
+        try:
+            if float(value) <= 0:
+                raise ValueError
+        except ValueError:
+            raise argparse.ArgumentTypeError("original, max 또는 0보다 큰 초당 요청 수")
+    return value
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file", nargs="?", default=os.path.join(BASE_DIR, "requests.jsonl"))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=rate_type, default="original", help="original / max / 초당 요청 수")
+    parser.add_argument("--speed", type=float, default=1.0, help="--rate original 배속")
+    parser.add_argument("--mode", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--url", default=None, help="이미 실행 중인 서버 (지정하면 --mode 무시)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--token", default=None, help="모든 Authorization header를 이 값으로 치환")
+    parser.add_argument("--users", type=int, default=10, help="Authorization 치환용으로 가입시킬 유저 수 (0이면 치환 안함)")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ, API_ENV="bench", DB_URL=f"sqlite:///{os.path.join(tmp_dir, 'replay.db')}")
+        if args.url:
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            target = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60)
+        elif args.mode == "asgi":
+            os.environ.update(env)
+            target = asgi_client()
+        else:
+            env["METRICS_DIR"] = os.path.join(tmp_dir, "metrics")
+            target = uvicorn_client(env, args.workers, args.port, args.concurrency)
+
+        async with target as client:
+            report = await replay(client, args)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
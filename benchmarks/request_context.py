@@ -0,0 +1,131 @@
+"""
+요청 정보 저장 방식 비교: request.state 속성(기존 방식) vs slot 기반 RequestContext (contextvar)
+
+- 요청 정보 설정 + 조회(user / ip / 처리 시간)의 호출당 시간, 요청 동안 유지되는 메모리(tracemalloc)
+- AccessControlMiddleware 전체 경로(유효한 token, 빈 endpoint)의 요청당 시간 / 할당 peak
+
+usage: python -m benchmarks.request_context --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime
+
+import jwt
+from starlette.requests import Request
+
+from app.common.consts import JWT_SECRET, JWT_ALGORITHM
+from app.common.context import RequestContext, request_context, reset_request_context, set_request_context
+from app.middlewares import token_validation
+from app.middlewares.token_validation import AccessControlMiddleware
+from app.schema import UserToken
+
+USER = UserToken(id=1, email="bench@example.com")
+
+
+def build_scope(headers: list) -> dict:
+    return dict(type="http", method="GET", path="/api/me", query_string=b"", headers=headers, client=("127.0.0.1", 1234), server=("test", 80), scheme="http")
+
+
+def legacy(scope: dict):
+    # 기존 AccessControlMiddleware 방식
+    request = Request(scope)
+    ip = request.headers.get("x-forwarded-for", request.client.host).split(",")[0]
+    request.state.ip = ip
+    request.state.req_time = datetime.now()
+    request.state.start = time.time()
+    request.state.user = None
+    request.state.api_key = None
+    request.state.is_admin_access = None
+    request.state.inspect = None
+    request.state.user = USER
+    # logger / router 조회
+    return request, request.state.user.id, request.state.ip, (time.time() - request.state.start) * 1000
+
+
+def context(scope: dict):
+    client = scope.get("client")
+    new_context = RequestContext(client[0] if client else "")
+    token = set_request_context(new_context)
+    new_context.user = USER
+    current = request_context()
+    result = current, current.user.id, current.ip, current.elapsed_ms()
+    reset_request_context(token)
+    return result
+
+
+def per_call(fn, scope: dict, count: int) -> tuple:
+    fn(scope)
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        fn(scope)
+    elapsed = (time.perf_counter_ns() - start) / count
+
+    # 요청 동안 유지되는 메모리: 결과를 모두 살려둔 상태의 증가분
+    tracemalloc.start()
+    kept = [fn(scope) for _ in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return elapsed, current / count
+
+
+async def middleware_path(access_token: str, count: int) -> tuple:
+    async def endpoint(scope, receive, send):
+        assert request_context().user.id == 1
+        await send(dict(type="http.response.start", status=200, headers=[]))
+        await send(dict(type="http.response.body", body=b"{}"))
+
+    async def receive():
+        return dict(type="http.request", body=b"", more_body=False)
+
+    async def send(message):
+        pass
+
+    middleware = AccessControlMiddleware(endpoint)
+    scope = build_scope([(b"host", b"test"), (b"authorization", access_token.encode())])
+    await middleware(dict(scope), receive, send)
+
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        await middleware(dict(scope), receive, send)
+    elapsed = (time.perf_counter_ns() - start) / count
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(count, 2000)):
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await middleware(dict(scope), receive, send)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - base)
+    tracemalloc.stop()
+    return elapsed, sum(peaks) / len(peaks)
+
+
+async def no_logger(request: Request, status_code: int = None, error=None):
+    return None
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    scope = build_scope([(b"host", b"test")])
+    print(f"requests={args.requests}")
+    for name, fn in (("request.state", legacy), ("RequestContext", context)):
+        elapsed, memory = per_call(fn, scope, args.requests)
+        print(f"{name:<15} set+read {elapsed:8.0f} ns/req   kept {memory:7.0f} bytes/req")
+
+    # access log 기록(background 직렬화)은 제외
+    token_validation.api_logger = no_logger
+    access_token = f"Bearer {jwt.encode(dict(id=1, email='bench@example.com'), JWT_SECRET, JWT_ALGORITHM)}"
+    elapsed, peak = await middleware_path(access_token, args.requests)
+    print(f"AccessControlMiddleware (RequestContext) {elapsed / 1000:8.1f} us/req   alloc peak {peak:7.0f} bytes/req")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
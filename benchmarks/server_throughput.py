@@ -0,0 +1,108 @@
+"""
+app.server 처리량 비교 (worker 1개 vs N개), 실제 uvicorn(uvloop/httptools) process에 HTTP 부하
+부하 생성기도 같은 장비에서 실행되므로 CPU 수가 적으면 차이가 작게 나옴
+
+usage: python -m benchmarks.server_throughput --workers 1 4 --concurrency 64 --duration 10 [--path /]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+async def wait_ready(url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"server not ready: {url}")
+
+
+async def load(host: str, port: int, path: str, concurrency: int, duration: float) -> tuple:
+    """
+    keep-alive 연결 concurrency개로 duration 동안 GET 반복 (httpx는 동시 연결이 많으면 client 자체가 병목이라 raw HTTP/1.1 사용)
+    """
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+
+    async def worker():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                writer.write(request)
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                if not head.startswith(b"HTTP/1.1 200"):
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(
+            os.environ,
+            API_ENV="prod",
+            DB_URL=f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}",
+            ALLOW_SITE="http://127.0.0.1",
+            TRUSTED_HOSTS="127.0.0.1",
+            TRUSTED_PROXIES="127.0.0.1/32",
+        )
+        subprocess.run([sys.executable, "-m", "app.database.schema", "create"], env=env, check=True, stdout=subprocess.DEVNULL)
+
+        for workers in args.workers:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "app.server", "--workers", str(workers), "--port", str(args.port)],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                await wait_ready(f"http://127.0.0.1:{args.port}{args.path}")
+                latencies, errors, elapsed = await load("127.0.0.1", args.port, args.path, args.concurrency, args.duration)
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait(timeout=60)
+
+            quantiles = statistics.quantiles(latencies, n=100)
+            print(f"workers={workers:<3} requests={len(latencies):<7} {len(latencies) / elapsed:9.1f} req/s   " f"p50={quantiles[49] * 1000:7.2f}ms p99={quantiles[98] * 1000:7.2f}ms errors={errors}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
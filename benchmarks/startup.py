@@ -0,0 +1,82 @@
+"""
+cold start 시간: import(create_app 포함) / startup(lifespan) / 첫 요청, 시작 시 schema 처리 방식별 비교 (sqlite)
+각 측정은 새 process에서 실행, python -X importtime 기준 import 시간 상위 모듈도 출력
+
+usage: python -m benchmarks.startup --runs 5 [--tables 50]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+from app.common.config import conf_setting
+config = conf_setting()
+config.DB_SCHEMA_STARTUP = sys.argv[1] if sys.argv[1] != "none" else None
+config.DB_ECHO = False
+for index in range(int(sys.argv[2])):
+    # table 수가 많은 schema 흉내
+    from sqlalchemy import Column, Integer, Table
+    from app.database.conn import Base
+    Table(f"bench_{index}", Base.metadata, Column("id", Integer, primary_key=True))
+import httpx
+from app.main import app
+imported = time.perf_counter()
+
+async def main():
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get("/")).status_code == 200
+        first = time.perf_counter()
+    print(json.dumps(dict(imported=imported - start, started=started - imported, first_request=first - started, total=first - start)))
+
+asyncio.run(main())
+"""
+
+
+def probe(mode: str, tables: int, env: dict) -> dict:
+    result = subprocess.run([sys.executable, "-c", PROBE, mode, str(tables)], env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_time(env: dict, top: int = 10) -> list:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"], env=env, capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.append((int(cumulative), name.rstrip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tables", type=int, default=0, help="추가 테이블 수")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ, API_ENV="local", DB_URL=f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        # 한번 생성해 둔 뒤(배포 시 migration 단계) 시작 시 처리 방식만 비교
+        probe("create", args.tables, env)
+
+        for mode in ("create", "check", "none"):
+            runs = [probe(mode, args.tables, env) for _ in range(args.runs)]
+            summary = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+            print(f"schema={mode:<7} " + "  ".join(f"{key}={value:7.1f}ms" for key, value in summary.items()))
+
+        print("import app.main, cumulative us (top modules)")
+        for cumulative, name in import_time(env):
+            print(f"{cumulative:>10} {name}")
+
+
+if __name__ == "__main__":
+    main()
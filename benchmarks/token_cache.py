@@ -0,0 +1,68 @@
+"""
+AccessControlMiddleware 토큰 검증 오버헤드 비교 (token cache on / off)
+
+usage: python -m benchmarks.token_cache --requests 2000
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+import jwt
+from fastapi import FastAPI
+
+from app.common.consts import JWT_SECRET, JWT_ALGORITHM
+from app.common.context import request_context
+from app.middlewares.token_cache import token_cache
+from app.middlewares.token_validation import AccessControlMiddleware, get_user_token
+
+
+def build_app(cache_size: int) -> FastAPI:
+    app = FastAPI()
+    token_cache.init_app(app, TOKEN_CACHE_SIZE=cache_size)
+    app.add_middleware(AccessControlMiddleware)
+
+    @app.get("/api/me")
+    async def me():
+        return dict(id=request_context().user.id)
+
+    return app
+
+
+async def decode_only(access_token: str, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        await get_user_token(access_token)
+    return (time.perf_counter() - start) / count * 1_000_000
+
+
+async def requests_per_second(app: FastAPI, access_token: str, count: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = dict(Authorization=access_token)
+        await client.get("/api/me", headers=headers)
+        start = time.perf_counter()
+        for _ in range(count):
+            await client.get("/api/me", headers=headers)
+        return count / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    payload = dict(id=1, email="bench@example.com", name="bench", phone_number=None)
+    access_token = f"Bearer {jwt.encode(payload, JWT_SECRET, JWT_ALGORITHM)}"
+
+    for name, cache_size in (("cache off", 0), ("cache on", 10000)):
+        app = build_app(cache_size)
+        per_call = await decode_only(access_token, args.requests)
+        rps = await requests_per_second(app, access_token, args.requests)
+        print(f"{name:<10} token->UserToken {per_call:8.2f} us/call   /api/me {rps:8.1f} req/s")
+    print(f"cache stats: {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+폐기 token 목록: 100만 개 기준 메모리 / 조회 시간 (Bloom filter + 정렬 array vs set[str])
+revoked_tokens 테이블(sqlite) 전체 로드 / 증분 polling 시간도 측정
+
+usage: python -m benchmarks.token_revocation --entries 1000000 --lookups 200000 [--db-entries 100000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from sqlalchemy import insert
+
+from app.database.conn import Base, db
+from app.database.models import RevokedTokens
+from app.middlewares.token_revocation import RevocationList
+
+
+def measure_memory(build) -> tuple:
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    # 메모리는 tracemalloc 켠 상태로 한번 더 (build 시간은 tracemalloc 없이)
+    tracemalloc.start()
+    value = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current, elapsed
+
+
+def lookup_ns(check, jtis: list) -> float:
+    start = time.perf_counter_ns()
+    for jti in jtis:
+        check(jti)
+    return (time.perf_counter_ns() - start) / len(jtis)
+
+
+async def db_sync(entries: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db.init_app(FastAPI(), DB_URL=f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        Base.metadata.create_all(db.engine)
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        rows = [dict(jti=uuid.uuid4().hex, user_id=1, expires_at=expires_at) for _ in range(entries)]
+        # 만료된 항목은 전체 로드 시 삭제
+        rows += [dict(jti=uuid.uuid4().hex, user_id=1, expires_at=expires_at - timedelta(days=2)) for _ in range(entries // 10)]
+        with db.engine.begin() as connection:
+            connection.execute(insert(RevokedTokens), rows)
+
+        revocation_list = RevocationList()
+        start = time.perf_counter()
+        await revocation_list.reload()
+        print(f"db reload   rows={len(rows)} loaded={revocation_list.stats()['size']} {time.perf_counter() - start:.3f}s")
+
+        new_jtis = [uuid.uuid4().hex for _ in range(1000)]
+        with db.engine.begin() as connection:
+            connection.execute(insert(RevokedTokens), [dict(jti=jti, user_id=1, expires_at=expires_at) for jti in new_jtis])
+        start = time.perf_counter()
+        polled = await revocation_list.poll()
+        elapsed = time.perf_counter() - start
+        assert all(revocation_list.is_revoked(jti) for jti in new_jtis)
+        print(f"db poll     rows={polled} (overlap 포함) {elapsed * 1000:.1f}ms")
+        db.engine.dispose()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=200000)
+    parser.add_argument("--db-entries", type=int, default=100000)
+    args = parser.parse_args()
+
+    revoked = [uuid.uuid4().hex for _ in range(args.entries)]
+    valid = [uuid.uuid4().hex for _ in range(args.lookups)]
+    sample = revoked[: args.lookups]
+
+    revocation_list = RevocationList()
+    _, bloom_memory, bloom_elapsed = measure_memory(lambda: revocation_list.load(revoked))
+    # 비교 대상은 DB에서 읽은 것처럼 문자열 객체까지 새로 만든 set
+    revoked_set, set_memory, set_elapsed = measure_memory(lambda: {uuid.UUID(jti).hex for jti in revoked})
+
+    stats = revocation_list.stats()
+    print(f"entries={args.entries} lookups={args.lookups}")
+    print(f"bloom+array memory={bloom_memory / 1024 / 1024:7.1f}MiB (bloom {stats['bloom_bytes'] / 1024 / 1024:.1f}MiB, array {stats['set_bytes'] / 1024 / 1024:.1f}MiB) build={bloom_elapsed:.2f}s")
+    print(f"set[str]    memory={set_memory / 1024 / 1024:7.1f}MiB build={set_elapsed:.2f}s")
+
+    assert not any(revocation_list.is_revoked(jti) for jti in valid)
+    assert all(revocation_list.is_revoked(jti) for jti in sample)
+    positives = revocation_list.bloom_positives - len(sample)
+    print(f"bloom false positive rate={positives / len(valid):.5f}")
+
+    print(f"lookup not revoked  bloom+array={lookup_ns(revocation_list.is_revoked, valid):7.0f}ns  set[str]={lookup_ns(revoked_set.__contains__, valid):7.0f}ns")
+    print(f"lookup revoked      bloom+array={lookup_ns(revocation_list.is_revoked, sample):7.0f}ns  set[str]={lookup_ns(revoked_set.__contains__, sample):7.0f}ns")
+
+    if args.db_entries:
+        await db_sync(args.db_entries)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
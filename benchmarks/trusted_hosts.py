@@ -0,0 +1,52 @@
+"""
+허용 host 목록 크기에 따른 TrustedHostsMiddleware host 검사 비용
+
+- legacy : 요청마다 허용 목록 선형 탐색 (== / endswith)
+- matcher: HostMatcher (exact set + wildcard suffix set)
+
+usage: python -m benchmarks.trusted_hosts --count 20000
+"""
+
+import argparse
+import timeit
+
+from app.middlewares.trusted_hosts import HostMatcher
+
+
+def legacy_match(allowed_hosts, host):
+    found_www_redirect = False
+    for pattern in allowed_hosts:
+        if host == pattern or (pattern.startswith("*") and host.endswith(pattern[1:])):
+            return True, False
+        elif "www." + host == pattern:
+            found_www_redirect = True
+    return False, found_www_redirect
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    for size in (10, 1000, 10000):
+        allowed_hosts = []
+        for i in range(size // 2):
+            allowed_hosts.append(f"www.customer-{i}.com")
+            allowed_hosts.append(f"*.tenant-{i}.example.com")
+        matcher = HostMatcher(allowed_hosts)
+
+        samples = dict(
+            exact=f"www.customer-{size // 2 - 1}.com",
+            wildcard=f"api.eu.tenant-{size // 2 - 1}.example.com",
+            redirect=f"customer-{size // 2 - 1}.com",
+            invalid="attacker.net",
+        )
+        for name, host in samples.items():
+            assert legacy_match(allowed_hosts, host) == matcher.match(host)
+            legacy_us = timeit.timeit(lambda: legacy_match(allowed_hosts, host), number=max(args.count // size, 10)) / max(args.count // size, 10) * 1_000_000
+            matcher_us = timeit.timeit(lambda: matcher.match(host), number=args.count) / args.count * 1_000_000
+            print(f"hosts={size:<6} {name:<9} legacy {legacy_us:10.2f} us   matcher {matcher_us:6.3f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+GET /me DB query 수 / 처리량 비교 (cache 없음 / memory / fakeredis)
+cold cache 상태의 동시 요청은 single-flight로 DB 조회 1번만 발생하는지 확인
+
+usage: python -m benchmarks.user_cache --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from app.database.cache import MemoryCacheBackend, RedisCacheBackend, cache
+from app.database.conn import db
+from benchmarks.api_key_concurrency import build_app, create_schema
+
+
+def backends() -> dict:
+    backend_list = dict(none=None, memory=MemoryCacheBackend())
+    try:
+        from fakeredis import aioredis
+
+        backend_list["fakeredis"] = RedisCacheBackend(client=aioredis.FakeRedis())
+    except ImportError:
+        print("fakeredis not installed, skip redis backend")
+    return backend_list
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> tuple:
+    queries = 0
+
+    def count_query(*args, **kwargs):
+        nonlocal queries
+        queries += 1
+
+    event.listen(db.engine, "before_cursor_execute", count_query)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # cold cache 동시 요청
+        responses = await asyncio.gather(*(client.get("/api/me") for _ in range(concurrency)))
+        assert all(response.status_code == 200 for response in responses)
+        cold_queries = queries
+
+        queries = 0
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/api/me")
+        elapsed = time.perf_counter() - start
+    event.remove(db.engine, "before_cursor_execute", count_query)
+    return cold_queries, requests / elapsed, queries / requests
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app = build_app(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}", False)
+        await create_schema(False)
+
+        for name, backend in backends().items():
+            cache.set_backend(backend)
+            cache.hits = cache.misses = cache.coalesced = 0
+            cold_queries, rps, queries = await run(app, args.requests, args.concurrency)
+            print(f"{name:<10} cold x{args.concurrency} db queries={cold_queries:<4} /api/me {rps:8.1f} req/s   db queries/request {queries:.2f}   {cache.stats()}")
+            if backend is not None:
+                await backend.close()
+        db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,32 @@
+"""
+API Key 인증 캐시 유지 시간: 있는 key는 API_KEY_CACHE_TTL, 없는 key는 API_KEY_CACHE_MISS_TTL
+
+usage: python -m pytest tests
+"""
+
+from fastapi import FastAPI
+
+from app.middlewares import api_key_cache as api_key_cache_module
+from app.middlewares.api_key_cache import ApiKeyCache, ApiKeyEntry
+from app.schema import UserToken
+
+
+def test_entries_expire_after_ttl_and_misses_after_miss_ttl(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(api_key_cache_module.time, "monotonic", lambda: now)
+    cache = ApiKeyCache(FastAPI(), API_KEY_CACHE_TTL=5, API_KEY_CACHE_MISS_TTL=60)
+    entry = ApiKeyEntry(key_id=1, secret_key="secret", status="active", whitelist=None, user=UserToken(id=1))
+    cache.set("known", entry)
+    cache.set("unknown", None)
+
+    now += 4
+    assert cache.get("known") == (True, entry)
+    assert cache.get("unknown") == (True, None)
+
+    # 다른 worker에서 삭제/변경된 key는 API_KEY_CACHE_TTL 이후 다시 조회
+    now += 2
+    assert cache.get("known") == (False, None)
+    assert cache.get("unknown") == (True, None)
+
+    now += 55
+    assert cache.get("unknown") == (False, None)
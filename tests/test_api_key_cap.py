@@ -0,0 +1,81 @@
+"""
+API Key 개수 제한 (MAX_API_KEY) 동시성 테스트 (sqlite)
+
+usage: python -m pytest tests
+"""
+
+import asyncio
+import os
+
+import httpx
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.common.consts import MAX_API_KEY, API_KEY_CREATE_RETRY
+from app.database.conn import db
+from app.errors.exceptions import APIException
+from app.routers.user import _create_api_key
+from app.schema import AddKeyInfo
+from benchmarks.api_key_concurrency import CONCURRENCY, build_app, count_keys, create_schema
+
+
+async def create_concurrently(tmp_path, is_async: bool, path: str, bodies: list) -> tuple:
+    app = build_app(f"sqlite:///{os.path.join(tmp_path, 'test.db')}", is_async)
+    await create_schema(is_async)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*(client.post(path, json=body) for body in bodies))
+        return responses, await count_keys(is_async)
+    finally:
+        if is_async:
+            await db.engine.dispose()
+        else:
+            db.engine.dispose()
+
+
+@pytest.mark.parametrize("is_async", [False, True], ids=["sync", "async"])
+def test_create_cap_holds_under_concurrency(tmp_path, is_async):
+    bodies = [dict(memo=f"key-{i}") for i in range(CONCURRENCY)]
+    responses, created = asyncio.run(create_concurrently(tmp_path, is_async, "/api/apikeys", bodies))
+
+    assert created == MAX_API_KEY
+    assert sorted(response.status_code for response in responses) == [200] * MAX_API_KEY + [400] * (len(bodies) - MAX_API_KEY)
+
+
+@pytest.mark.parametrize("is_async", [False, True], ids=["sync", "async"])
+def test_bulk_create_cap_holds_under_concurrency(tmp_path, is_async):
+    bodies = [dict(keys=[dict(memo=f"key-{i}-{j}") for j in range(2)]) for i in range(CONCURRENCY)]
+    responses, created = asyncio.run(create_concurrently(tmp_path, is_async, "/api/apikeys/bulk", bodies))
+
+    assert created == MAX_API_KEY
+    assert all(response.status_code == 200 for response in responses)
+    assert sum(result["success"] for response in responses for result in response.json()) == MAX_API_KEY
+
+
+class FailingSession:
+    def __init__(self, error: Exception):
+        self.error = error
+        self.executed = 0
+        self.rolled_back = 0
+
+    def execute(self, statement):
+        self.executed += 1
+        raise self.error
+
+    def rollback(self):
+        self.rolled_back += 1
+
+
+def test_create_retries_access_key_conflict_only():
+    conflict = FailingSession(IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed: api_keys.access_key")))
+    with pytest.raises(APIException) as error:
+        _create_api_key(conflict, 1, AddKeyInfo(memo="key"))
+    assert error.value.detail == "API Key create failed"
+    assert conflict.executed == API_KEY_CREATE_RETRY
+
+    lost = FailingSession(OperationalError("INSERT", {}, Exception(2013, "Lost connection to MySQL server during query")))
+    with pytest.raises(OperationalError):
+        _create_api_key(lost, 1, AddKeyInfo(memo="key"))
+    assert lost.executed == 1
+    assert lost.rolled_back == 1
@@ -0,0 +1,72 @@
+"""
+비밀번호 해시 대기열이 가득 찼을 때 /api/auth 응답 (503 JSON 에러)
+
+usage: python -m pytest tests
+"""
+
+import asyncio
+import os
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from app.common.password import hasher
+from app.database.conn import db, Base
+from app.middlewares.token_validation import AccessControlMiddleware
+from app.routers import auth
+
+
+def build_app(database_url: str, is_async: bool) -> FastAPI:
+    app = FastAPI()
+    db.init_app(app, DB_URL=database_url, DB_ASYNC=is_async)
+    hasher.init_app(app, BCRYPT_ROUNDS=4)
+    app.add_middleware(AccessControlMiddleware)
+    app.include_router(auth.router, prefix="/api")
+    return app
+
+
+async def create_schema(is_async: bool):
+    def ddl(connection):
+        Base.metadata.create_all(connection)
+        connection.execute(text("INSERT INTO users (id, email, pw, created_at, updated_at) VALUES (1, 'user@example.com', 'hash', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"))
+
+    if is_async:
+        async with db.engine.begin() as connection:
+            await connection.run_sync(ddl)
+    else:
+        with db.engine.begin() as connection:
+            ddl(connection)
+
+
+async def post_with_full_queue(tmp_path, is_async: bool, path: str, body: dict) -> httpx.Response:
+    app = build_app(f"sqlite:///{os.path.join(tmp_path, 'test.db')}", is_async)
+    await create_schema(is_async)
+    max_pending = hasher._max_pending
+    hasher._max_pending = 0
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, json=body)
+    finally:
+        hasher._max_pending = max_pending
+        if is_async:
+            await db.engine.dispose()
+        else:
+            db.engine.dispose()
+
+
+@pytest.mark.parametrize("is_async", [False, True], ids=["sync", "async"])
+@pytest.mark.parametrize(
+    "path, email",
+    [("/api/auth/login/email", "user@example.com"), ("/api/auth/register/email", "new@example.com")],
+    ids=["login", "register"],
+)
+def test_full_hash_queue_returns_503(tmp_path, is_async, path, email):
+    response = asyncio.run(post_with_full_queue(tmp_path, is_async, path, dict(email=email, pw="password")))
+
+    assert response.status_code == 503
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["code"] == "5030001"
+    assert response.json()["detail"] == "Password Hash Queue Full"
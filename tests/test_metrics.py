@@ -0,0 +1,35 @@
+"""
+multi worker metrics snapshot 합산 / 이전 실행 snapshot 정리
+
+usage: python -m pytest tests
+"""
+
+import json
+import os
+
+from fastapi import FastAPI
+
+from app.middlewares.metrics import PrometheusMetrics, clear_snapshots
+from utils.metrics import RequestMetrics
+
+
+def write_snapshot(metrics_dir: str, pid: int, route: str):
+    requests = RequestMetrics()
+    requests.request_started("GET")
+    requests.request_finished(route, "GET", 200, 0.01, 0.0, 0)
+    with open(os.path.join(metrics_dir, f"metrics_{pid}.json"), "w") as f:
+        json.dump(requests.snapshot(), f)
+
+
+def test_clear_snapshots_drops_previous_run(tmp_path):
+    metrics_dir = str(tmp_path)
+    write_snapshot(metrics_dir, 999999, "/previous-run")
+    open(os.path.join(metrics_dir, "metrics_999998.json.tmp"), "w").close()
+    open(os.path.join(metrics_dir, "other.txt"), "w").close()
+
+    metrics = PrometheusMetrics(FastAPI(), METRICS_DIR=metrics_dir)
+    assert "/previous-run" in metrics.render()
+
+    clear_snapshots(metrics_dir)
+    assert os.listdir(metrics_dir) == ["other.txt"]
+    assert "/previous-run" not in metrics.render()
@@ -0,0 +1,56 @@
+"""
+IP 단위 요청 수 제한: 신뢰하는 proxy 뒤의 client는 X-Forwarded-For 기준으로 bucket 분리
+
+usage: python -m pytest tests
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.common.config import ProdConfig
+from app.middlewares.rate_limit import RateLimiter, RateLimitMiddleware
+from app.middlewares.token_validation import AccessControlMiddleware
+
+
+def build_app(trusted_proxies: list) -> FastAPI:
+    app = FastAPI()
+    limiter = RateLimiter(app, RATE_LIMIT_RULES=[("/api/auth/login", 1, 60)])
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    app.add_middleware(AccessControlMiddleware, trusted_proxies=trusted_proxies)
+
+    @app.post("/api/auth/login/email")
+    async def login():
+        return dict(msg="ok")
+
+    return app
+
+
+async def login_status_codes(app: FastAPI, forwarded_for: list) -> list:
+    # ASGITransport의 socket peer는 127.0.0.1
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return [(await client.post("/api/auth/login/email", headers={"X-Forwarded-For": ip})).status_code for ip in forwarded_for]
+
+
+def test_clients_behind_trusted_proxy_get_separate_buckets():
+    app = build_app(trusted_proxies=["127.0.0.1/32"])
+
+    assert asyncio.run(login_status_codes(app, ["1.1.1.1", "1.1.1.1", "2.2.2.2"])) == [200, 429, 200]
+
+
+def test_clients_share_proxy_bucket_without_trusted_proxy():
+    app = build_app(trusted_proxies=[])
+
+    assert asyncio.run(login_status_codes(app, ["1.1.1.1", "2.2.2.2"])) == [200, 429]
+
+
+def test_prod_config_requires_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(ProdConfig, "ALLOW_SITE", ["https://example.com"])
+    monkeypatch.setattr(ProdConfig, "TRUSTED_HOSTS", ["example.com"])
+
+    with pytest.raises(RuntimeError, match="TRUSTED_PROXIES"):
+        ProdConfig(TRUSTED_PROXIES=())
+    assert ProdConfig(TRUSTED_PROXIES=("10.0.0.0/8",)).TRUSTED_PROXIES == ("10.0.0.0/8",)
@@ -1,35 +1,190 @@
 import json
 import logging
+import queue
+import random
+import sys
+import threading
 import time
+import traceback
+from collections import Counter
 from datetime import datetime
+from logging.handlers import RotatingFileHandler
 
+from fastapi import FastAPI
 from fastapi.logger import logger
 from starlette.requests import Request
 
+from app.common.context import request_context
+
 logger.setLevel(logging.INFO)
 
 
-async def api_logger(request: Request, response=None, error=None):
-    process_time = time.time() - request.state.start
-    status_code = error.status_code if error else response.status_code
+class AccessLogPipeline:
+    """
+    요청 경로에서는 record(dict)를 bounded queue에 넣기만 하고
+    background thread가 batch 단위로 한 줄 JSON 직렬화 후 stdout / rotating file에 기록
+    queue가 가득 차면 drop policy(newest: 새 record 버림, oldest: 가장 오래된 record 버림)에 따라 버리고 dropped 증가
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._queue: queue.Queue = None
+        self._thread: threading.Thread = None
+        self._batch_size = 256
+        self._drop_oldest = False
+        self._writer: logging.Logger = None
+        self.dropped = 0
+        self.sample_4xx = 1.0
+        self.sample_traceback = 1.0
+        # 기록하지 않은 4xx 에러 code 별 개수
+        self.skipped_errors = Counter()
+
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Access log pipeline 초기화
+        :param app:
+        :param kwargs: LOG_QUEUE_SIZE, LOG_BATCH_SIZE, LOG_DROP_POLICY(newest/oldest), LOG_FILE, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUP_COUNT,
+                       LOG_4XX_SAMPLE_RATE, LOG_TRACEBACK_SAMPLE_RATE
+        :return:
+        """
+        self._queue = queue.Queue(maxsize=kwargs.setdefault("LOG_QUEUE_SIZE", 10000))
+        self._batch_size = kwargs.setdefault("LOG_BATCH_SIZE", 256)
+        self._drop_oldest = kwargs.setdefault("LOG_DROP_POLICY", "newest") == "oldest"
+        self.sample_4xx = kwargs.setdefault("LOG_4XX_SAMPLE_RATE", 0.01)
+        self.sample_traceback = kwargs.setdefault("LOG_TRACEBACK_SAMPLE_RATE", 0.1)
+
+        log_file = kwargs.setdefault("LOG_FILE", None)
+        if log_file:
+            handler = RotatingFileHandler(
+                log_file,
+                maxBytes=kwargs.setdefault("LOG_FILE_MAX_BYTES", 100 * 1024 * 1024),
+                backupCount=kwargs.setdefault("LOG_FILE_BACKUP_COUNT", 5),
+                encoding="utf-8",
+            )
+        else:
+            handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._writer = logging.getLogger("api.access")
+        self._writer.handlers = [handler]
+        self._writer.setLevel(logging.INFO)
+        self._writer.propagate = False
+
+        @app.on_event("startup")
+        def startup():
+            self.start()
+
+        @app.on_event("shutdown")
+        def shutdown():
+            self.stop()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """
+        남은 record 기록 후 종료
+        :param timeout:
+        :return:
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def put(self, record: dict) -> bool:
+        """
+        record 적재 (block 하지 않음)
+        :param record:
+        :return: 적재 여부
+        """
+        if self._queue is None:
+            # init_app 전 (스크립트, 벤치마크 등)에는 바로 기록
+            logger.info(dump_record(record))
+            return True
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            if self._drop_oldest:
+                try:
+                    self._queue.get_nowait()
+                    self._queue.put_nowait(record)
+                except (queue.Empty, queue.Full):
+                    pass
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [record for record in batch if record is not None]
+            if records:
+                try:
+                    self._writer.info("\n".join(dump_record(record) for record in records))
+                except Exception:
+                    logger.exception("access log write failed")
+            if len(records) != len(batch):
+                return
+
+    def stats(self) -> dict:
+        return dict(
+            queued=self._queue.qsize() if self._queue else 0,
+            max_size=self._queue.maxsize if self._queue else 0,
+            dropped=self.dropped,
+            skipped_errors=dict(self.skipped_errors),
+        )
+
+
+def dump_record(record: dict) -> str:
+    record["datetime"] = f"{datetime.fromtimestamp(record['datetime']):%Y-%m-%d %H:%M:%S}"
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+access_log = AccessLogPipeline()
+
+
+async def api_logger(request: Request, status_code: int = None, error=None):
+    status_code = error.status_code if error else status_code
+    if error and status_code < 500 and (not access_log.sample_4xx or random.random() >= access_log.sample_4xx):
+        # 잘못된 토큰 등 예상된 4xx는 대부분 개수만 집계
+        access_log.skipped_errors[error.code] += 1
+        return
+
+    # 처리 시간은 요청 시작 perf_counter_ns 기준, 벽시계 시각은 기록할 때만
+    context = request_context()
+    now = time.time()
     error_log = None
 
-    user = request.state.user
+    user = context.user if context else None
 
     if error:
-        frame = request.state.inspect
-        error_file = error_function = error_line = None
-        if frame:
-            error_file = frame.f_code.co_filename
-            error_function = frame.f_code.co_name
-            error_line = frame.f_lineno
-
         error_log = dict(
-            errorFunc=error_function,
-            location=f"{error_line} line in {error_file}",
+            errorFunc=None,
+            location=None,
             raised=str(error.__class__.__name__),
             msg=str(error.ex),
         )
+        # 5xx만 예외 발생 위치 기록, 전체 traceback은 일부만
+        cause = error.ex or error
+        tb = cause.__traceback__
+        if status_code >= 500 and tb is not None:
+            while tb.tb_next is not None:
+                tb = tb.tb_next
+            error_log.update(errorFunc=tb.tb_frame.f_code.co_name, location=f"{tb.tb_lineno} line in {tb.tb_frame.f_code.co_filename}")
+            if access_log.sample_traceback and random.random() < access_log.sample_traceback:
+                error_log["traceback"] = "".join(traceback.format_exception(cause))
 
     user_id = None
     hash_email = None
@@ -41,24 +196,21 @@ async def api_logger(request: Request, response=None, error=None):
             hash_email = f"**{local[2:]}@{domain}"
 
     user_log = dict(
-        client=request.state.ip,
+        client=context.ip if context else None,
         user=user_id,
         email=hash_email,
     )
 
-    # url, method, status_code, error_detail, client, processed_time, datetime
+    # url, method, status_code, error_detail, client, processed_time(ms), datetime
+    # 직렬화/시간 포맷은 background thread에서
     log_dict = dict(
-        url=f"{request.url.hostname}{request.url.path}",
+        level="error" if status_code >= 500 else "info",
+        url=f"{request.headers.get('host', '').split(':')[0]}{request.scope['path']}",
         method=request.method,
         status_code=status_code,
         error_detail=error_log,
         client=user_log,
-        processed_time=f"{round(process_time * 1000, 5)} ms",
-        datetime=f"{datetime.now():%Y-%m-%d %H:%M:%S}",
+        processed_time=round(context.elapsed_ms(), 5) if context else None,
+        datetime=now,
     )
-
-    logger_to_json = json.dumps(log_dict, indent=4)
-    if status_code >= 500:
-        logger.error(logger_to_json)
-    else:
-        logger.info(logger_to_json)
+    access_log.put(log_dict)
@@ -0,0 +1,144 @@
+from bisect import bisect_left
+
+# 기본 latency bucket (초 단위)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    누적 bucket histogram (Prometheus histogram 과 같은 le 기준)
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # 마지막 칸은 +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for le, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets["+Inf" if le == float("inf") else str(le)] = cumulative
+        return dict(buckets=buckets, sum=self.sum, count=self.count)
+
+
+class RequestMetrics:
+    """
+    요청 latency / DB 시간 집계 (process 단위)
+    값 갱신은 이벤트 루프 thread에서만 일어나므로 lock 없이 dict/list 연산만 사용
+    multi worker 환경에서는 각 worker가 METRICS_DIR에 snapshot 파일을 남기고 조회 시 합산
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # (route, method, status) -> Histogram
+        self.latency = {}
+        # (route, method) -> Histogram
+        self.db_latency = {}
+        # (route, method) -> count
+        self.db_queries = {}
+        # method -> count
+        self.in_flight = {}
+
+    def request_started(self, method: str):
+        self.in_flight[method] = self.in_flight.get(method, 0) + 1
+
+    def request_finished(self, route: str, method: str, status_code: int, elapsed: float, db_elapsed: float, db_queries: int):
+        self.in_flight[method] -= 1
+
+        key = (route, method, str(status_code))
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(self.buckets)
+        histogram.observe(elapsed)
+
+        if db_queries:
+            key = (route, method)
+            histogram = self.db_latency.get(key)
+            if histogram is None:
+                histogram = self.db_latency[key] = Histogram(self.buckets)
+            histogram.observe(db_elapsed)
+            self.db_queries[key] = self.db_queries.get(key, 0) + db_queries
+
+    def snapshot(self) -> dict:
+        return dict(
+            buckets=list(self.buckets),
+            latency=[[*key, histogram.counts, histogram.sum, histogram.count] for key, histogram in self.latency.items()],
+            db_latency=[[*key, histogram.counts, histogram.sum, histogram.count] for key, histogram in self.db_latency.items()],
+            db_queries=[[*key, count] for key, count in self.db_queries.items()],
+            in_flight=dict(self.in_flight),
+        )
+
+    def merge(self, snapshot: dict):
+        """
+        다른 worker의 snapshot 합산
+        :param snapshot:
+        :return:
+        """
+        for name in ("latency", "db_latency"):
+            target = getattr(self, name)
+            for *key, counts, total, count in snapshot[name]:
+                key = tuple(key)
+                histogram = target.get(key)
+                if histogram is None:
+                    histogram = target[key] = Histogram(self.buckets)
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+        for *key, count in snapshot["db_queries"]:
+            key = tuple(key)
+            self.db_queries[key] = self.db_queries.get(key, 0) + count
+        for method, count in snapshot.get("in_flight", {}).items():
+            self.in_flight[method] = self.in_flight.get(method, 0) + count
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format
+        :return:
+        """
+        lines = []
+        lines += render_histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency",
+            ("route", "method", "status"),
+            self.latency,
+        )
+        lines += render_histogram(
+            "http_request_db_duration_seconds",
+            "DB time per HTTP request",
+            ("route", "method"),
+            self.db_latency,
+        )
+        lines.append("# HELP http_request_db_queries_total DB queries executed by HTTP requests")
+        lines.append("# TYPE http_request_db_queries_total counter")
+        for (route, method), count in sorted(self.db_queries.items()):
+            lines.append(f'http_request_db_queries_total{{route="{route}",method="{method}"}} {count}')
+        lines.append("# HELP http_requests_in_flight HTTP requests currently being processed")
+        lines.append("# TYPE http_requests_in_flight gauge")
+        for method, count in sorted(self.in_flight.items()):
+            lines.append(f'http_requests_in_flight{{method="{method}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def render_histogram(name: str, help_text: str, label_names: tuple, histograms: dict) -> list:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for key, histogram in sorted(histograms.items()):
+        labels = ",".join(f'{label}="{value}"' for label, value in zip(label_names, key))
+        cumulative = 0
+        for le, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+            cumulative += count
+            le = "+Inf" if le == float("inf") else repr(le)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines